@@ -0,0 +1,109 @@
+"""Latency of cold CLI runs against daemon-backed ones
+
+Times ``nyxfall -e`` and ``nyxfall --all`` over a few hundred cards in a
+fresh interpreter answering from the on-disk response cache, the same
+commands handed to a running ``nyxfall --serve``, and bare requests to the
+daemon without starting an interpreter.
+
+Usage: python benchmarks/bench_daemon.py [--runs 50] [--cards 500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from synthetic import generate_cards, search_pages
+from nyxfall import daemon_client
+from nyxfall.response_cache import ResponseCache
+from nyxfall.scryfall_requester import SCRYFALL_BASE
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+QUERY = "t:creature"
+
+
+def report(label: str, timings: list[float]):
+    percentiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{label:<32} p50 {percentiles[49] * 1000:>7.1f} ms "
+        f"p99 {percentiles[98] * 1000:>7.1f} ms"
+    )
+
+
+def time_runs(runs: int, run) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["NYXFALL_CACHE_DIR"] = cache_dir
+        env = {**os.environ, "PYTHONPATH": str(SRC)}
+        cards = generate_cards(args.cards)
+        card = cards[0]
+        search = f"{SCRYFALL_BASE}search?q={QUERY}+game:paper"
+        cache = ResponseCache()
+        cache.put(
+            f"{SCRYFALL_BASE}named?exact={card['name']}", json.dumps(card)
+        )
+        for page, response in enumerate(search_pages(cards, search), start=1):
+            cache.put(f"{search}&page={page}", json.dumps(response))
+        cache.close()
+        commands = {
+            "-e": [sys.executable, "-m", "nyxfall", "-e", card["name"]],
+            "--all": [sys.executable, "-m", "nyxfall", "--all", QUERY],
+        }
+        messages = {
+            "-e": {"op": "exact", "name": card["name"]},
+            "--all": {"op": "render", "query": QUERY},
+        }
+
+        def cli(command: list[str]):
+            return lambda: subprocess.run(
+                command, env=env, stdout=subprocess.DEVNULL
+            )
+
+        for flag, command in commands.items():
+            report(f"cold CLI {flag}", time_runs(args.runs, cli(command)))
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "nyxfall", "--serve"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            while daemon_client.request({"op": "ping"}) is None:
+                time.sleep(0.05)
+            for flag, command in commands.items():
+                report(
+                    f"daemon-backed CLI {flag}",
+                    time_runs(args.runs, cli(command)),
+                )
+            for flag, message in messages.items():
+                report(
+                    f"daemon request only {flag}",
+                    time_runs(
+                        args.runs,
+                        lambda: daemon_client.request(message),
+                    ),
+                )
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Decode-and-map cost per card of search responses
+
+Decodes a multi-page ``/cards/search`` response, built from synthetic cards
+or a bulk-data file, the way nyxfall used to, with ``json.loads`` and
+mapping every card from the full dictionary, then with ``nyxfall.decoding``
+on each installed backend.
+
+Usage: python benchmarks/bench_decode.py [--pages 20] [--bulk oracle-cards.json]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from synthetic import load_cards, search_pages
+from nyxfall import decoding
+from nyxfall.scryfall_requester import _map_response
+
+BASE_URL = "https://api.scryfall.com/cards/search?q=t:creature+game:paper"
+PAGE_SIZE = 175
+
+
+def timed(label: str, pages: list[bytes], cards: int, decode) -> float:
+    start = time.perf_counter()
+    for body in pages:
+        decode(body)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<32} {cards:>6} cards {elapsed * 1000:>8.1f} ms "
+        f"{elapsed / cards * 1e6:>8.2f} us/card"
+    )
+    return elapsed
+
+
+def legacy_decode(body: bytes):
+    return [_map_response(card) for card in json.loads(body)["data"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    cards = load_cards(args.bulk, args.pages * PAGE_SIZE)[
+        : args.pages * PAGE_SIZE
+    ]
+    pages = [
+        json.dumps(page).encode()
+        for page in search_pages(cards, BASE_URL, PAGE_SIZE)
+    ]
+    size = sum(len(page) for page in pages)
+    print(f"{len(pages)} pages, {size / 1e6:.1f} MB\n")
+
+    before = timed(
+        "before: json + full mapping", pages, len(cards), legacy_decode
+    )
+    for backend in decoding.available_backends():
+        decoding.use_backend(backend)
+        after = timed(
+            f"after: {backend}", pages, len(cards), decoding.decode_page
+        )
+        print(f"{'':<32} {before / after:>.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
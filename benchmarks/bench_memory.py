@@ -0,0 +1,100 @@
+"""Memory used by a full collection of mapped cards
+
+Decodes ~30k cards from JSON and keeps them as plain dataclasses (the
+original representation) and as slotted dataclasses with interned fields
+(the current representation), reporting the memory each retains once the
+decoded JSON has been released.
+
+Usage: python benchmarks/bench_memory.py [--bulk oracle-cards.json]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+from synthetic import load_cards
+from nyxfall.scryfall_requester import _map_response
+
+
+@dataclass
+class LegacyCardFace:
+    name: str
+    scryfall_uri: str
+    mana_cost: str
+    type_line: str
+    power: Optional[str]
+    toughness: Optional[str]
+    oracle_text: str
+    flavor_text: Optional[str]
+    set: str
+
+
+@dataclass
+class LegacyCard:
+    faces: list[LegacyCardFace]
+    name: str
+
+
+def legacy_map(response: dict[str, Any]) -> LegacyCard:
+    faces = response.get("card_faces") or [response]
+    return LegacyCard(
+        faces=[
+            LegacyCardFace(
+                name=face.get("name", ""),
+                scryfall_uri=face.get("scryfall_uri", ""),
+                mana_cost=face.get("mana_cost", ""),
+                type_line=face.get("type_line", ""),
+                power=face.get("power", None),
+                toughness=face.get("toughness", None),
+                oracle_text=face.get("oracle_text", ""),
+                flavor_text=face.get("flavor_text", None),
+                set=face.get("set", "").upper(),
+            )
+            for face in faces
+        ],
+        name=response.get("name", ""),
+    )
+
+
+def retained(build: Callable[[list[dict[str, Any]]], Any], text: str) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build(json.loads(text))
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    cards = load_cards(args.bulk)
+    text = json.dumps(cards)
+    del cards
+
+    approaches = [
+        (
+            "dataclass with __dict__",
+            lambda data: [legacy_map(c) for c in data],
+        ),
+        ("slotted + interned", lambda data: [_map_response(c) for c in data]),
+    ]
+    baseline = None
+    for label, build in approaches:
+        size = retained(build, text)
+        baseline = baseline or size
+        print(
+            f"{label:<26} {size / 1024 / 1024:>8.1f} MiB "
+            f"{size / baseline:>6.0%} of original"
+        )
+
+
+if __name__ == "__main__":
+    main()
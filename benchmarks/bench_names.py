@@ -0,0 +1,107 @@
+"""Name completion and typo suggestion latency
+
+Builds a name index over a full collection of card names, then times
+completing prefixes and suggesting names for misspellings against it. The
+index is saved and loaded again first, as the CLI and daemon would, so the
+trigram index behind suggestions comes from disk rather than being rebuilt.
+Keystrokes in the type-ahead picker are timed from the key press to the
+redrawn picker being written to a terminal.
+
+Usage: python benchmarks/bench_names.py [--queries 1000] [--bulk oracle-cards.json]
+"""
+
+import argparse
+import io
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from rich.console import Console
+from synthetic import load_cards
+from nyxfall.name_index import NameIndex
+from nyxfall.picker import TypeAhead
+
+
+def misspell(rng: random.Random, name: str) -> str:
+    position = rng.randrange(len(name))
+    edit = rng.choice(["drop", "swap", "replace"])
+    if edit == "drop":
+        return name[:position] + name[position + 1 :]
+    if edit == "swap" and position + 1 < len(name):
+        return (
+            name[:position]
+            + name[position + 1]
+            + name[position]
+            + name[position + 2 :]
+        )
+    return name[:position] + rng.choice("aeiourst") + name[position + 1 :]
+
+
+def report(label: str, timings: list[float]):
+    percentiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{label:<28} p50 {percentiles[49] * 1e6:>8.1f} us "
+        f"p99 {percentiles[98] * 1e6:>8.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    names = [card["name"] for card in load_cards(args.bulk)]
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    index = NameIndex(names)
+    print(
+        f"built index of {len(index)} names in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "card-names.idx"
+        index.save(path)
+        start = time.perf_counter()
+        index = NameIndex.load(path)
+        print(
+            f"loaded saved index in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+    print()
+
+    samples = [rng.choice(names) for _ in range(args.queries)]
+    timings = []
+    for name in samples:
+        prefix = name[: rng.randint(2, 6)]
+        start = time.perf_counter()
+        index.complete(prefix)
+        timings.append(time.perf_counter() - start)
+    report("complete prefix", timings)
+
+    timings = []
+    found = 0
+    for name in samples:
+        typo = misspell(rng, name)
+        start = time.perf_counter()
+        suggestions = index.suggest(typo)
+        timings.append(time.perf_counter() - start)
+        found += name in suggestions
+    report("suggest for a typo", timings)
+    print(f"{'':<28} intended name suggested for {found / len(samples):.0%}")
+
+    console = Console(file=io.StringIO(), force_terminal=True, width=80)
+    timings = []
+    for name in samples[:100]:
+        picker = TypeAhead(index)
+        for character in name:
+            start = time.perf_counter()
+            picker.type(character)
+            console.print(picker.render())
+            timings.append(time.perf_counter() - start)
+    report("picker keystroke to redraw", timings)
+
+
+if __name__ == "__main__":
+    main()
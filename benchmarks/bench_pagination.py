@@ -0,0 +1,72 @@
+"""Per-page latency of multi-page searches
+
+Compares a fresh connection per page with a fixed 100 ms sleep between
+pages, as nyxfall used to fetch them, against the pooled session and token
+bucket rate limiter, both against a local stand-in server.
+
+Usage: python benchmarks/bench_pagination.py [--pages 10] [--latency 0.05]
+"""
+
+import argparse
+import time
+import requests
+from stand_in import StandInServer
+from synthetic import generate_cards, search_pages
+from nyxfall import scryfall_requester
+
+QUERY = "t:creature"
+
+
+def legacy_search(base: str) -> int:
+    response = requests.get(
+        f"{base}search?q={QUERY}+game:paper&page=1",
+        headers=scryfall_requester.HEADERS,
+    ).json()
+    count = len(response["data"])
+    while response.get("has_more", False):
+        time.sleep(100 / 1000)
+        response = requests.get(response["next_page"]).json()
+        count += len(response["data"])
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="simulated server latency in seconds",
+    )
+    args = parser.parse_args()
+
+    cards = generate_cards(args.pages * 175)
+    scryfall_requester.configure_cache(enabled=False)
+    with StandInServer({}, latency=args.latency) as server:
+        base = f"{server.url}/cards/"
+        search = f"/cards/search?q={QUERY}+game:paper"
+        pages = search_pages(cards, f"{server.url}{search}")
+        for page, response in enumerate(pages, start=1):
+            server.add(f"{search}&page={page}", response)
+        scryfall_requester.SCRYFALL_BASE = base
+
+        for name, run in [
+            ("new connection + 100 ms sleep", lambda: legacy_search(base)),
+            (
+                "pooled session + token bucket",
+                lambda: len(scryfall_requester.search_query(QUERY)),
+            ),
+        ]:
+            start = time.perf_counter()
+            count = run()
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:<32} {count} cards, {args.pages} pages: "
+                f"{elapsed * 1000:.0f} ms total, "
+                f"{elapsed / args.pages * 1000:.1f} ms/page"
+            )
+
+
+if __name__ == "__main__":
+    main()
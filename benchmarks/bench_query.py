@@ -0,0 +1,109 @@
+"""Query latency of the local search engine against a full card collection
+
+Imports the collection into a card store, which builds and saves the search
+indexes once, then times each query three ways: against indexes already in
+memory, from a fresh store that has to read its saved indexes and decode the
+first page of matches (what every ``nyxfall --offline`` run pays), and by
+testing every card in turn.
+
+Usage: python benchmarks/bench_query.py [--bulk oracle-cards.json]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from synthetic import load_cards
+from nyxfall.card_store import CardStore
+from nyxfall.query import And, CardIndex, Not, Or, parse
+from nyxfall.scryfall_requester import OFFLINE_PAGE_SIZE
+
+QUERIES = [
+    "dragon",
+    "t:creature",
+    "t:creature c:g pow>=5",
+    "o:flying -t:creature",
+    'o:"draw a card" mv<=2',
+    "(c:r or c:b) t:instant",
+    "id<=izzet o:counter",
+    "s:neo r>=rare",
+    "-c:w -c:u -c:b mv=3",
+    "t:land or t:artifact or t:enchantment",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cards = load_cards(args.bulk)
+    start = time.perf_counter()
+    index = CardIndex(cards)
+    build = time.perf_counter() - start
+    print(f"Indexed {len(cards)} cards in {build * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        bulk = Path(directory) / "oracle-cards.json"
+        bulk.write_text(json.dumps(cards))
+        path = Path(directory) / "cards.sqlite3"
+        start = time.perf_counter()
+        CardStore(path).import_bulk(bulk)
+        imported = time.perf_counter() - start
+        print(f"Imported and indexed them in {imported * 1000:.0f} ms")
+        start = time.perf_counter()
+        CardStore(path).index()
+        loaded = time.perf_counter() - start
+        print(f"Read the saved indexes in {loaded * 1000:.0f} ms\n")
+        report(index, path, args.repeat)
+
+
+def report(index: CardIndex, path: Path, repeat: int):
+    print(
+        f"{'query':<40} {'matches':>8} {'median ms':>10} {'cold ms':>8} "
+        f"{'scan ms':>9}"
+    )
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = index.search(query)
+            timings.append(time.perf_counter() - start)
+        cold = []
+        for _ in range(max(repeat // 4, 1)):
+            start = time.perf_counter()
+            store = CardStore(path)
+            store.find(query)[:OFFLINE_PAGE_SIZE]
+            cold.append(time.perf_counter() - start)
+            store.close()
+        # Baseline: evaluate the same query by testing every card in turn
+        predicate = _predicate(index, parse(query))
+        start = time.perf_counter()
+        scanned = [i for i in range(len(index.cards)) if predicate(i)]
+        scan = time.perf_counter() - start
+        assert len(scanned) == len(found), query
+        print(
+            f"{query:<40} {len(found):>8} "
+            f"{statistics.median(timings) * 1000:>10.2f} "
+            f"{statistics.median(cold) * 1000:>8.2f} {scan * 1000:>9.2f}"
+        )
+
+
+def _predicate(index, node):
+    if isinstance(node, And):
+        children = [_predicate(index, child) for child in node.children]
+        return lambda i: all(child(i) for child in children)
+    if isinstance(node, Or):
+        children = [_predicate(index, child) for child in node.children]
+        return lambda i: any(child(i) for child in children)
+    if isinstance(node, Not):
+        child = _predicate(index, node.child)
+        return lambda i: not child(i)
+    return index.compile(node).matches
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Card frame rendering throughput
+
+Renders every face of a full card collection with the original
+``format_as_card`` implementation (rebuilding the frame characters and
+re-wrapping text on every call) and with ``nyxfall.render``, then
+re-renders a working set that fits in the frame cache.
+
+Usage: python benchmarks/bench_render.py [--bulk oracle-cards.json]
+"""
+
+import argparse
+import time
+from pathlib import Path
+from textwrap import fill
+from synthetic import load_cards
+from nyxfall.card_face import CardFace
+from nyxfall.render import FRAME_CACHE_SIZE, clear_caches, render_card
+from nyxfall.scryfall_requester import _map_response
+
+
+def legacy_format_as_card(self: CardFace, ascii_only: bool = False) -> str:
+    down_right = "+" if ascii_only else "┌"
+    down_left = "+" if ascii_only else "┐"
+    up_right = "+" if ascii_only else "└"
+    up_left = "+" if ascii_only else "┘"
+    vertical = "|" if ascii_only else "│"
+    horizontal = "-" if ascii_only else "─"
+    down_horizontal = "+" if ascii_only else "┬"
+    up_horizontal = "+" if ascii_only else "┴"
+    left_vertical = "|" if ascii_only else "┤"
+    right_vertical = "|" if ascii_only else "├"
+    card_text_width = (
+        32
+        if max((len(self.name) + len(self.mana_cost) + 2), len(self.type_line))
+        <= 32
+        else max(
+            (len(self.name) + len(self.mana_cost) + 2), len(self.type_line)
+        )
+    )
+    card = [
+        f"{down_right}{horizontal * (card_text_width + 2)}{down_left}",
+        f"{vertical}{down_right}{horizontal * card_text_width}{down_left}{vertical}",
+        f"{vertical}{vertical}{self.name}{" " * (card_text_width - len(self.name) - len(self.mana_cost))}{self.mana_cost}{vertical}{vertical}",
+        f"{vertical}{up_right}{down_horizontal}{horizontal * (card_text_width - 2)}{down_horizontal}{up_left}{vertical}",
+        "\n".join(
+            [
+                f"{vertical} {vertical}{" " * (card_text_width - 2)}{vertical} {vertical}"
+            ]
+            * 1
+        ),
+        f"{vertical}{down_right}{up_horizontal}{horizontal * (card_text_width - 2)}{up_horizontal}{down_left}{vertical}",
+        f"{vertical}{vertical}{self.type_line}{" " * (card_text_width - len(self.type_line))}{vertical}{vertical}",
+        f"{vertical}{up_right}{down_horizontal}{horizontal * (card_text_width - 2)}{down_horizontal}{up_left}{vertical}",
+        _legacy_wrap_and_pad(self.oracle_text, card_text_width, vertical),
+    ]
+    if self.flavor_text:
+        card.append(
+            f"{vertical} {vertical} {horizontal * (card_text_width - 4)} {vertical} {vertical}"
+        )
+        card.append(
+            ("" if ascii_only else "\x1b[3m")
+            + _legacy_wrap_and_pad(self.flavor_text, card_text_width, vertical)
+            + ("" if ascii_only else "\x1b[23m")
+        )
+    if self.power and self.toughness:
+        pt_box_width = len(str(self.power)) + len(str(self.toughness)) + 3
+        card.extend(
+            [
+                f"{vertical} {vertical}{" " * (card_text_width - pt_box_width - 4)}{down_right}{horizontal * pt_box_width}{down_left}{vertical} {vertical}",
+                f"{vertical} {up_right}{horizontal * (card_text_width - pt_box_width - 4)}{left_vertical} {str(self.power)}/{str(self.toughness)} {right_vertical}{up_left} {vertical}",
+                f"{vertical} {self.set}{" " * (card_text_width - len(self.set) - pt_box_width - 3)}{up_right}{horizontal * 5}{up_left}  {vertical}",
+                f"{up_right}{horizontal * (card_text_width + 2)}{up_left}",
+            ]
+        )
+    else:
+        card.extend(
+            [
+                f"{vertical} {up_right}{horizontal * (card_text_width - 2)}{up_left} {vertical}",
+                f"{vertical} {self.set}{" " * (card_text_width - len(self.set))} {vertical}",
+                f"{up_right}{horizontal * (card_text_width + 2)}{up_left}",
+            ]
+        )
+    return "\n".join(card) + "\n"
+
+
+def _legacy_wrap_and_pad(text: str, card_width: int, vert_char: str) -> str:
+    return "\n".join(
+        [
+            f"{vert_char} {vert_char}{line}{" " * (card_width - len(line) - 2)}{vert_char} {vert_char}"
+            for lines in [
+                fill(
+                    paragraph, width=card_width - 2, replace_whitespace=False
+                ).split("\n")
+                for paragraph in text.splitlines()
+            ]
+            for line in lines
+        ]
+    )
+
+
+def timed(label: str, faces: list[CardFace], render) -> float:
+    start = time.perf_counter()
+    for face in faces:
+        render(face)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<36} {len(faces):>6} faces {elapsed * 1000:>8.0f} ms "
+        f"{len(faces) / elapsed:>10.0f} faces/s"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    faces = [
+        face
+        for card in load_cards(args.bulk)
+        for face in _map_response(card).faces
+    ]
+    working_set = faces[: FRAME_CACHE_SIZE // 2]
+
+    before = timed(
+        "before: format_as_card per call", faces, legacy_format_as_card
+    )
+    clear_caches()
+    after = timed("after: engine, cold caches", faces, render_card)
+    print(f"{'':<36} {before / after:>.2f}x faster\n")
+
+    timed("before: re-render working set", working_set, legacy_format_as_card)
+    for face in working_set:
+        render_card(face)
+    timed("after: re-render working set", working_set, render_card)
+
+
+if __name__ == "__main__":
+    main()
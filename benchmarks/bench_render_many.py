@@ -0,0 +1,56 @@
+"""Bulk rendering throughput
+
+Writes every face of a card collection to a file the way ``nyxfall`` used
+to, with one ``print`` of ``format_as_card`` per face on an unbuffered
+stream, and with ``render_many`` on a single buffered stream.
+
+Usage: python benchmarks/bench_render_many.py [--bulk oracle-cards.json]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from synthetic import load_cards
+from nyxfall.render import clear_caches, render_many
+from nyxfall.scryfall_requester import _map_response
+
+
+def timed(label: str, faces: int, run) -> float:
+    clear_caches()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<36} {faces:>6} faces {elapsed * 1000:>8.0f} ms "
+        f"{faces / elapsed:>10.0f} faces/s"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    cards = [_map_response(card) for card in load_cards(args.bulk)]
+    faces = sum(len(card.faces) for card in cards)
+
+    def print_each():
+        # Line buffered, like stdout attached to a terminal
+        with open(os.devnull, "w", encoding="utf-8", buffering=1) as out:
+            for card in cards:
+                for face in card.faces:
+                    print(face.format_as_card(), file=out)
+
+    def buffered():
+        with open(os.devnull, "w", encoding="utf-8", buffering=1 << 16) as out:
+            render_many(cards, out)
+
+    before = timed("before: print per face", faces, print_each)
+    after = timed("after: render_many, buffered", faces, buffered)
+    print(f"{'':<36} {before / after:>.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
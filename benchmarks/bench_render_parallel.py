@@ -0,0 +1,46 @@
+"""Scaling of ``render_many`` across worker processes
+
+Renders every face of a card collection with 1, 2, 4 and 8 jobs, starting
+from cold frame caches each time, and reports throughput and speedup over
+rendering in a single process. Pool start-up is included, as it would be
+for a single ``nyxfall --all --jobs N`` run.
+
+Usage: python benchmarks/bench_render_parallel.py [--jobs 1,2,4,8] [--bulk oracle-cards.json]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from synthetic import load_cards
+from nyxfall.render import clear_caches, render_many
+from nyxfall.scryfall_requester import _map_response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", default="1,2,4,8")
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    cards = [_map_response(card) for card in load_cards(args.bulk)]
+    faces = sum(len(card.faces) for card in cards)
+    # render_many never starts more jobs than there are CPUs
+    print(f"{faces} faces on {os.cpu_count()} CPUs\n")
+
+    serial = None
+    for jobs in map(int, args.jobs.split(",")):
+        clear_caches()
+        start = time.perf_counter()
+        with open(os.devnull, "w", encoding="utf-8", buffering=1 << 16) as out:
+            render_many(cards, out, jobs=jobs)
+        elapsed = time.perf_counter() - start
+        serial = serial or elapsed
+        print(
+            f"{jobs:>2} jobs {elapsed * 1000:>8.0f} ms "
+            f"{faces / elapsed:>10.0f} faces/s {serial / elapsed:>6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Cold-start cost of finding one card in a full local collection
+
+Imports ~30k cards into a bulk JSON file, the SQLite card store and a
+memory-mapped card snapshot, then times fresh interpreters that each load
+one of them and look up a single card by name, as ``nyxfall --offline -e``
+would. Each run reports its resident memory once it has found the card, so
+the table shows both how long a lookup takes from a standing start and how
+much of the collection it had to bring into memory.
+
+Usage: python benchmarks/bench_snapshot.py [--runs 20] [--bulk oracle-cards.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from synthetic import load_cards
+from nyxfall.card_snapshot import write_snapshot
+from nyxfall.card_store import CardStore
+from nyxfall.decoding import card_from_json
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Each loader finds sys.argv[2] in the collection at sys.argv[1], then
+# prints its resident memory in KiB
+LOADERS = {
+    "bulk JSON": """
+import json, sys
+from nyxfall.decoding import card_from_json
+with open(sys.argv[1], encoding="utf-8") as fp:
+    cards = [card_from_json(card) for card in json.load(fp)]
+by_name = {card.name.lower(): card for card in cards}
+assert by_name[sys.argv[2].lower()]
+""",
+    "SQLite store": """
+import sys
+from pathlib import Path
+from nyxfall.card_store import CardStore
+from nyxfall.decoding import card_from_json
+assert card_from_json(CardStore(Path(sys.argv[1])).find_exact(sys.argv[2]))
+""",
+    "mmap snapshot": """
+import sys
+from pathlib import Path
+from nyxfall.card_snapshot import CardSnapshot
+assert CardSnapshot(Path(sys.argv[1])).find_exact(sys.argv[2])
+""",
+    "interpreter only": """
+import sys
+""",
+}
+# Peak RSS carries over from the benchmark across the fork, so the loader's
+# own resident memory is read once it has its answer (Linux only)
+REPORT_RSS = """
+with open("/proc/self/status") as fp:
+    print(next(line.split()[1] for line in fp if line.startswith("VmRSS:")))
+"""
+
+
+def run(loader: str, path: Path, name: str) -> tuple[float, int]:
+    """Runs a loader in a fresh interpreter, returning its wall time and RSS"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", loader + REPORT_RSS, str(path), name],
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, int(result.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    cards = load_cards(args.bulk)
+    name = cards[len(cards) // 2]["name"]
+    with tempfile.TemporaryDirectory() as directory:
+        bulk = Path(directory) / "oracle-cards.json"
+        bulk.write_text(json.dumps(cards))
+        store = CardStore(Path(directory) / "cards.sqlite3")
+        store.import_bulk(bulk)
+        snapshot = Path(directory) / "cards.snapshot"
+        write_snapshot(map(card_from_json, store.cards()), snapshot)
+        store.close()
+        paths = {
+            "bulk JSON": bulk,
+            "SQLite store": Path(directory) / "cards.sqlite3",
+            "mmap snapshot": snapshot,
+            "interpreter only": bulk,
+        }
+
+        print(f"{len(cards)} cards, looking up {name!r}")
+        print(f"{'loader':<20}{'file MB':>9}{'p50 ms':>10}{'RSS MB':>9}")
+        for label, loader in LOADERS.items():
+            results = [
+                run(loader, paths[label], name) for _ in range(args.runs)
+            ]
+            size = ""
+            if label != "interpreter only":
+                size = f"{paths[label].stat().st_size / 1e6:.1f}"
+            print(
+                f"{label:<20}{size:>9}"
+                f"{statistics.median(t for t, _ in results) * 1000:>10.1f}"
+                f"{max(rss for _, rss in results) / 1024:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Text wrapping throughput
+
+Wraps the oracle and flavor text of every face in a full card collection to
+the width of a card's text box, with ``textwrap`` as the renderer used to
+(one ``TextWrapper.wrap`` per paragraph) and with ``nyxfall.render``'s
+wrapper, bypassing its cache so every text is wrapped from scratch. Also
+counts the texts the two wrap differently, which should only be ones where
+``textwrap`` split a mana symbol, broke before an em dash or miscounted wide
+characters.
+
+Usage: python benchmarks/bench_wrap.py [--width 30] [--bulk oracle-cards.json]
+"""
+
+import argparse
+import time
+from pathlib import Path
+from textwrap import TextWrapper
+from synthetic import load_cards
+from nyxfall.render import _wrap
+from nyxfall.scryfall_requester import _map_response
+
+
+def textwrap_lines(text: str, width: int) -> tuple[str, ...]:
+    wrapper = TextWrapper(width)
+    return tuple(
+        line
+        for paragraph in text.splitlines()
+        for line in wrapper.wrap(paragraph) or [""]
+    )
+
+
+def nyxfall_lines(text: str, width: int) -> tuple[str, ...]:
+    return tuple(line for line, _ in _wrap.__wrapped__(text, width))
+
+
+def timed(label: str, texts: list[str], width: int, wrap) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        wrap(text, width)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<12} {len(texts):>6} texts {elapsed * 1000:>8.0f} ms "
+        f"{elapsed / len(texts) * 1e6:>8.1f} µs/text"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--bulk", type=Path, help="Scryfall bulk-data file")
+    args = parser.parse_args()
+
+    texts = [
+        text
+        for card in load_cards(args.bulk)
+        for face in _map_response(card).faces
+        for text in (face.oracle_text, face.flavor_text)
+        if text
+    ]
+
+    before = timed("textwrap", texts, args.width, textwrap_lines)
+    after = timed("nyxfall", texts, args.width, nyxfall_lines)
+    print(f"{'':<12} {before / after:>.2f}x faster")
+    differing = sum(
+        textwrap_lines(text, args.width) != nyxfall_lines(text, args.width)
+        for text in texts
+    )
+    print(f"{differing} of {len(texts)} texts wrapped differently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Records the card responses ``run_suite.py --fixtures`` replays
+
+Looks each card up on the live Scryfall API and saves the full card objects
+Scryfall sent, every field included, to ``fixtures/cards.json``. The cards
+cover the layouts nyxfall renders differently: plain spells, creatures with
+numeric and ``*`` power, a transform card and a split card.
+
+Usage: python benchmarks/record_fixtures.py [--output fixtures/cards.json]
+"""
+
+import argparse
+import json
+from pathlib import Path
+from nyxfall import scryfall_requester
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "fixtures" / "cards.json"
+NAMES = [
+    "Lightning Bolt",
+    "Counterspell",
+    "Llanowar Elves",
+    "Serra Angel",
+    "Delver of Secrets",
+    "Fire // Ice",
+    "Tarmogoyf",
+    "Sol Ring",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    # Straight from Scryfall, not from an earlier run's cached responses
+    scryfall_requester.configure_cache(enabled=False)
+    cards = []
+    for name in NAMES:
+        card = scryfall_requester.search_exact_json(name)
+        if card is None:
+            raise SystemExit(f"Scryfall has no card named '{name}'")
+        cards.append(card)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(cards, indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    print(f"Saved {len(cards)} cards to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
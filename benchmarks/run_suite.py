@@ -0,0 +1,231 @@
+"""Regression suite for the request → map → render pipeline
+
+Serves synthetic Scryfall-shaped responses (see ``synthetic.py``) from a
+local stand-in server through nyxfall's public functions and reports
+throughput and latency percentiles for each scenario:
+
+    exact   single ``search_exact`` lookups
+    search  a search spanning 12 pages of 175 cards
+    random  single ``search_random`` lookups
+    deck    a 60-card decklist resolved in one ``search_collection`` call
+    render  ``render_many`` over every card of a full set
+
+The response cache is disabled and the rate limit lifted so that only
+nyxfall's own work and the local round trips are measured.
+
+``--fixtures`` serves the real cards in ``fixtures/cards.json`` instead,
+which ``record_fixtures.py`` refreshes with every field Scryfall sends.
+There are only a few of them, so every scenario covers fewer cards and
+runs are compared against a baseline of their own.
+
+Results are compared against a JSON baseline. A scenario whose median
+latency is more than ``--threshold`` slower than its baseline fails the
+run. ``--update`` stores this run as the new baseline instead; baselines
+depend on the machine, so record one before comparing on a new one.
+
+Usage: python benchmarks/run_suite.py [--baseline FILE] [--threshold 0.25]
+       [--update] [--only exact,search] [--latency 0.0] [--fixtures]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+from stand_in import StandInServer
+from synthetic import generate_cards, search_pages
+from nyxfall import scryfall_requester
+from nyxfall.async_requester import search_collection
+from nyxfall.rate_limiter import RateLimiter
+from nyxfall.render import clear_caches, render_many
+from nyxfall.scryfall_requester import (
+    search_exact,
+    search_query,
+    search_random,
+)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+FIXTURES_BASELINE = DEFAULT_BASELINE.with_name("baseline-fixtures.json")
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "cards.json"
+SEARCH_PAGES = 12
+PAGE_SIZE = 175
+# Cards in a typical set, the unit bulk rendering is measured over
+SET_SIZE = 280
+DECK_SIZE = 60
+QUERY = "t:creature"
+
+# A scenario runs one operation and returns how many cards it handled
+Scenario = Callable[[], int]
+
+
+def build_scenarios(
+    server: StandInServer, cards: list[dict[str, Any]]
+) -> dict[str, tuple[int, Scenario]]:
+    """Loads the stand-in with responses and pairs each scenario with its repetitions"""
+    base = f"{server.url}/cards/"
+    named = cards[:100]
+    for card in named:
+        server.add(f"/cards/named?exact={card['name']}", card)
+    server.add("/cards/random", cards[0])
+    search = f"/cards/search?q={QUERY}+game:paper"
+    pages = search_pages(
+        cards[: SEARCH_PAGES * PAGE_SIZE], f"{server.url}{search}", PAGE_SIZE
+    )
+    for page, response in enumerate(pages, start=1):
+        server.add(f"{search}&page={page}", response)
+    server.add_cards(cards[:DECK_SIZE])
+    scryfall_requester.SCRYFALL_BASE = base
+
+    lookups = iter(range(sys.maxsize))
+    deck = [card["name"] for card in cards[:DECK_SIZE]]
+    full_set = [
+        scryfall_requester._map_response(card) for card in cards[:SET_SIZE]
+    ]
+
+    def exact() -> int:
+        card = named[next(lookups) % len(named)]
+        return int(search_exact(card["name"]) is not None)
+
+    def render() -> int:
+        # Cold frame caches, as a fresh process would have
+        clear_caches()
+        with open(os.devnull, "w", encoding="utf-8", buffering=1 << 16) as out:
+            render_many(full_set, out)
+        return len(full_set)
+
+    return {
+        "exact": (200, exact),
+        "search": (5, lambda: len(search_query(QUERY))),
+        "random": (200, lambda: int(search_random() is not None)),
+        "deck": (20, lambda: len(search_collection(deck))),
+        "render": (20, render),
+    }
+
+
+def measure(repetitions: int, scenario: Scenario) -> dict[str, float]:
+    """Runs a scenario and summarizes its latency and throughput"""
+    scenario()  # warm up connections and imports
+    latencies = []
+    items = 0
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        items += scenario()
+        latencies.append(time.perf_counter() - start)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "runs": repetitions,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "ops_per_s": repetitions / sum(latencies),
+        "cards_per_s": items / sum(latencies),
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Names the scenarios whose median latency regressed past the threshold"""
+    return [
+        name
+        for name, result in results.items()
+        if name in baseline
+        and result["p50_ms"] > baseline[name]["p50_ms"] * (1 + threshold)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown of a scenario's median latency, as a fraction",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="store this run as the new baseline",
+    )
+    parser.add_argument(
+        "--only", help="comma-separated scenarios to run (default: all)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="simulated server latency in seconds",
+    )
+    parser.add_argument(
+        "--fixtures",
+        action="store_true",
+        help="serve the recorded cards in fixtures/ instead of synthetic ones",
+    )
+    args = parser.parse_args()
+    if args.baseline is None:
+        args.baseline = (
+            FIXTURES_BASELINE if args.fixtures else DEFAULT_BASELINE
+        )
+
+    scryfall_requester.configure_cache(enabled=False)
+    scryfall_requester.rate_limiter = RateLimiter(rate=1_000_000)
+    if args.fixtures:
+        cards = json.loads(FIXTURES.read_text(encoding="utf-8"))
+    else:
+        cards = generate_cards(SEARCH_PAGES * PAGE_SIZE)
+    baseline = {}
+    if args.baseline.exists() and not args.update:
+        baseline = json.loads(args.baseline.read_text())["scenarios"]
+
+    results = {}
+    print(
+        f"{'scenario':<10}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'cards/s':>12}{'vs baseline':>14}"
+    )
+    with StandInServer({}, latency=args.latency) as server:
+        scenarios = build_scenarios(server, cards)
+        selected = args.only.split(",") if args.only else list(scenarios)
+        for name in selected:
+            repetitions, scenario = scenarios[name]
+            result = results[name] = measure(repetitions, scenario)
+            change = ""
+            if name in baseline:
+                change = (
+                    f"{result['p50_ms'] / baseline[name]['p50_ms'] - 1:+.0%}"
+                )
+            print(
+                f"{name:<10}{result['runs']:>6}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['cards_per_s']:>12.0f}{change:>14}"
+            )
+
+    if args.update or not baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {"python": sys.version.split()[0], "scenarios": results},
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if regressions := compare(results, baseline, args.threshold):
+        print(
+            f"\nSlower than baseline by more than {args.threshold:.0%}: "
+            + ", ".join(regressions)
+        )
+        sys.exit(1)
+    print(
+        f"\nNo scenario slower than baseline by more than {args.threshold:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Local HTTP server that replays canned Scryfall responses for benchmarks"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import unquote
+
+
+class StandInServer:
+    """Serves fixed JSON bodies keyed by request path and query
+
+    ``latency`` seconds are added to every response to mimic a round trip
+    to the real API. Cards added with ``add_cards`` are also answered by
+    name from ``POST /cards/collection``.
+    """
+
+    def __init__(self, responses: dict[str, Any], latency: float = 0.0):
+        self.responses: dict[str, bytes] = {}
+        for path, body in responses.items():
+            self.add(path, body)
+        self.latency = latency
+        self.requests = 0
+        self.cards_by_name: dict[str, Any] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def add(self, path: str, body: Any):
+        """Serves ``body`` as JSON for requests to ``path``, given unquoted"""
+        self.responses[path] = json.dumps(body).encode()
+
+    def add_cards(self, cards: list[dict[str, Any]]):
+        """Makes cards findable by name through the collection endpoint"""
+        for card in cards:
+            self.cards_by_name[card["name"].lower()] = card
+
+    def __enter__(self) -> "StandInServer":
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, which would otherwise
+            # stall each keep-alive response on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stand_in.requests += 1
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                body = stand_in.responses.get(unquote(self.path))
+                status = 200
+                if body is None:
+                    status, body = 404, b'{"object": "error"}'
+                self.reply(status, body)
+
+            def do_POST(self):
+                stand_in.requests += 1
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                length = int(self.headers.get("Content-Length", 0))
+                identifiers = json.loads(self.rfile.read(length)).get(
+                    "identifiers", []
+                )
+                found = [
+                    stand_in.cards_by_name[name]
+                    for name in (
+                        identifier.get("name", "").lower()
+                        for identifier in identifiers
+                    )
+                    if name in stand_in.cards_by_name
+                ]
+                self.reply(
+                    200,
+                    json.dumps({"object": "list", "data": found}).encode(),
+                )
+
+            def reply(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
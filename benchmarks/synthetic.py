@@ -0,0 +1,271 @@
+"""Deterministic Scryfall-shaped card data for benchmarks
+
+Real bulk dumps are hundreds of megabytes and can't be checked in, so every
+benchmark accepts ``--bulk FILE`` to run against one and otherwise falls back
+to a generated collection of about the same size and shape.
+"""
+
+import argparse
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from nyxfall.card_store import iter_bulk_cards, open_bulk_file
+
+FULL_COLLECTION_SIZE = 30_000
+ADJECTIVES = [
+    "Ancient",
+    "Blazing",
+    "Crimson",
+    "Dread",
+    "Eternal",
+    "Feral",
+    "Gilded",
+    "Hollow",
+    "Iron",
+    "Jade",
+    "Keen",
+    "Lurking",
+    "Mystic",
+    "Noble",
+    "Obsidian",
+    "Primal",
+    "Quiet",
+    "Radiant",
+    "Savage",
+    "Thorned",
+    "Unyielding",
+    "Verdant",
+    "Wandering",
+    "Zealous",
+]
+NOUNS = [
+    "Angel",
+    "Behemoth",
+    "Charm",
+    "Dragon",
+    "Elves",
+    "Familiar",
+    "Goblin",
+    "Hydra",
+    "Invocation",
+    "Juggernaut",
+    "Knight",
+    "Lich",
+    "Mentor",
+    "Nomad",
+    "Oracle",
+    "Phoenix",
+    "Quester",
+    "Revenant",
+    "Sphinx",
+    "Titan",
+    "Upheaval",
+    "Vampire",
+    "Wurm",
+    "Zombie",
+]
+SUFFIXES = ["", "", "", " of the Vale", " of Ruin", "'s Bargain", " Reborn"]
+TYPES = [
+    (
+        "Creature",
+        [
+            "Elf Druid",
+            "Goblin Warrior",
+            "Human Wizard",
+            "Dragon",
+            "Zombie",
+            "Angel",
+            "Spirit",
+            "Beast",
+        ],
+    ),
+    ("Instant", []),
+    ("Sorcery", []),
+    ("Enchantment", ["Aura", "Saga"]),
+    ("Artifact", ["Equipment", "Vehicle"]),
+    ("Land", []),
+    ("Planeswalker", ["Jace", "Chandra"]),
+]
+PHRASES = [
+    "Flying",
+    "Trample",
+    "Haste",
+    "Vigilance",
+    "Deathtouch",
+    "Lifelink",
+    "{T}: Add {G}.",
+    "When this creature enters, draw a card.",
+    "Counter target spell.",
+    "Destroy target creature.",
+    "This spell deals 3 damage to any target.",
+    "Search your library for a basic land card, put it onto the battlefield tapped, then shuffle.",
+    "Whenever another creature you control dies, each opponent loses 1 life.",
+    "{2}{W}, {T}: Create a 1/1 white Soldier creature token.",
+    "Return target creature card from your graveyard to your hand.",
+    "At the beginning of your upkeep, scry 1.",
+    "Equipped creature gets +2/+2 and has first strike.",
+    "Ward {2} (Whenever this permanent becomes the target of a spell or ability an opponent controls, counter it unless that player pays {2}.)",
+]
+FLAVOR = [
+    "If you feel the ground quake, run.",
+    "The sparkmage shrieked, calling on the rage of the storms of his youth.",
+    '"Try, if you must."',
+    None,
+    None,
+]
+SETS = ["lea", "m21", "xln", "neo", "mom", "clu", "fdn", "mh2", "dmu", "woe"]
+RARITIES = ["common", "common", "uncommon", "uncommon", "rare", "mythic"]
+COLORS = ["W", "U", "B", "R", "G"]
+
+
+def generate_cards(
+    count: int = FULL_COLLECTION_SIZE, seed: int = 0
+) -> list[dict[str, Any]]:
+    """Generates ``count`` distinct card objects shaped like Scryfall's"""
+    rng = random.Random(seed)
+    return [_card(rng, number) for number in range(count)]
+
+
+def load_cards(bulk: Optional[Path], count: int = FULL_COLLECTION_SIZE):
+    """Cards from a bulk file if one was given, otherwise synthetic ones"""
+    if bulk is None:
+        return generate_cards(count)
+    with open_bulk_file(bulk) as fp:
+        return list(iter_bulk_cards(fp))
+
+
+def search_pages(
+    cards: list[dict[str, Any]], base_url: str, page_size: int = 175
+) -> Iterator[dict[str, Any]]:
+    """Splits cards into ``/cards/search`` response pages"""
+    pages = max(1, -(-len(cards) // page_size))
+    for page in range(1, pages + 1):
+        response = {
+            "object": "list",
+            "total_cards": len(cards),
+            "has_more": page < pages,
+            "data": cards[(page - 1) * page_size : page * page_size],
+        }
+        if page < pages:
+            response["next_page"] = f"{base_url}&page={page + 1}"
+        yield response
+
+
+def _face(rng: random.Random, name: str) -> dict[str, Any]:
+    supertype, subtypes = rng.choice(TYPES)
+    type_line = supertype
+    if subtypes:
+        type_line += " — " + rng.choice(subtypes)
+    colors = sorted(rng.sample(COLORS, rng.choice([0, 1, 1, 1, 2, 3])))
+    generic = rng.randint(0, 6)
+    mana_cost = (
+        ""
+        if supertype == "Land"
+        else (
+            (f"{{{generic}}}" if generic else "")
+            + "".join(f"{{{color}}}" for color in colors)
+        )
+    )
+    face = {
+        "name": name,
+        "mana_cost": mana_cost,
+        "type_line": type_line,
+        "oracle_text": "\n".join(rng.sample(PHRASES, rng.randint(1, 3))),
+        "colors": colors,
+    }
+    if supertype == "Creature":
+        face["power"] = str(rng.randint(0, 8))
+        face["toughness"] = str(rng.randint(1, 8))
+    if flavor := rng.choice(FLAVOR):
+        face["flavor_text"] = flavor
+    return face
+
+
+def _card(rng: random.Random, number: int) -> dict[str, Any]:
+    name = (
+        f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        f"{rng.choice(SUFFIXES)} {number}"
+    )
+    card_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    set_code = rng.choice(SETS)
+    card = {
+        "object": "card",
+        "id": card_id,
+        "oracle_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "lang": "en",
+        "released_at": f"20{rng.randint(10, 24)}-0{rng.randint(1, 9)}-15",
+        "scryfall_uri": f"https://scryfall.com/card/{set_code}/{number}",
+        "games": ["paper", "mtgo"],
+        "set": set_code,
+        "rarity": rng.choice(RARITIES),
+        "color_identity": [],
+        "legalities": {
+            fmt: "legal"
+            for fmt in [
+                "standard",
+                "modern",
+                "legacy",
+                "vintage",
+                "commander",
+                "pauper",
+            ]
+        },
+        "image_uris": {
+            size: f"https://cards.scryfall.io/{size}/{card_id}.jpg"
+            for size in [
+                "small",
+                "normal",
+                "large",
+                "png",
+                "art_crop",
+                "border_crop",
+            ]
+        },
+        "prices": {
+            "usd": f"{rng.random() * 20:.2f}",
+            "usd_foil": None,
+            "eur": f"{rng.random() * 20:.2f}",
+            "tix": "0.03",
+        },
+        "purchase_uris": {
+            shop: f"https://{shop}.example/{card_id}"
+            for shop in ["tcgplayer", "cardmarket", "cardhoarder"]
+        },
+    }
+    if rng.random() < 0.05:
+        faces = [_face(rng, name), _face(rng, f"{name} Transformed")]
+        faces[1]["mana_cost"] = ""
+        card["name"] = f"{name} // {name} Transformed"
+        card["card_faces"] = faces
+        card["type_line"] = " // ".join(face["type_line"] for face in faces)
+        colors = faces[0]["colors"]
+    else:
+        card.update(_face(rng, name))
+        colors = card["colors"]
+    card["cmc"] = float(
+        sum(
+            int(symbol) if symbol.isdigit() else 1
+            for symbol in (
+                card.get("mana_cost")
+                or card.get("card_faces", [{}])[0].get("mana_cost", "")
+            )
+            .strip("{}")
+            .split("}{")
+            if symbol
+        )
+    )
+    card["color_identity"] = list(colors)
+    return card
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="write a synthetic bulk-data file"
+    )
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--count", type=int, default=FULL_COLLECTION_SIZE)
+    args = parser.parse_args()
+    with open(args.output, "w", encoding="utf-8") as fp:
+        json.dump(generate_cards(args.count), fp)
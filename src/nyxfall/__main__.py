@@ -1,26 +1,174 @@
 #!/usr/bin/env python
 import argparse
-from beaupy import select  # type: ignore
-from beaupy.spinners import Spinner  # type: ignore
+import io
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
+from nyxfall import daemon_client
 from nyxfall.card import Card
+from nyxfall.completion import COMPLETE_NAME_OPTION, SHELLS, completion_script
+from nyxfall.decoding import SearchPage, card_from_json
+from nyxfall.instrumentation import metrics
+from nyxfall.output import FORMATS
+from nyxfall.render import render_many
+from nyxfall.response_cache import default_cache_dir
 from nyxfall.scryfall_requester import (
+    configure_cache,
+    download_bulk,
+    fetch_bulk_manifest,
+    fetch_card_names,
+    get_cache,
+    iter_query,
     search_exact,
-    search_query,
+    search_exact_json,
     search_random,
+    search_random_json,
+    use_offline_store,
 )
 
+if TYPE_CHECKING:
+    from nyxfall.card_store import CardStore
+
+# Bytes of output collected before each write to the terminal when dumping many cards
+OUTPUT_BUFFER_SIZE = 1 << 16
+# Most names offered to the shell when completing a card name
+COMPLETION_LIMIT = 100
+
 
 def main():
     args = parse_args()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args)
+    except BrokenPipeError:
+        # Whatever was reading the output went away early (``| head``).
+        # Python flushes stdout again on exit, so it's pointed at devnull
+        # first to keep that from failing too
+        _discard_stdout()
+        sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if args.stats:
+            print(metrics.summary(), file=sys.stderr)
+        if args.stats_json:
+            print(json.dumps(metrics.snapshot()), file=sys.stderr)
+
+
+def _discard_stdout():
+    """Sends any further writes to stdout's file descriptor to devnull"""
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, fileno)
+    os.close(devnull)
+
+
+def run(args: argparse.Namespace):
+    """Carries out whichever action the arguments ask for"""
+    if args.completion:
+        print(completion_script(args.completion, build_parser()), end="")
+        return
+    if args.complete_name is not None:
+        for name in complete_names(args.complete_name):
+            print(name)
+        return
+    if args.clear_cache:
+        cache = get_cache()
+        if cache is not None:
+            cache.clear()
+        print("Cleared the response cache")
+        if not (args.sync_bulk or args.sync_names or _lookup_requested(args)):
+            return
+    configure_cache(enabled=not args.no_cache, refresh=args.refresh)
+    # Modules only some runs need are imported where they're used, so that
+    # a plain --exact lookup answered from the cache starts quickly
+    if args.sync_bulk or args.offline:
+        from nyxfall.card_snapshot import CardSnapshot, write_snapshot
+        from nyxfall.card_store import CardStore
+    if args.sync_bulk or args.sync_names:
+        from nyxfall.name_index import NameIndex
+    if args.sync_bulk:
+        store = CardStore()
+        source = args.sync_bulk if isinstance(args.sync_bulk, Path) else None
+        if sync_bulk(store, source, args.incremental):
+            NameIndex(store.names()).save()
+            write_snapshot(map(card_from_json, store.cards()))
+    if args.sync_names:
+        names = fetch_card_names()
+        if names:
+            NameIndex(names).save()
+            print(f"Saved {len(names)} card names for suggestions")
+        else:
+            print("Could not download the list of card names from Scryfall")
+    if (args.sync_bulk or args.sync_names) and not _lookup_requested(args):
+        return
+    if args.offline:
+        store = CardStore()
+        # Exact and random lookups are answered from the snapshot if there is
+        # one, without decoding anything from the store
+        snapshot = CardSnapshot.load()
+        if snapshot is None and not store.count():
+            print("No local card database found, import one with --sync-bulk")
+            return
+        use_offline_store(store, snapshot)
+    if args.serve:
+        from nyxfall.daemon import serve
+
+        serve(offline=args.offline)
+        return
+    if args.deck:
+        run_deck(args)
+        return
+    if args.pick:
+        run_picker(args)
+        return
+    # A daemon has its own cache settings, its work can't be measured from
+    # here and it renders on its own, so only hand it ordinary runs
+    if not (
+        args.no_daemon
+        or args.format != "frame"
+        or args.jobs > 1
+        or args.no_cache
+        or args.refresh
+        or args.stats
+        or args.stats_json
+        or args.profile
+    ) and run_via_daemon(args):
+        return
     run_cli(args)
 
 
+def _lookup_requested(args: argparse.Namespace) -> bool:
+    """Whether the arguments ask for cards, besides any cache or sync work"""
+    return bool(
+        args.query or args.random or args.deck or args.pick or args.serve
+    )
+
+
 def parse_args() -> argparse.Namespace:
     """Parses CLI arguments
 
     Returns:
         ``argparse.Namespace`` dictionary of arguments and their values
     """
+    return build_parser().parse_args()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Defines the CLI arguments, for parsing and for completion scripts"""
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "query", help="query to run against Scryfall", nargs="?"
@@ -40,42 +188,453 @@ def parse_args() -> argparse.Namespace:
         help="renders the card frame using only basic ASCII characters",
         action="store_true",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "-p",
+        "--pick",
+        help="choose a card by name, filtering names as you type (requires --sync-names)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--all",
+        help="print every card matching the query instead of choosing one",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="print cards as frames, or for other programs as json, ndjson, csv or oneline text, which print every match as it arrives",
+        choices=FORMATS,
+        default="frame",
+    )
+    parser.add_argument(
+        "--fields",
+        help="comma-separated Scryfall card fields to add to json, ndjson, csv and oneline output (e.g. rarity,prices)",
+        type=lambda fields: [field for field in fields.split(",") if field],
+        default=[],
+        metavar="FIELDS",
+    )
+    parser.add_argument(
+        "--columns",
+        help="most card frames to show side by side (default: as many as fit the terminal)",
+        type=int,
+        metavar="N",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="render --all output on N processes when there are enough cards to be worth it",
+        type=int,
+        default=1,
+        metavar="N",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="bypass the local response cache for this run",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--refresh",
+        help="ignore cached responses and store fresh ones from Scryfall",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        help="remove every response from the local cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--sync-bulk",
+        help="import a Scryfall bulk-data file into the local card database, downloading the latest one if no FILE is given",
+        metavar="FILE",
+        type=Path,
+        nargs="?",
+        # Not a path, so argparse leaves it as it is
+        const=True,
+    )
+    parser.add_argument(
+        "--incremental",
+        help="with --sync-bulk, only apply the cards that changed, and skip the download if Scryfall's dump hasn't been updated",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--sync-names",
+        help="download every card name from Scryfall to suggest names for typos",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--offline",
+        help="search the local card database instead of Scryfall",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-d",
+        "--deck",
+        help="render every card in an MTGA or MTGO decklist ('-' for stdin)",
+        metavar="FILE",
+        type=argparse.FileType("r", encoding="utf-8"),
+    )
+    parser.add_argument(
+        "--serve",
+        help="keep running and answer lookups from other nyxfall runs from memory",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        help="answer this run in process even if a nyxfall --serve is running",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stats",
+        help="print how long each stage of the run took to stderr",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stats-json",
+        help="print the timings and counters of each stage to stderr as JSON",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        help="save a cProfile dump of the run to FILE",
+        type=Path,
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--completion",
+        help="print a script completing options and card names for SHELL",
+        choices=SHELLS,
+        metavar="SHELL",
+    )
+    # Called by the completion scripts rather than by people
+    parser.add_argument(
+        COMPLETE_NAME_OPTION, metavar="PREFIX", help=argparse.SUPPRESS
+    )
+    return parser
+
+
+def sync_bulk(
+    store: "CardStore", source: Optional[Path], incremental: bool
+) -> bool:
+    """Imports a bulk-data file, or Scryfall's latest dump, into the card store
+
+    Args:
+        store: Store to import into
+        source: Bulk-data file, or None to download Scryfall's latest dump
+        incremental: True to only apply cards that changed since the last sync
+
+    Returns:
+        True if the stored cards may have changed
+    """
+    updated_at = None
+    download = None
+    if source is None:
+        manifest = fetch_bulk_manifest()
+        if manifest is None:
+            print("Could not find the latest bulk-data dump on Scryfall")
+            return False
+        updated_at = manifest.get("updated_at")
+        if incremental and updated_at and updated_at == store.updated_at():
+            print("The local card database is already up to date")
+            return False
+        print(f"Downloading cards updated at {updated_at}")
+        download = source = default_cache_dir() / "bulk-data.json"
+        if not download_bulk(manifest["download_uri"], download):
+            print("Could not download the bulk-data dump from Scryfall")
+            return False
+
+    print(f"Importing cards from {source}")
+    try:
+        if incremental:
+            changes = store.update_bulk(source, updated_at)
+            print(
+                f"Read {changes.read} cards: {changes.written} new or "
+                f"changed, {changes.removed} removed"
+            )
+            return bool(changes.written or changes.removed)
+        count = store.import_bulk(source, updated_at)
+        print(f"Imported {count} cards")
+        return True
+    except (OSError, ValueError) as error:
+        # A failed import is rolled back, leaving the stored cards as they were
+        print(f"Could not import cards from {source}: {error}")
+        return False
+    finally:
+        if download is not None:
+            download.unlink(missing_ok=True)
 
 
 def run_cli(args: argparse.Namespace):
     """Runs the CLI application based on the arguments provided"""
     if not args.query and not args.random:
         print("You must either supply a query or use the --random flag")
+    elif args.format != "frame":
+        write_cards(args)
     elif args.random:
-        for face in search_random().faces:
-            print(face.format_as_card(ascii_only=args.ascii))
+        print_card(search_random(), args)
     elif args.exact:
         card = search_exact(args.query)
         if card is not None:
-            for face in card.faces:
-                print(face.format_as_card(ascii_only=args.ascii))
+            print_card(card, args)
         else:
             print(f"Could not find a card with the name '{args.query}'")
+            print_suggestions(suggest_names(args.query))
     else:
+        from beaupy import select  # type: ignore
+        from beaupy.spinners import Spinner  # type: ignore
+        from nyxfall.lazy_cards import LazyCardList
+        from nyxfall.query import QueryError
+
         spinner = Spinner(text="Fetching cards")
         spinner.start()
-        cards = search_query(args.query)
+        try:
+            results = iter_query(args.query)
+        except QueryError as error:
+            spinner.stop()
+            print(f"Invalid query '{args.query}': {error}")
+            return
         spinner.stop()
-        if len(cards) == 1:
-            for face in cards[0].faces:
-                print(face.format_as_card(ascii_only=args.ascii))
-        elif cards:
-            selected_card: Card = select(
-                options=cards,  # type: ignore
-                preprocessor=lambda card: card.name,
-                pagination=True,
-                page_size=7,
-            )
-            for face in selected_card.faces:
-                print(face.format_as_card(ascii_only=args.ascii))
+        if args.all and results.total_cards:
+            with buffered_stdout() as out:
+                render_many(
+                    results,
+                    out,
+                    ascii_only=args.ascii,
+                    columns=args.columns,
+                    jobs=args.jobs,
+                )
+            return
+        # Show the selection as soon as the first page is in and let the
+        # rest of the pages arrive while the user is looking at it
+        cards = LazyCardList(results, results.total_cards)
+        cards.load_in_background()
+        try:
+            if len(cards) == 1:
+                print_card(cards[0], args)
+            elif cards:
+                selected_card: Card = select(
+                    options=cards,  # type: ignore
+                    preprocessor=lambda card: card.name,
+                    pagination=True,
+                    page_size=7,
+                )
+                print_card(selected_card, args)
+            else:
+                print(
+                    f"Could not find any cards matchng the query '{args.query}'"
+                )
+        finally:
+            # Pages still loading aren't needed once a card is chosen
+            cards.close()
+
+
+def write_cards(args: argparse.Namespace):
+    """Prints the cards a run asks for in a machine-readable format
+
+    Searches print every match, a page at a time as they arrive. Anything
+    meant for a person rather than the reading program goes to stderr.
+    """
+    from nyxfall.output import write_pages
+    from nyxfall.query import QueryError
+
+    pages: Iterable[SearchPage]
+    if args.random or args.exact:
+        # Fields nyxfall doesn't map are only kept when they're asked for
+        if args.fields:
+            if args.random:
+                found = search_random_json()
+            else:
+                found = search_exact_json(args.query)
+            card = None if found is None else card_from_json(found)
+            raw = [] if found is None else [found]
         else:
-            print(f"Could not find any cards matchng the query '{args.query}'")
+            card = search_random() if args.random else search_exact(args.query)
+            raw = []
+        if card is None:
+            print(
+                f"Could not find a card with the name '{args.query}'",
+                file=sys.stderr,
+            )
+        pages = [] if card is None else [SearchPage(cards=[card], raw=raw)]
+    else:
+        try:
+            pages = iter_query(args.query, bool(args.fields)).pages()
+        except QueryError as error:
+            print(f"Invalid query '{args.query}': {error}", file=sys.stderr)
+            return
+    with buffered_stdout() as out:
+        write_pages(pages, out, args.format, args.fields)
+
+
+def run_via_daemon(args: argparse.Namespace) -> bool:
+    """Hands the run to a running ``nyxfall --serve`` if there is one
+
+    Returns:
+        True if the daemon handled the run, False if it should run in process
+    """
+    # Choosing from a search runs in process, where the list shows as soon
+    # as the first page arrives instead of once the daemon has every page
+    if not (args.random or (args.query and (args.exact or args.all))):
+        return False
+    options = {
+        "offline": args.offline,
+        "ascii": args.ascii,
+        "columns": args.columns,
+        "width": shutil.get_terminal_size().columns,
+    }
+    if args.random:
+        answer = daemon_client.request({"op": "random", **options})
+    elif args.exact:
+        answer = daemon_client.request(
+            {"op": "exact", "name": args.query, **options}
+        )
+    else:
+        answer = daemon_client.request(
+            {"op": "render", "query": args.query, **options}
+        )
+
+    # A daemon answering from the other source than this run would give
+    # different cards, so the run goes ahead in process instead
+    if answer is None or answer.get("wrong_mode"):
+        return False
+    if not answer["ok"]:
+        print(answer["error"])
+    elif answer["output"] is not None:
+        sys.stdout.write(answer["output"])
+    elif args.exact:
+        print(f"Could not find a card with the name '{args.query}'")
+        print_suggestions(answer.get("suggestions", []))
+    else:
+        print(f"Could not find any cards matchng the query '{args.query}'")
+    return True
+
+
+def run_deck(args: argparse.Namespace):
+    """Resolves every card in a decklist in bulk and renders each one once"""
+    from nyxfall.async_requester import search_collection
+    from nyxfall.decklist import SECTION_TITLES, parse_decklist
+
+    with args.deck as deck:
+        entries = parse_decklist(deck.read())
+
+    with metrics.timer("resolve"):
+        cards = {
+            name.lower(): card
+            for name, card in search_collection(
+                entry.name for entry in entries
+            ).items()
+        }
+
+    rendered: set[str] = set()
+    for section, title in SECTION_TITLES.items():
+        section_entries = [e for e in entries if e.section == section]
+        if not section_entries:
+            continue
+        total = sum(entry.count for entry in section_entries)
+        print(f"{title} ({total})\n")
+        for entry in section_entries:
+            card = cards.get(entry.name.lower())
+            if card is None:
+                print(f"{entry.count}x {entry.name} (not found)\n")
+            elif card.name in rendered:
+                print(f"{entry.count}x {card.name} (shown above)\n")
+            else:
+                rendered.add(card.name)
+                print(f"{entry.count}x {card.name}")
+                print_card(card, args)
+
+
+def print_card(card: Card, args: argparse.Namespace):
+    """Prints every face of a card, side by side if the terminal is wide enough"""
+    render_many(
+        [card], sys.stdout, ascii_only=args.ascii, columns=args.columns
+    )
+
+
+def suggest_names(name: str) -> list[str]:
+    """Looks up names close to a misspelled one in the local name index
+
+    Returns:
+        Suggested names, or an empty list if no index has been synced
+    """
+    from nyxfall.name_index import NameIndex
+
+    index = NameIndex.load()
+    return [] if index is None else index.suggest(name)
+
+
+def run_picker(args: argparse.Namespace):
+    """Lets the user choose a card with the type-ahead picker and prints it
+
+    Cards around the highlighted name are fetched in the background while
+    the user is choosing, so the chosen one is usually ready by then.
+    """
+    from nyxfall.name_index import NameIndex
+    from nyxfall.picker import pick_name
+    from nyxfall.prefetch import Prefetcher
+
+    index = NameIndex.load()
+    if index is None:
+        print("No card names found, download them with --sync-names")
+        return
+    with Prefetcher(search_exact) as prefetcher:
+        name = pick_name(index, args.query or "", prefetcher)
+        if name is None:
+            return
+        card = prefetcher.get(name)
+    if card is None:
+        print(f"Could not find a card with the name '{name}'")
+    else:
+        print_card(card, args)
+
+
+def complete_names(prefix: str) -> list[str]:
+    """Lists names starting with a prefix for shell completion
+
+    A running daemon answers from the index it already has in memory,
+    otherwise the index is loaded from disk.
+
+    Returns:
+        Matching names, or an empty list if no index has been synced
+    """
+    answer = daemon_client.request(
+        {"op": "complete", "prefix": prefix, "limit": COMPLETION_LIMIT}
+    )
+    if answer is not None and answer["ok"]:
+        return answer["names"]
+    from nyxfall.name_index import NameIndex
+
+    index = NameIndex.load()
+    return [] if index is None else index.complete(prefix, COMPLETION_LIMIT)
+
+
+def print_suggestions(suggestions: list[str]):
+    """Prints names the user may have meant, if there are any"""
+    if suggestions:
+        print("Did you mean:")
+        for suggestion in suggestions:
+            print(f"  {suggestion}")
+
+
+@contextmanager
+def buffered_stdout() -> Iterator[TextIO]:
+    """Opens stdout with a large buffer for writing many cards at once
+
+    Falls back to ``sys.stdout`` itself when it isn't backed by a file descriptor
+    """
+    sys.stdout.flush()
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        yield sys.stdout
+        return
+    with open(
+        fileno,
+        "w",
+        encoding=sys.stdout.encoding,
+        buffering=OUTPUT_BUFFER_SIZE,
+        closefd=False,
+    ) as out:
+        yield out
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Iterable, Optional
+from nyxfall import scryfall_requester
+from nyxfall.card import Card
+
+# Most identifiers Scryfall accepts in a single /cards/collection request
+COLLECTION_BATCH_SIZE = 75
+# Batches allowed in flight at once. The shared rate limiter still spaces
+# their requests out, this just bounds the worker threads they occupy
+MAX_CONCURRENT_BATCHES = 4
+
+
+async def fetch_collection(names: Iterable[str]) -> dict[str, Optional[Card]]:
+    """Resolves many card names at once through Scryfall's collection endpoint
+
+    Names are de-duplicated and split into batches of 75, which are sent
+    concurrently through the shared session and rate limiter.
+
+    Args:
+        names: Exact card names, or names of one face of a card, in any case
+
+    Returns:
+        Dictionary of every requested name to its ``Card``, or None if it wasn't found
+    """
+    unique = list(
+        dict.fromkeys(name.strip() for name in names if name.strip())
+    )
+    if scryfall_requester.is_offline():
+        return {name: scryfall_requester.search_exact(name) for name in unique}
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+    batches = [
+        unique[start : start + COLLECTION_BATCH_SIZE]
+        for start in range(0, len(unique), COLLECTION_BATCH_SIZE)
+    ]
+    found: dict[str, Card] = {}
+    for cards in await asyncio.gather(
+        *(_fetch_batch(batch, semaphore) for batch in batches)
+    ):
+        for card in cards:
+            for name in _names_of(card):
+                found.setdefault(name, card)
+
+    return {name: found.get(name.lower()) for name in unique}
+
+
+def search_collection(names: Iterable[str]) -> dict[str, Optional[Card]]:
+    """Blocking wrapper around ``fetch_collection`` for synchronous callers
+
+    Args:
+        names: Exact card names, or names of one face of a card, in any case
+
+    Returns:
+        Dictionary of every requested name to its ``Card``, or None if it wasn't found
+    """
+    return asyncio.run(fetch_collection(names))
+
+
+async def _fetch_batch(
+    names: list[str], semaphore: asyncio.Semaphore
+) -> list[Card]:
+    async with semaphore:
+        # requests is blocking, so each batch runs on a worker thread where
+        # it waits for the shared rate limiter and retries like any request
+        return await asyncio.to_thread(
+            scryfall_requester.fetch_collection_batch, names
+        )
+
+
+def _names_of(card: Card) -> list[str]:
+    names = [card.name.lower()]
+    # A single-faced card's only face has the card's own name
+    if len(card.faces) > 1:
+        names.extend(face.name.lower() for face in card.faces)
+    return names
@@ -1,8 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from nyxfall.card_face import CardFace
 
+# Names of the fields of a face, in ``CardFace`` order
+FACE_FIELDS = tuple(field.name for field in fields(CardFace))
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Card:
     """A card with one or more faces to be displayed"""
 
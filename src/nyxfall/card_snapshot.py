@@ -0,0 +1,244 @@
+import mmap
+import os
+import random
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Iterable, Optional, Union, overload
+from nyxfall.card import FACE_FIELDS, Card
+from nyxfall.card_face import CardFace
+from nyxfall.response_cache import default_cache_dir
+
+SNAPSHOT_FILE = "cards.snapshot"
+MAGIC = b"NYXSNAP\0"
+# Bumping this makes saved snapshots be ignored until the next sync
+SNAPSHOT_VERSION = 1
+# Written in the machine's byte order, so a snapshot copied from a machine
+# with the other order reads back as a different number and is ignored
+BYTE_ORDER_MARK = 0x01020304
+# Magic, version, byte order mark, then the number of cards, faces, lookup
+# names and strings
+HEADER = struct.Struct("=8sIIIIII")
+# String ID standing for a field that's None
+NO_STRING = 0xFFFFFFFF
+
+
+def default_snapshot_path() -> Path:
+    """Path of the card snapshot kept in the nyxfall cache directory"""
+    return default_cache_dir() / SNAPSHOT_FILE
+
+
+def write_snapshot(cards: Iterable[Card], path: Optional[Path] = None) -> int:
+    """Saves cards as a snapshot that ``CardSnapshot`` can memory-map
+
+    Every distinct string is stored once, and each face field is a column of
+    4-byte IDs into that table. Lookup names are stored sorted, so finding a
+    card is a binary search over the file. The snapshot is written next to
+    its destination and moved into place, so a process reading the old one
+    is unaffected.
+
+    Args:
+        cards: Cards to save. Where several have the same name, lookups
+            find the first
+        path: File to write, defaulting to ``default_snapshot_path()``
+
+    Returns:
+        Number of cards written
+    """
+    path = path or default_snapshot_path()
+    strings: dict[str, int] = {}
+
+    def string_id(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        return strings.setdefault(value, len(strings))
+
+    names = array("I")
+    offsets = array("I", [0])
+    columns = {name: array("I") for name in FACE_FIELDS}
+    rows: dict[str, int] = {}
+    for row, card in enumerate(cards):
+        names.append(string_id(card.name))
+        # A card can be found by its own name or the name of any face
+        rows.setdefault(card.name.lower(), row)
+        for face in card.faces:
+            for name in FACE_FIELDS:
+                columns[name].append(string_id(getattr(face, name)))
+            rows.setdefault(face.name.lower(), row)
+        offsets.append(offsets[-1] + len(card.faces))
+
+    keys = sorted(rows)
+    key_ids = array("I", [string_id(key) for key in keys])
+    key_rows = array("I", [rows[key] for key in keys])
+    blob = bytearray()
+    string_offsets = array("I", [0])
+    for value in strings:
+        blob += value.encode("utf-8")
+        string_offsets.append(len(blob))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    with open(partial, "wb") as fp:
+        fp.write(
+            HEADER.pack(
+                MAGIC,
+                SNAPSHOT_VERSION,
+                BYTE_ORDER_MARK,
+                len(names),
+                offsets[-1],
+                len(keys),
+                len(strings),
+            )
+        )
+        for column in [
+            names,
+            offsets,
+            *columns.values(),
+            key_ids,
+            key_rows,
+            string_offsets,
+        ]:
+            column.tofile(fp)
+        fp.write(blob)
+    os.replace(partial, path)
+    return len(names)
+
+
+class CardSnapshot(Sequence[Card]):
+    """Read-only cards memory-mapped from a file written by ``write_snapshot``
+
+    Opening a snapshot only reads its header, and a card's faces are decoded
+    from the file when the card is read. Finding one card by name touches a
+    few pages of the file however many cards it holds, which the operating
+    system keeps cached between runs.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, mark, cards, faces, keys, strings = (
+                HEADER.unpack_from(self._mmap)
+            )
+        except struct.error:
+            self._mmap.close()
+            raise ValueError(f"{path} isn't a card snapshot")
+        if (magic, version, mark) != (
+            MAGIC,
+            SNAPSHOT_VERSION,
+            BYTE_ORDER_MARK,
+        ):
+            self._mmap.close()
+            raise ValueError(f"{path} isn't a compatible card snapshot")
+
+        self._view = memoryview(self._mmap)
+        position = HEADER.size
+
+        def column(length: int) -> memoryview:
+            nonlocal position
+            start, position = position, position + length * 4
+            return self._view[start:position].cast("I")
+
+        self._names = column(cards)
+        self._offsets = column(cards + 1)
+        self._columns = [column(faces) for _ in FACE_FIELDS]
+        self._keys = column(keys)
+        self._rows = column(keys)
+        self._string_offsets = column(strings + 1)
+        self._blob = self._view[position:]
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> Optional["CardSnapshot"]:
+        """Opens a saved snapshot
+
+        Args:
+            path: File written by ``write_snapshot``, defaulting to
+                ``default_snapshot_path()``
+
+        Returns:
+            The snapshot, or None if none has been saved or it was saved by
+            an incompatible version of nyxfall
+        """
+        try:
+            return cls(path or default_snapshot_path())
+        except (OSError, ValueError):
+            return None
+
+    def __enter__(self) -> "CardSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @overload
+    def __getitem__(self, index: int) -> Card: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Card]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Card, list[Card]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CardSnapshot index out of range")
+        rows = range(self._offsets[index], self._offsets[index + 1])
+        return Card(
+            faces=[self._face(row) for row in rows],
+            name=self._string(self._names[index]) or "",
+        )
+
+    def find_exact(self, name: str) -> Optional[Card]:
+        """Finds a card whose name, or the name of one of its faces, matches exactly
+
+        Args:
+            name: Name to look for, case-insensitively
+
+        Returns:
+            ``Card`` if one was found, None otherwise
+        """
+        key = name.strip().lower()
+        position = bisect_left(self._keys, key, key=self._string)
+        if (
+            position < len(self._keys)
+            and self._string(self._keys[position]) == key
+        ):
+            return self[self._rows[position]]
+        return None
+
+    def random(self) -> Optional[Card]:
+        """Picks a random card, or None if the snapshot is empty"""
+        return self[random.randrange(len(self))] if len(self) else None
+
+    def close(self):
+        """Unmaps the file. Cards already read stay usable"""
+        for view in [
+            self._names,
+            self._offsets,
+            *self._columns,
+            self._keys,
+            self._rows,
+            self._string_offsets,
+            self._blob,
+            self._view,
+        ]:
+            view.release()
+        self._mmap.close()
+
+    def _face(self, row: int) -> CardFace:
+        return CardFace(
+            *(self._string(column[row]) for column in self._columns)
+        )
+
+    def _string(self, string: int) -> Optional[str]:
+        if string == NO_STRING:
+            return None
+        start = self._string_offsets[string]
+        end = self._string_offsets[string + 1]
+        return str(self._blob[start:end], "utf-8")
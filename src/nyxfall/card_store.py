@@ -0,0 +1,553 @@
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    TextIO,
+    Union,
+    overload,
+)
+from nyxfall.query import CardIndex
+from nyxfall.response_cache import default_cache_dir
+
+# Bumping this migrates an existing store on next open
+SCHEMA_VERSION = 2
+# Number of cards written to the database per statement during an import
+IMPORT_BATCH_SIZE = 1000
+# Most cards read from the database per statement when reading search results
+FETCH_BATCH_SIZE = 500
+# Size of each read from a bulk file while streaming it
+READ_CHUNK_SIZE = 1 << 20
+# Fields nyxfall never reads that make up most of a bulk card object
+DROPPED_FIELDS = frozenset(
+    [
+        "prices",
+        "purchase_uris",
+        "related_uris",
+        "image_uris",
+        "legalities",
+        "multiverse_ids",
+        "all_parts",
+    ]
+)
+
+
+def iter_bulk_cards(fp: TextIO) -> Iterator[dict[str, Any]]:
+    """Lazily decodes the card objects of a Scryfall bulk-data JSON array
+
+    Only the card currently being decoded plus one read chunk are held in
+    memory, so arbitrarily large dumps can be imported.
+
+    Args:
+        fp: Text stream positioned at the start of a bulk-data file
+
+    Returns:
+        Iterator of card objects in file order
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Bulk data ended before the closing ']'")
+            chunk = fp.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise ValueError("Bulk data must be a JSON array of cards")
+            started = True
+            pos += 1
+        elif char == "]":
+            return
+        elif char == ",":
+            pos += 1
+        else:
+            try:
+                card, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The object straddles the end of the buffer, so read more
+                if eof:
+                    raise
+                chunk = fp.read(READ_CHUNK_SIZE)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield card
+
+
+def open_bulk_file(path: Path) -> TextIO:
+    """Opens a bulk-data file for streaming, transparently handling ``.gz``"""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+@dataclass
+class BulkChanges:
+    """What applying a bulk-data file to a ``CardStore`` changed
+
+    Attributes:
+        read: Cards read from the file
+        written: Cards that were new or whose content changed
+        removed: Stored cards that are no longer in the file
+    """
+
+    read: int = 0
+    written: int = 0
+    removed: int = 0
+
+
+class CardStore:
+    """Local SQLite database of Scryfall cards imported from bulk data
+
+    Holds one row per distinct card (the most recent paper printing), mirroring
+    the ``unique=cards`` behaviour of Scryfall's own search, plus an index of
+    every card and face name for exact lookups. The search indexes are built
+    whenever cards are imported and saved alongside them, so a search only
+    reads them back and decodes the cards it matches.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or default_cache_dir() / "cards.sqlite3"
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._index: Optional[CardIndex] = None
+        self._create_schema()
+
+    def import_bulk(self, path: Path, updated_at: Optional[str] = None) -> int:
+        """Replaces the stored cards with the contents of a bulk-data file
+
+        Args:
+            path: Path to an ``oracle_cards`` or ``default_cards`` dump
+            updated_at: When Scryfall generated the dump, if it came from the manifest
+
+        Returns:
+            Number of cards read from the file
+        """
+        with open_bulk_file(path) as fp:
+            with self._lock, self._conn:
+                self._index = None
+                self._conn.execute("DELETE FROM cards")
+                self._conn.execute("DELETE FROM card_names")
+                count = self._insert(iter_bulk_cards(fp))
+                self._write_index()
+                self._set_updated_at(updated_at)
+                return count
+
+    def update_bulk(
+        self, path: Path, updated_at: Optional[str] = None
+    ) -> BulkChanges:
+        """Applies only the differences between a bulk-data file and the stored cards
+
+        Cards are matched to the stored ones by oracle ID and compared by a
+        hash of their stored content, so only new and changed cards are
+        written and cards missing from the file are removed. Printings older
+        than the stored one are skipped without being compared. The result
+        is the same as ``import_bulk`` with far fewer writes, since most
+        cards don't change between dumps.
+
+        Args:
+            path: Path to an ``oracle_cards`` or ``default_cards`` dump
+            updated_at: When Scryfall generated the dump, if it came from the manifest
+
+        Returns:
+            Counts of the cards read, written and removed
+        """
+        changes = BulkChanges()
+        with open_bulk_file(path) as fp:
+            with self._lock, self._conn:
+                stored = {
+                    key: stored_row
+                    for key, *stored_row in self._conn.execute(
+                        "SELECT oracle_key, id, released_at, hash FROM cards"
+                    )
+                }
+                seen: set[str] = set()
+                written: set[str] = set()
+                batch: list[_Row] = []
+                for card in iter_bulk_cards(fp):
+                    changes.read += 1
+                    if "paper" not in card.get("games", ["paper"]):
+                        continue
+                    row = _Row.of(card)
+                    seen.add(row.key)
+                    if row.key in stored:
+                        card_id, released_at, content_hash = stored[row.key]
+                        if row.released_at < released_at or (
+                            row.id == card_id and row.hash == content_hash
+                        ):
+                            continue
+                    stored[row.key] = [row.id, row.released_at, row.hash]
+                    written.add(row.key)
+                    batch.append(row)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        self._replace_batch(batch)
+                        batch = []
+                self._replace_batch(batch)
+                changes.written = len(written)
+
+                removed = [(key,) for key in stored if key not in seen]
+                self._conn.executemany(
+                    "DELETE FROM card_names WHERE oracle_key = ?", removed
+                )
+                self._conn.executemany(
+                    "DELETE FROM cards WHERE oracle_key = ?", removed
+                )
+                changes.removed = len(removed)
+                if changes.written or changes.removed:
+                    self._index = None
+                    self._write_index()
+                self._set_updated_at(updated_at)
+        return changes
+
+    def updated_at(self) -> Optional[str]:
+        """When Scryfall generated the dump the store was last synced from
+
+        Returns:
+            The manifest's ``updated_at``, or None if the store was last
+            synced from a file
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM metadata WHERE key = 'updated_at'"
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def find_exact(self, name: str) -> Optional[dict[str, Any]]:
+        """Finds a card whose name, or the name of one of its faces, matches exactly
+
+        Args:
+            name: Name to look for, case-insensitively
+
+        Returns:
+            Scryfall card object if one was found, None otherwise
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM cards JOIN card_names USING (oracle_key) "
+                "WHERE card_names.name = ? ORDER BY released_at DESC LIMIT 1",
+                (name.strip().lower(),),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def find(self, query: str) -> Sequence[dict[str, Any]]:
+        """Finds every card matching a Scryfall-style search query
+
+        Args:
+            query: Query using the syntax supported by ``nyxfall.query``
+
+        Returns:
+            Matching Scryfall card objects sorted by name, each read from the
+            database when it's first accessed
+
+        Raises:
+            QueryError: If the query can't be parsed
+        """
+        return _StoredCards(self, self.index().find_ids(query))
+
+    def index(self) -> CardIndex:
+        """Reads the saved search indexes on first use
+
+        Stores imported before the indexes were saved have them built and
+        saved the first time they're searched.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = self._read_index()
+            if self._index is None:
+                with self._conn:
+                    self._index = self._write_index()
+            return self._index
+
+    def random(self) -> Optional[dict[str, Any]]:
+        """Picks a random stored card
+
+        Returns:
+            Scryfall card object, or None if the store is empty
+        """
+        with self._lock:
+            # Seek to a random rowid rather than ORDER BY random(), which sorts every row
+            row = self._conn.execute(
+                "SELECT data FROM cards WHERE rowid >= "
+                "(abs(random()) % (SELECT max(rowid) FROM cards)) + 1 "
+                "ORDER BY rowid LIMIT 1"
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def cards(self) -> Iterator[dict[str, Any]]:
+        """Every stored card, the most recently released first
+
+        Returns:
+            Iterator of Scryfall card objects, decoded as they're reached
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM cards ORDER BY released_at DESC"
+            ).fetchall()
+        return (json.loads(data) for (data,) in rows)
+
+    def names(self) -> list[str]:
+        """Names of every stored card, double-faced cards as ``Front // Back``"""
+        with self._lock:
+            return [
+                name
+                for (name,) in self._conn.execute("SELECT name FROM cards")
+            ]
+
+    def count(self) -> int:
+        """Number of distinct cards in the store"""
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT count(*) FROM cards"
+            ).fetchone()
+        return count
+
+    def close(self):
+        self._conn.close()
+
+    def _cards_at(self, positions: Sequence[int]) -> list[dict[str, Any]]:
+        # Cards by their position in the search indexes
+        found: dict[int, dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(positions), FETCH_BATCH_SIZE):
+                batch = list(positions[start : start + FETCH_BATCH_SIZE])
+                found.update(
+                    (position, json.loads(data))
+                    for position, data in self._conn.execute(
+                        "SELECT position, data FROM card_order "
+                        "JOIN cards USING (oracle_key) WHERE position IN "
+                        f"({', '.join('?' * len(batch))})",
+                        batch,
+                    )
+                )
+        return [found[position] for position in positions]
+
+    def _read_index(self) -> Optional[CardIndex]:
+        row = self._conn.execute("SELECT data FROM search_index").fetchone()
+        if row is None:
+            return None
+        (count,) = self._conn.execute(
+            "SELECT count(*) FROM card_order"
+        ).fetchone()
+        try:
+            return CardIndex.from_bytes(
+                row[0], _StoredCards(self, range(count))
+            )
+        except ValueError:
+            return None
+
+    def _write_index(self) -> CardIndex:
+        # Decoding every card to index it takes about a second for a full
+        # collection, so it's done once per import rather than per search
+        keys: dict[int, str] = {}
+        cards = []
+        for key, data in self._conn.execute(
+            "SELECT oracle_key, data FROM cards"
+        ):
+            card = json.loads(data)
+            keys[id(card)] = key
+            cards.append(card)
+        index = CardIndex(cards)
+        self._conn.execute("DELETE FROM card_order")
+        self._conn.executemany(
+            "INSERT INTO card_order (position, oracle_key) VALUES (?, ?)",
+            enumerate(keys[id(card)] for card in index.cards),
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO search_index (id, data) VALUES (0, ?)",
+            (index.to_bytes(),),
+        )
+        # The decoded cards aren't kept, they're read back as they're needed
+        index.cards = _StoredCards(self, range(len(index.cards)))
+        return index
+
+    def _insert(self, cards: Iterable[dict[str, Any]]) -> int:
+        total = 0
+        batch: list[_Row] = []
+        for card in cards:
+            total += 1
+            if "paper" not in card.get("games", ["paper"]):
+                continue
+            batch.append(_Row.of(card))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self._insert_batch(batch)
+                batch = []
+        self._insert_batch(batch)
+        return total
+
+    def _insert_batch(self, batch: list["_Row"]):
+        # Later printings of the same card replace earlier ones
+        self._conn.executemany(
+            "INSERT INTO cards (oracle_key, id, name, released_at, data, hash) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (oracle_key) DO UPDATE SET "
+            "id = excluded.id, name = excluded.name, "
+            "released_at = excluded.released_at, data = excluded.data, "
+            "hash = excluded.hash "
+            "WHERE excluded.released_at >= cards.released_at",
+            [
+                (
+                    row.key,
+                    row.id,
+                    row.name,
+                    row.released_at,
+                    row.data,
+                    row.hash,
+                )
+                for row in batch
+            ],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO card_names (name, oracle_key) VALUES (?, ?)",
+            [(name, row.key) for row in batch for name in row.names],
+        )
+
+    def _replace_batch(self, batch: list["_Row"]):
+        # A changed card may have been renamed, so its old names go first
+        self._conn.executemany(
+            "DELETE FROM card_names WHERE oracle_key = ?",
+            [(row.key,) for row in batch],
+        )
+        self._insert_batch(batch)
+
+    def _set_updated_at(self, updated_at: Optional[str]):
+        if updated_at is None:
+            self._conn.execute("DELETE FROM metadata WHERE key = 'updated_at'")
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) "
+                "VALUES ('updated_at', ?)",
+                (updated_at,),
+            )
+
+    def _create_schema(self):
+        with self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            tables = {
+                name
+                for (name,) in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+            if "cards" in tables and version < 2:
+                # Cards imported before content hashes were stored are
+                # rewritten by the next incremental sync
+                self._conn.execute(
+                    "ALTER TABLE cards ADD COLUMN hash TEXT NOT NULL DEFAULT ''"
+                )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cards ("
+                "oracle_key TEXT PRIMARY KEY, id TEXT NOT NULL, "
+                "name TEXT NOT NULL, released_at TEXT NOT NULL, "
+                "data TEXT NOT NULL, hash TEXT NOT NULL DEFAULT '')"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS card_names ("
+                "name TEXT NOT NULL, oracle_key TEXT NOT NULL, "
+                "PRIMARY KEY (name, oracle_key))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            # Saved search indexes, and the card at each position in them
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_index ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), data BLOB NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS card_order ("
+                "position INTEGER PRIMARY KEY, oracle_key TEXT NOT NULL)"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+class _StoredCards(Sequence[dict[str, Any]]):
+    """Cards of a store at some positions of its search indexes
+
+    Cards are read and decoded when they're accessed, a slice at a time, so
+    a search matching thousands of cards only decodes the ones shown.
+    """
+
+    def __init__(self, store: CardStore, positions: Sequence[int]):
+        self._store = store
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+        if isinstance(index, slice):
+            return self._store._cards_at(self._positions[index])
+        return self._store._cards_at([self._positions[index]])[0]
+
+
+@dataclass
+class _Row:
+    key: str
+    id: str
+    name: str
+    released_at: str
+    data: str
+    hash: str
+    names: list[str]
+
+    @classmethod
+    def of(cls, card: dict[str, Any]) -> "_Row":
+        key = _oracle_key(card)
+        trimmed = {
+            field: value
+            for field, value in card.items()
+            if field not in DROPPED_FIELDS
+        }
+        data = json.dumps(trimmed, separators=(",", ":"))
+        return cls(
+            key=key,
+            # Bulk cards always have an ID, hand-made ones may not
+            id=card.get("id") or key,
+            name=card.get("name", ""),
+            released_at=card.get("released_at", ""),
+            data=data,
+            hash=hashlib.blake2b(data.encode(), digest_size=16).hexdigest(),
+            names=[card.get("name", "").lower()]
+            + [
+                face.get("name", "").lower()
+                for face in card.get("card_faces", [])
+            ],
+        )
+
+
+def _oracle_key(card: dict[str, Any]) -> str:
+    # Reversible cards keep their oracle ID on each face rather than the card
+    if oracle_id := card.get("oracle_id"):
+        return oracle_id
+    for face in card.get("card_faces", []):
+        if oracle_id := face.get("oracle_id"):
+            return oracle_id
+    return card.get("id", card.get("name", ""))
@@ -0,0 +1,129 @@
+import argparse
+
+SHELLS = ("bash", "zsh", "fish")
+# Hidden option the scripts call to list names starting with what's been typed
+COMPLETE_NAME_OPTION = "--complete-name"
+
+_BASH = """\
+# bash completion for nyxfall, generated by `nyxfall --completion bash`
+_nyxfall() {{
+    local cur=${{COMP_WORDS[COMP_CWORD]}}
+    local prev=${{COMP_WORDS[COMP_CWORD-1]}}
+    case $prev in
+        {file_options})
+            COMPREPLY=($(compgen -f -- "$cur"))
+            return
+            ;;
+    esac
+    if [[ $cur == -* ]]; then
+        COMPREPLY=($(compgen -W "{options}" -- "$cur"))
+        return
+    fi
+    # Names have spaces in them, so complete them escaped, quote or not
+    cur=${{cur#[\\"\\']}}
+    local name
+    COMPREPLY=()
+    while IFS= read -r name; do
+        COMPREPLY+=("$(printf '%q' "$name")")
+    done < <(nyxfall {complete} "$cur" 2>/dev/null)
+}}
+complete -F _nyxfall nyxfall
+"""
+
+_ZSH = """\
+#compdef nyxfall
+# zsh completion for nyxfall, generated by `nyxfall --completion zsh`
+_nyxfall() {{
+    case ${{words[CURRENT-1]}} in
+        {file_options})
+            _files
+            return
+            ;;
+    esac
+    if [[ $PREFIX == -* ]]; then
+        compadd -- {options}
+        return
+    fi
+    local -a names
+    names=(${{(f)"$(nyxfall {complete} "$PREFIX" 2>/dev/null)"}})
+    # Names match regardless of case and accents, so let them replace the prefix
+    compadd -U -- $names
+}}
+compdef _nyxfall nyxfall
+"""
+
+_FISH_HEADER = """\
+# fish completion for nyxfall, generated by `nyxfall --completion fish`
+complete -c nyxfall -f -a '(nyxfall {complete} (commandline -ct) 2>/dev/null)'
+"""
+
+
+def completion_script(shell: str, parser: argparse.ArgumentParser) -> str:
+    """Generates a shell completion script for the nyxfall command
+
+    Options are completed from ``parser``. Card names are completed by
+    calling ``nyxfall --complete-name``, which answers from the local name
+    index (or a running daemon's copy of it), so completing never waits on
+    Scryfall.
+
+    Args:
+        shell: One of ``SHELLS``
+        parser: Parser of the nyxfall command line
+
+    Returns:
+        Script to source from the shell's startup file
+
+    Raises:
+        ValueError: If ``shell`` isn't supported
+    """
+    actions = [
+        action
+        for action in parser._actions
+        if action.option_strings and action.help != argparse.SUPPRESS
+    ]
+    options = " ".join(
+        option for action in actions for option in action.option_strings
+    )
+    file_options = "|".join(
+        option
+        for action in actions
+        if action.metavar == "FILE"
+        for option in action.option_strings
+    )
+    if shell == "bash":
+        return _BASH.format(
+            options=options,
+            file_options=file_options,
+            complete=COMPLETE_NAME_OPTION,
+        )
+    if shell == "zsh":
+        return _ZSH.format(
+            options=options,
+            file_options=file_options,
+            complete=COMPLETE_NAME_OPTION,
+        )
+    if shell == "fish":
+        lines = [_FISH_HEADER.format(complete=COMPLETE_NAME_OPTION).rstrip()]
+        for action in actions:
+            lines.append(_fish_option(action))
+        return "\n".join(lines) + "\n"
+    raise ValueError(f"Unsupported shell '{shell}'")
+
+
+def _fish_option(action: argparse.Action) -> str:
+    line = "complete -c nyxfall"
+    for option in action.option_strings:
+        if option.startswith("--"):
+            line += f" -l {option[2:]}"
+        else:
+            line += f" -s {option[1:]}"
+    if action.metavar == "FILE":
+        line += " -r -F"
+    elif action.choices:
+        line += f" -x -a '{' '.join(action.choices)}'"
+    elif action.nargs != 0:
+        line += " -x"
+    if action.help:
+        description = action.help.replace("'", "\\'")
+        line += f" -d '{description}'"
+    return line
@@ -0,0 +1,261 @@
+import asyncio
+import io
+import json
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+from nyxfall import daemon_client, scryfall_requester
+from nyxfall.card import Card
+from nyxfall.name_index import NameIndex
+from nyxfall.query import QueryError
+from nyxfall.render import render_many
+from nyxfall.response_cache import DEFAULT_TTL, ENDPOINT_TTLS
+
+# Searches and cards whose results are kept in memory, least recently used
+# dropped first
+QUERY_CACHE_SIZE = 64
+CARD_CACHE_SIZE = 1024
+
+
+class Daemon:
+    """Answers lookup and render requests from warm, in-memory state
+
+    Cards found by name and the results of recent searches are kept in
+    memory for as long as the response cache would keep them fresh, rendered
+    frames stay memoized and every request goes through the one keep-alive
+    session, so repeat lookups never touch the disk or the network.
+    Requests are handled on worker threads, so access to the in-memory
+    caches is locked.
+
+    A daemon started with ``--offline`` answers from the local card store,
+    so it only takes requests from runs that are offline too, and the other
+    way round.
+    """
+
+    def __init__(self, offline: bool = False):
+        self.offline = offline
+        # Each entry holds when it was fetched along with the result
+        self._cards: OrderedDict[str, tuple[float, Card]] = OrderedDict()
+        self._queries: OrderedDict[str, tuple[float, list[Card]]] = (
+            OrderedDict()
+        )
+        self._names: Optional[NameIndex] = None
+        self._lock = threading.Lock()
+
+    def handle(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Answers a single request of the protocol described in ``daemon_client.request``
+
+        Args:
+            message: Decoded request
+
+        Returns:
+            Answer to send back to the client
+        """
+        op = message.get("op")
+        if op != "ping" and message.get("offline", False) != self.offline:
+            mode = "offline" if self.offline else "online"
+            return {
+                "ok": False,
+                "wrong_mode": True,
+                "error": f"This daemon only answers {mode} lookups",
+            }
+        try:
+            if op == "ping":
+                return {"ok": True}
+            if op == "exact":
+                card = self.exact(message["name"])
+                if card is None:
+                    return {
+                        "ok": True,
+                        "output": None,
+                        "suggestions": self.suggest(message["name"]),
+                    }
+                return {"ok": True, "output": self._render([card], message)}
+            if op == "complete":
+                names = self.names().complete(
+                    message["prefix"], message.get("limit", 10)
+                )
+                return {"ok": True, "names": names}
+            if op == "random":
+                card = scryfall_requester.search_random()
+                return {"ok": True, "output": self._render([card], message)}
+            if op == "render":
+                cards = self.search(message["query"])
+                return {
+                    "ok": True,
+                    "output": self._render(cards, message) if cards else None,
+                }
+        except QueryError as error:
+            return {
+                "ok": False,
+                "error": f"Invalid query '{message['query']}': {error}",
+            }
+        except KeyError as error:
+            return {"ok": False, "error": f"Missing field {error}"}
+        return {"ok": False, "error": f"Unknown op '{op}'"}
+
+    def exact(self, name: str) -> Optional[Card]:
+        """Finds a card by exact name, remembering it for next time"""
+        key = name.lower()
+        card = self._recall(self._cards, key, "named")
+        if card is None:
+            card = scryfall_requester.search_exact(name)
+            if card is not None:
+                self._remember(self._cards, key, card, CARD_CACHE_SIZE)
+        return card
+
+    def names(self) -> NameIndex:
+        """Local name index, loaded the first time it's needed"""
+        with self._lock:
+            if self._names is None:
+                self._names = NameIndex.load() or NameIndex([])
+            return self._names
+
+    def suggest(self, name: str) -> list[str]:
+        """Suggests names close to a misspelled one from the local name index"""
+        return self.names().suggest(name)
+
+    def search(self, query: str) -> list[Card]:
+        """Runs a search, remembering its results for next time"""
+        cards = self._recall(self._queries, query, "search")
+        if cards is None:
+            cards = scryfall_requester.search_query(query)
+            self._remember(self._queries, query, cards, QUERY_CACHE_SIZE)
+        return cards
+
+    def _recall(
+        self,
+        entries: OrderedDict[str, tuple[float, Any]],
+        key: str,
+        endpoint: str,
+    ) -> Any:
+        # Results expire with the TTL the response cache gives the endpoint
+        # they came from
+        cache = scryfall_requester.get_cache()
+        ttl = (cache.ttls if cache else ENDPOINT_TTLS).get(
+            endpoint, DEFAULT_TTL
+        )
+        with self._lock:
+            if key not in entries:
+                return None
+            fetched_at, value = entries[key]
+            if time.monotonic() - fetched_at > ttl:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def _remember(
+        self,
+        entries: OrderedDict[str, tuple[float, Any]],
+        key: str,
+        value: Any,
+        limit: int,
+    ):
+        with self._lock:
+            entries[key] = (time.monotonic(), value)
+            entries.move_to_end(key)
+            while len(entries) > limit:
+                entries.popitem(last=False)
+
+    def _render(self, cards: list[Card], message: dict[str, Any]) -> str:
+        out = io.StringIO()
+        render_many(
+            cards,
+            out,
+            ascii_only=message.get("ascii", False),
+            columns=message.get("columns"),
+            width=message.get("width"),
+        )
+        return out.getvalue()
+
+
+async def start_server(
+    daemon: Daemon, path: Optional[Path] = None
+) -> asyncio.AbstractServer:
+    """Starts listening for clients on a Unix socket
+
+    Each client can send any number of requests over its connection, and
+    clients are served concurrently.
+
+    Args:
+        daemon: Daemon that answers the requests
+        path: Socket to listen on, defaulting to ``daemon_client.default_socket_path()``
+
+    Returns:
+        The listening server
+    """
+    path = path or daemon_client.default_socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    async def handle_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    answer = {"ok": False, "error": "Malformed request"}
+                else:
+                    answer = await _answer(daemon, message)
+                writer.write(json.dumps(answer).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle_connection, path)
+    # Only the user running the daemon may talk to it
+    os.chmod(path, 0o600)
+    return server
+
+
+def serve(path: Optional[Path] = None, offline: bool = False):
+    """Runs a daemon in the foreground until interrupted or terminated
+
+    The socket is removed when the daemon stops, whether by Ctrl+C or by
+    ``SIGTERM``.
+
+    Args:
+        path: Socket to listen on, defaulting to ``daemon_client.default_socket_path()``
+        offline: True if lookups are answered from the local card store
+    """
+    path = path or daemon_client.default_socket_path()
+    if daemon_client.request({"op": "ping"}, path) is not None:
+        print(f"A nyxfall daemon is already listening on {path}")
+        return
+
+    async def run():
+        server = await start_server(Daemon(offline), path)
+        stopped = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, stopped.set
+        )
+        print(f"Listening on {path}")
+        async with server:
+            await stopped.wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        path.unlink(missing_ok=True)
+
+
+async def _answer(daemon: Daemon, message: Any) -> dict[str, Any]:
+    if not isinstance(message, dict):
+        return {"ok": False, "error": "Malformed request"}
+    try:
+        # Lookups block on the network or SQLite, so they run on worker
+        # threads to keep other clients moving
+        return await asyncio.to_thread(daemon.handle, message)
+    except Exception as error:
+        # Keep serving other requests when Scryfall can't be reached
+        return {"ok": False, "error": f"Lookup failed: {error}"}
@@ -0,0 +1,54 @@
+import json
+import socket
+from pathlib import Path
+from typing import Any, Optional
+from nyxfall.response_cache import default_cache_dir
+
+SOCKET_NAME = "daemon.sock"
+# Seconds to wait for a daemon to accept a connection before giving up on it
+CONNECT_TIMEOUT = 0.5
+# Seconds to wait for an answer, long enough for the daemon to go to Scryfall
+REQUEST_TIMEOUT = 60.0
+
+
+def default_socket_path() -> Path:
+    """Finds the Unix socket ``nyxfall --serve`` listens on
+
+    Returns:
+        Path to the socket inside the nyxfall cache directory
+    """
+    return default_cache_dir() / SOCKET_NAME
+
+
+def request(
+    message: dict[str, Any], path: Optional[Path] = None
+) -> Optional[dict[str, Any]]:
+    """Sends one request to a running daemon and waits for its answer
+
+    Messages and answers are single lines of JSON. Every message has an
+    ``op`` (``ping``, ``exact``, ``complete``, ``random`` or ``render``)
+    and every answer has ``ok``, plus either the op's result or an ``error``.
+    Messages also say whether the run is ``offline``, and a daemon running
+    in the other mode answers with ``wrong_mode`` instead.
+
+    Args:
+        message: Request to send
+        path: Socket to connect to, defaulting to ``default_socket_path()``
+
+    Returns:
+        The daemon's answer, or None if no daemon is listening or it stopped responding
+    """
+    path = path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(REQUEST_TIMEOUT)
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    return json.loads(line) if line else None
@@ -0,0 +1,95 @@
+import re
+from dataclasses import dataclass
+
+# Headers used by MTGA exports and most deckbuilding sites, and the section they start
+SECTION_HEADERS = {
+    "deck": "main",
+    "main": "main",
+    "maindeck": "main",
+    "sideboard": "sideboard",
+    "commander": "commander",
+    "companion": "companion",
+    "maybeboard": "maybeboard",
+}
+SECTION_TITLES = {
+    "commander": "Commander",
+    "companion": "Companion",
+    "main": "Main deck",
+    "sideboard": "Sideboard",
+    "maybeboard": "Maybeboard",
+}
+# "4 Lightning Bolt", "4x Lightning Bolt" and MTGA's "4 Lightning Bolt (CLU) 141"
+ENTRY_RE = re.compile(
+    r"^(?P<count>\d+)x?\s+(?P<name>.+?)(?:\s+\([A-Za-z0-9]+\)(?:\s+\S+)?)?$"
+)
+
+
+@dataclass
+class DeckEntry:
+    """A card and how many copies of it a deck section contains
+
+    Attributes:
+        count: 4
+        name: Lightning Bolt
+        section: main
+    """
+
+    count: int
+    name: str
+    section: str
+
+
+def parse_decklist(text: str) -> list[DeckEntry]:
+    """Parses a decklist in MTGA or MTGO text format
+
+    Sections can be started by a header line (``Deck``, ``Sideboard``,
+    ``Commander`` ...), by MTGO's ``SB:`` prefix, or by the blank line MTGO
+    puts between the main deck and sideboard. Repeated lines for the same
+    card in a section are merged.
+
+    Args:
+        text: Contents of the decklist file
+
+    Returns:
+        Entries in the order their cards first appear
+    """
+    entries: dict[tuple[str, str], DeckEntry] = {}
+    section = "main"
+    saw_header = False
+    in_about = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            # Without headers, a blank line after the main deck starts the sideboard
+            if not saw_header and section == "main" and entries:
+                section = "sideboard"
+            continue
+        if line.startswith(("//", "#")):
+            continue
+        if line.lower() == "about":
+            in_about = True
+            continue
+        if line.lower().rstrip(":") in SECTION_HEADERS:
+            section = SECTION_HEADERS[line.lower().rstrip(":")]
+            saw_header = True
+            in_about = False
+            continue
+        if in_about:
+            continue
+
+        entry_section = section
+        if line.upper().startswith("SB:"):
+            entry_section = "sideboard"
+            line = line[3:].strip()
+        match = ENTRY_RE.match(line)
+        count, name = (
+            (int(match["count"]), match["name"]) if match else (1, line)
+        )
+        key = (entry_section, name.lower())
+        if key in entries:
+            entries[key].count += count
+        else:
+            entries[key] = DeckEntry(count, name, entry_section)
+
+    return list(entries.values())
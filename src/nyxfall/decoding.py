@@ -0,0 +1,209 @@
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+from nyxfall.card import Card
+from nyxfall.card_face import CardFace
+
+# Faster JSON libraries are used when they're installed. msgspec decodes
+# straight into structs holding only the fields nyxfall renders, skipping
+# prices, legalities, image and purchase URIs without building them at all
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Decoders in order of preference
+BACKENDS = ("msgspec", "orjson", "json")
+
+
+@dataclass
+class SearchPage:
+    """One page of a list response (``/cards/search``, ``/cards/collection``)
+
+    Attributes:
+        cards: Cards on this page
+        total_cards: Number of cards across every page, if Scryfall reported it
+        has_more: True if there's another page after this one
+        next_page: URL of the next page, if there is one
+        raw: Scryfall card objects the cards were mapped from, with every
+            field, if the page was decoded with ``keep_raw``
+    """
+
+    cards: list[Card] = field(default_factory=list)
+    total_cards: Optional[int] = None
+    has_more: bool = False
+    next_page: Optional[str] = None
+    raw: list[dict[str, Any]] = field(default_factory=list)
+
+
+def available_backends() -> list[str]:
+    """Lists the decoders that can be used in this environment"""
+    installed = {"msgspec": msgspec, "orjson": orjson, "json": json}
+    return [name for name in BACKENDS if installed[name] is not None]
+
+
+def use_backend(name: Optional[str] = None):
+    """Chooses which library decodes responses
+
+    Args:
+        name: One of ``BACKENDS``, or None for the fastest one installed
+
+    Raises:
+        ValueError: If the library isn't installed
+    """
+    global backend
+    available = available_backends()
+    if name is None:
+        name = available[0]
+    if name not in available:
+        raise ValueError(f"JSON backend '{name}' is not available")
+    backend = name
+
+
+def loads(body: Union[str, bytes]) -> Any:
+    """Decodes a JSON document into plain dictionaries and lists"""
+    if backend == "msgspec":
+        return msgspec.json.decode(body)
+    if backend == "orjson":
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def decode_card(body: Union[str, bytes]) -> Card:
+    """Decodes a single card object, keeping only the fields nyxfall renders"""
+    if backend == "msgspec":
+        return _card_from_struct(_card_decoder.decode(body))
+    return card_from_json(loads(body))
+
+
+def decode_page(body: Union[str, bytes], keep_raw: bool = False) -> SearchPage:
+    """Decodes a page of cards, keeping only the fields nyxfall renders
+
+    Args:
+        body: Undecoded list response
+        keep_raw: True to also keep every card object whole in ``raw``
+    """
+    if backend == "msgspec" and not keep_raw:
+        page = _page_decoder.decode(body)
+        return SearchPage(
+            cards=[_card_from_struct(card) for card in page.data],
+            total_cards=page.total_cards,
+            has_more=page.has_more,
+            next_page=page.next_page,
+        )
+    page = loads(body)
+    data = page.get("data", [])
+    return SearchPage(
+        cards=[card_from_json(card) for card in data],
+        total_cards=page.get("total_cards"),
+        has_more=page.get("has_more", False),
+        next_page=page.get("next_page"),
+        raw=data if keep_raw else [],
+    )
+
+
+def card_from_json(card: dict[str, Any]) -> Card:
+    """Builds a ``Card`` from an already decoded Scryfall card object"""
+    faces = card.get("card_faces")
+    if faces is None:
+        faces = [card]
+    return Card(
+        faces=[
+            _face(
+                face.get("name", ""),
+                face.get("scryfall_uri", ""),
+                face.get("mana_cost", ""),
+                face.get("type_line", ""),
+                face.get("power", None),
+                face.get("toughness", None),
+                face.get("oracle_text", ""),
+                face.get("flavor_text", None),
+                face.get("set", ""),
+            )
+            for face in faces
+        ],
+        name=card.get("name", ""),
+    )
+
+
+def _face(
+    name: str,
+    scryfall_uri: str,
+    mana_cost: str,
+    type_line: str,
+    power: Optional[str],
+    toughness: Optional[str],
+    oracle_text: str,
+    flavor_text: Optional[str],
+    set_code: str,
+) -> CardFace:
+    # Set codes, type lines, mana costs and stats repeat across thousands of
+    # cards, so intern them to share one copy of each between faces
+    return CardFace(
+        name=name,
+        scryfall_uri=scryfall_uri,
+        mana_cost=sys.intern(mana_cost),
+        type_line=sys.intern(type_line),
+        power=None if power is None else sys.intern(power),
+        toughness=None if toughness is None else sys.intern(toughness),
+        oracle_text=oracle_text,
+        flavor_text=flavor_text,
+        set=sys.intern(set_code.upper()),
+    )
+
+
+if msgspec is not None:
+
+    class _FaceFields(msgspec.Struct):
+        name: str = ""
+        scryfall_uri: str = ""
+        mana_cost: str = ""
+        type_line: str = ""
+        power: Optional[str] = None
+        toughness: Optional[str] = None
+        oracle_text: str = ""
+        flavor_text: Optional[str] = None
+        set: str = ""
+
+    class _CardFields(_FaceFields):
+        card_faces: Optional[list[_FaceFields]] = None
+
+    class _PageFields(msgspec.Struct):
+        data: list[_CardFields] = []
+        total_cards: Optional[int] = None
+        has_more: bool = False
+        next_page: Optional[str] = None
+
+    _card_decoder = msgspec.json.Decoder(_CardFields)
+    _page_decoder = msgspec.json.Decoder(_PageFields)
+
+
+def _card_from_struct(card: "_CardFields") -> Card:
+    faces = card.card_faces
+    if faces is None:
+        faces = [card]
+    return Card(
+        faces=[
+            _face(
+                face.name,
+                face.scryfall_uri,
+                face.mana_cost,
+                face.type_line,
+                face.power,
+                face.toughness,
+                face.oracle_text,
+                face.flavor_text,
+                face.set,
+            )
+            for face in faces
+        ],
+        name=card.name,
+    )
+
+
+backend = available_backends()[0]
@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Any, Callable
+
+# Called with the stage name and duration in seconds of every timed stage
+Listener = Callable[[str, float], None]
+
+
+class Metrics:
+    """Thread-safe timers and counters for the stages of a lookup
+
+    Stages are timed with ``timer`` and events are tallied with ``count``.
+    Besides ``--stats``, applications embedding nyxfall can read the totals
+    with ``snapshot`` or receive every timing as it's recorded through
+    ``add_listener``.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self._timers: dict[str, list[float]] = {}
+        self._counters: dict[str, int] = {}
+        self._listeners: list[Listener] = []
+        self._lock = threading.Lock()
+
+    def timer(self, stage: str) -> "_Timer":
+        """Times a block of code as one call of a stage
+
+        Args:
+            stage: Name of the stage (e.g. ``http``, ``decode``)
+
+        Returns:
+            Context manager recording the time spent inside it
+        """
+        return _Timer(self, stage)
+
+    def record(self, stage: str, seconds: float):
+        """Adds one call of a stage that took ``seconds``"""
+        with self._lock:
+            # Each timer is [calls, total seconds, slowest call]
+            timer = self._timers.setdefault(stage, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(stage, seconds)
+
+    def count(self, counter: str, amount: int = 1):
+        """Adds ``amount`` to a counter"""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def add_listener(self, listener: Listener):
+        """Calls ``listener`` with the stage and duration of every timing"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener):
+        """Stops calling a listener added with ``add_listener``"""
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def reset(self):
+        """Forgets every timing and count recorded so far"""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Copies the current totals into plain, JSON serializable data
+
+        Returns:
+            Dictionary with per-stage ``timers`` (calls, total, mean and max
+            milliseconds), raw ``counters`` and the response ``cache_hit_rate``,
+            which is None until the cache has been consulted
+        """
+        with self._lock:
+            timers = {
+                stage: {
+                    "calls": calls,
+                    "total_ms": total * 1000,
+                    "mean_ms": total * 1000 / calls,
+                    "max_ms": slowest * 1000,
+                }
+                for stage, (calls, total, slowest) in self._timers.items()
+            }
+            counters = dict(self._counters)
+        lookups = counters.get("cache.hits", 0) + counters.get(
+            "cache.misses", 0
+        )
+        return {
+            "timers": timers,
+            "counters": counters,
+            "cache_hit_rate": (
+                counters.get("cache.hits", 0) / lookups if lookups else None
+            ),
+        }
+
+    def summary(self) -> str:
+        """Formats the current totals as a table for people to read"""
+        snapshot = self.snapshot()
+        lines = [
+            f"{'stage':<16}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"
+        ]
+        for stage, timer in sorted(snapshot["timers"].items()):
+            lines.append(
+                f"{stage:<16}{timer['calls']:>8}{timer['total_ms']:>12.1f}"
+                f"{timer['mean_ms']:>10.2f}{timer['max_ms']:>10.2f}"
+            )
+        for counter, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{counter:<16}{value:>8}")
+        if snapshot["cache_hit_rate"] is not None:
+            lines.append(
+                f"{'cache hit rate':<16}{snapshot['cache_hit_rate']:>8.0%}"
+            )
+        return "\n".join(lines)
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics: Metrics, stage: str):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = self._metrics.clock()
+
+    def __exit__(self, *exc_info):
+        self._metrics.record(self._stage, self._metrics.clock() - self._start)
+
+
+# Shared by every module, like the rate limiter
+metrics = Metrics()
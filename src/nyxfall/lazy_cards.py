@@ -0,0 +1,88 @@
+import threading
+from collections.abc import Sequence
+from typing import Iterable, Union, overload
+from nyxfall.card import Card
+
+
+class LazyCardList(Sequence[Card]):
+    """Read-only list of cards that are pulled from an iterator as they're needed
+
+    Lets a selection list be shown as soon as the first page of a search
+    arrives. Reading an index past what has been loaded blocks until the
+    iterator reaches it, and ``load_in_background`` keeps filling the list on
+    a separate thread in the meantime, until ``close`` stops it.
+    """
+
+    def __init__(self, cards: Iterable[Card], total: int):
+        self._cards = cards
+        self._iterator = iter(cards)
+        self._total = total
+        self._loaded: list[Card] = []
+        self._exhausted = False
+        # Only one thread advances the iterator at a time. The others wait on
+        # this for it to finish, but cards already loaded are read without it
+        self._changed = threading.Condition()
+        self._pulling = False
+
+    def load_in_background(self) -> threading.Thread:
+        """Starts loading every remaining card on a daemon thread"""
+        thread = threading.Thread(target=self._load_all, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Stops loading cards, closing the source if it can be closed
+
+        Cards already loaded stay readable, and the list ends after them.
+        """
+        with self._changed:
+            self._exhausted = True
+        if close := getattr(self._cards, "close", None):
+            close()
+
+    def __len__(self) -> int:
+        # Trust the reported total until the iterator says otherwise
+        if self._exhausted:
+            return len(self._loaded)
+        return max(self._total, len(self._loaded))
+
+    @overload
+    def __getitem__(self, index: int) -> Card: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Card]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Card, list[Card]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            self._load_until(stop - 1)
+            return self._loaded[start:stop:step]
+        if index < 0:
+            index += len(self)
+        self._load_until(index)
+        return self._loaded[index]
+
+    def _load_until(self, index: int):
+        while len(self._loaded) <= index and not self._exhausted:
+            self._pull()
+
+    def _load_all(self):
+        while not self._exhausted:
+            self._pull()
+
+    def _pull(self):
+        with self._changed:
+            while self._pulling:
+                self._changed.wait()
+            if self._exhausted:
+                return
+            self._pulling = True
+        # Fetching the next page can take a while, so the lock isn't held
+        try:
+            self._loaded.append(next(self._iterator))
+        except StopIteration:
+            self._exhausted = True
+        finally:
+            with self._changed:
+                self._pulling = False
+                self._changed.notify_all()
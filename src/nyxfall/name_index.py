@@ -0,0 +1,252 @@
+import pickle
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+from nyxfall.response_cache import default_cache_dir
+
+NAME_INDEX_FILE = "card-names.idx"
+# Bumping this makes saved indexes be ignored until they're synced again
+INDEX_VERSION = 1
+# Candidates sharing the most of a misspelled name's rarer trigrams, which
+# are then compared on all of their trigrams
+FUZZY_CANDIDATES = 40
+# Best of those by trigram similarity, then ranked by edit distance, which is
+# too slow to compute against more than a handful of names
+RANKED_CANDIDATES = 10
+# Edits a suggestion may always need, however short the name typed
+MAX_EDITS = 3
+# Names sharing less than this fraction of their trigrams aren't suggested
+MIN_SIMILARITY = 0.3
+
+
+def fold(name: str) -> str:
+    """Normalizes a name for comparison, ignoring case and accents
+
+    Args:
+        name: Card name as typed or as Scryfall spells it
+
+    Returns:
+        Lowercase name without diacritics, so "Lim-Dûl" and "lim-dul" match
+    """
+    name = name.strip()
+    if name.isascii():
+        return name.lower()
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def default_index_path() -> Path:
+    """Path of the name index kept in the nyxfall cache directory"""
+    return default_cache_dir() / NAME_INDEX_FILE
+
+
+class NameIndex:
+    """In-memory index of every card name for completion and typo suggestions
+
+    Names are kept in a sorted array of their folded forms, so completing a
+    prefix is a binary search. Misspelled names are matched through an
+    index of the three-character sequences (trigrams) in each name, stored
+    as arrays of positions in the sorted names. Both are saved to disk
+    together, so loading an index doesn't rebuild either.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        by_folded: dict[str, str] = {}
+        for name in names:
+            parts = [name]
+            # Double-faced cards can be found by either face
+            if " // " in name:
+                parts.extend(name.split(" // "))
+            for part in parts:
+                if part.strip():
+                    by_folded.setdefault(fold(part), part.strip())
+        self._folded = sorted(by_folded)
+        self._names = [by_folded[folded] for folded in self._folded]
+        self._trigrams: Optional[dict[str, array]] = None
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> Optional["NameIndex"]:
+        """Reads a saved index
+
+        Args:
+            path: File written by ``save``, defaulting to ``default_index_path()``
+
+        Returns:
+            The index, or None if none has been saved or it was saved by an
+            incompatible version of nyxfall
+        """
+        try:
+            with open(path or default_index_path(), "rb") as fp:
+                saved = pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if (
+            not isinstance(saved, dict)
+            or saved.get("version") != INDEX_VERSION
+        ):
+            return None
+        index = cls.__new__(cls)
+        index._names = saved["names"]
+        index._folded = saved["folded"]
+        index._trigrams = saved["trigrams"]
+        return index
+
+    def save(self, path: Optional[Path] = None):
+        """Writes the index, including its trigram index, to disk"""
+        path = path or default_index_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as fp:
+            pickle.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "names": self._names,
+                    "folded": self._folded,
+                    "trigrams": self._trigram_index(),
+                },
+                fp,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        folded = fold(name)
+        position = bisect_left(self._folded, folded)
+        return (
+            position < len(self._folded) and self._folded[position] == folded
+        )
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """Finds names starting with a prefix
+
+        Args:
+            prefix: Start of a name, in any case and with or without accents
+            limit: Most names to return
+
+        Returns:
+            Matching names in alphabetical order
+        """
+        folded = fold(prefix)
+        matches = []
+        position = bisect_left(self._folded, folded)
+        while (
+            len(matches) < limit
+            and position < len(self._folded)
+            and self._folded[position].startswith(folded)
+        ):
+            matches.append(self._names[position])
+            position += 1
+        return matches
+
+    def suggest(self, name: str, limit: int = 5) -> list[str]:
+        """Finds the names most likely meant by a misspelled one
+
+        Names sharing the most of the rarest third of the trigrams in
+        ``name`` are shortlisted, then ranked by edit distance and, between
+        equally distant names, by how many trigrams they share. A typo changes
+        at most three trigrams, so the intended name still shares most of the
+        rare ones, while common ones like " of" would match thousands of
+        names for little benefit.
+
+        Args:
+            name: Name as typed
+            limit: Most suggestions to return
+
+        Returns:
+            Suggested names, best first
+        """
+        folded = fold(name)
+        if not folded:
+            return []
+        trigrams = _trigrams(folded)
+        index = self._trigram_index()
+        postings = sorted(
+            (index[trigram] for trigram in trigrams if trigram in index),
+            key=len,
+        )
+        shared: Counter[int] = Counter()
+        for positions in postings[: max(3, len(postings) // 3)]:
+            shared.update(positions)
+
+        similar = []
+        for position, _ in shared.most_common(FUZZY_CANDIDATES):
+            candidate = _trigrams(self._folded[position])
+            similarity = (
+                2
+                * len(trigrams & candidate)
+                / (len(trigrams) + len(candidate))
+            )
+            if similarity >= MIN_SIMILARITY:
+                similar.append((similarity, position))
+        similar.sort(reverse=True)
+
+        # Names needing edits to more than half their letters aren't
+        # suggested, and neither are names further away than the current top
+        # ``limit``, so stop measuring a name as soon as either is certain
+        furthest = max(MAX_EDITS, len(folded) // 2)
+        ranked: list[tuple[int, float, int]] = []
+        for similarity, position in similar[:RANKED_CANDIDATES]:
+            bound = furthest
+            if len(ranked) >= limit:
+                bound = min(bound, ranked[limit - 1][0])
+            distance = _edit_distance(folded, self._folded[position], bound)
+            if distance is not None:
+                insort(ranked, (distance, -similarity, position))
+        return [self._names[position] for _, _, position in ranked[:limit]]
+
+    def _trigram_index(self) -> dict[str, array]:
+        if self._trigrams is None:
+            postings: dict[str, list[int]] = {}
+            for position, folded in enumerate(self._folded):
+                for trigram in _trigrams(folded):
+                    postings.setdefault(trigram, []).append(position)
+            self._trigrams = {
+                trigram: array("I", positions)
+                for trigram, positions in postings.items()
+            }
+        return self._trigrams
+
+
+def _trigrams(folded: str) -> set[str]:
+    # Padding lets the first and last letters count as much as the middle ones
+    padded = f"  {folded} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(first: str, second: str, bound: int) -> Optional[int]:
+    # Levenshtein distance, or None if it's more than ``bound``. A shared
+    # prefix and suffix cost nothing, and only cells within ``bound`` of the
+    # diagonal can lead to a small enough distance, so only those are filled
+    start = 0
+    while (
+        start < min(len(first), len(second)) and first[start] == second[start]
+    ):
+        start += 1
+    first, second = first[start:], second[start:]
+    while first and second and first[-1] == second[-1]:
+        first, second = first[:-1], second[:-1]
+    if abs(len(first) - len(second)) > bound:
+        return None
+    beyond = bound + 1
+    previous = [j if j <= bound else beyond for j in range(len(second) + 1)]
+    for i, left in enumerate(first, start=1):
+        low = max(1, i - bound)
+        high = min(len(second), i + bound)
+        current = [i if i <= bound else beyond] + [beyond] * len(second)
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (left != second[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+        if min(current) > bound:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= bound else None
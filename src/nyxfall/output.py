@@ -0,0 +1,136 @@
+import csv
+import json
+from typing import Any, Iterable, Sequence, TextIO
+from nyxfall.card import FACE_FIELDS, Card
+from nyxfall.decoding import SearchPage
+from nyxfall.instrumentation import metrics
+
+# Ways cards can be printed. Frames are for reading, the rest for programs
+FORMATS = ("frame", "json", "ndjson", "csv", "oneline")
+# Joins the values of a field across the faces of a card, as Scryfall joins
+# the names of double-faced cards
+FACE_SEPARATOR = " // "
+
+
+def write_pages(
+    pages: Iterable[SearchPage],
+    out: TextIO,
+    format: str,
+    fields: Sequence[str] = (),
+) -> int:
+    """Writes cards in a machine-readable format a page at a time
+
+    Each page is written and flushed as soon as it arrives, so a program
+    reading the output can start on the first cards while later pages are
+    still being fetched, and only one page is held in memory at once.
+
+    ``json`` writes a single array and ``ndjson`` one object per line, each
+    with the card's name and a list of its faces. ``csv`` writes a header
+    and then a row per card, and ``oneline`` a line of text per card. Both
+    join the values of each field across faces with ``" // "``.
+
+    Args:
+        pages: Pages of cards, with ``raw`` filled in if ``fields`` are given
+        out: Stream to write to
+        format: One of ``FORMATS`` other than ``"frame"``
+        fields: Fields of Scryfall's card objects to add to each card, for
+            the ones nyxfall doesn't map
+
+    Returns:
+        Number of cards written
+
+    Raises:
+        ValueError: If ``format`` isn't a machine-readable format
+    """
+    if format not in FORMATS or format == "frame":
+        raise ValueError(f"Unsupported format '{format}'")
+    if format == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["name", *FACE_FIELDS[1:], *fields])
+    elif format == "json":
+        out.write("[")
+
+    written = 0
+    for page in pages:
+        with metrics.timer("render"):
+            for position, card in enumerate(page.cards):
+                extras = {
+                    field: (
+                        page.raw[position].get(field) if page.raw else None
+                    )
+                    for field in fields
+                }
+                if format == "csv":
+                    writer.writerow(_csv_row(card, extras))
+                elif format == "oneline":
+                    out.write(_oneline(card, extras) + "\n")
+                else:
+                    record = json.dumps(
+                        _record(card, extras), ensure_ascii=False
+                    )
+                    if format == "ndjson":
+                        out.write(record + "\n")
+                    else:
+                        out.write(
+                            ("\n  " if not written else ",\n  ") + record
+                        )
+                written += 1
+            out.flush()
+
+    if format == "json":
+        out.write("\n]\n" if written else "]\n")
+    return written
+
+
+def _record(card: Card, extras: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "name": card.name,
+        "faces": [
+            {field: getattr(face, field) for field in FACE_FIELDS}
+            for face in card.faces
+        ],
+        **extras,
+    }
+
+
+def _csv_row(card: Card, extras: dict[str, Any]) -> list[str]:
+    return [
+        card.name,
+        *(_joined(card, field) for field in FACE_FIELDS[1:]),
+        *(_text(value) for value in extras.values()),
+    ]
+
+
+def _oneline(card: Card, extras: dict[str, Any]) -> str:
+    # Name, cost, type, stats and set, leaving out whatever a face lacks
+    faces = []
+    for face in card.faces:
+        parts = [face.name, face.mana_cost, face.type_line]
+        if face.power is not None or face.toughness is not None:
+            parts.append(f"{face.power or ''}/{face.toughness or ''}")
+        faces.append("  ".join(part for part in parts if part))
+    parts = [
+        FACE_SEPARATOR.join(faces),
+        card.faces[0].set if card.faces else "",
+    ]
+    parts.extend(f"{field}={_text(value)}" for field, value in extras.items())
+    return "  ".join(part for part in parts if part)
+
+
+def _joined(card: Card, field: str) -> str:
+    values = [getattr(face, field) for face in card.faces]
+    if all(value is None for value in values):
+        return ""
+    # The set is the same on every face
+    if field == "set":
+        return values[0]
+    return FACE_SEPARATOR.join(value or "" for value in values)
+
+
+def _text(value: Any) -> str:
+    # Lists and objects such as prices stay readable as JSON in a single cell
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"))
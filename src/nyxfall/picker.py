@@ -0,0 +1,129 @@
+from typing import TYPE_CHECKING, Optional
+from nyxfall.name_index import NameIndex
+
+if TYPE_CHECKING:
+    from rich.text import Text
+    from nyxfall.prefetch import Prefetcher
+
+# Names listed under the typed text at once
+PICKER_ROWS = 10
+# Shortest text worth suggesting names for when no name starts with it
+MIN_SUGGEST_LENGTH = 3
+CURSOR_STYLE = "pink1"
+
+
+class TypeAhead:
+    """State of the type-ahead picker, updated one keystroke at a time
+
+    Every change to the typed text filters the names again straight from the
+    in-memory index: names starting with the text if there are any,
+    otherwise the names closest to it, so typos still lead somewhere.
+    Nothing is fetched until a name is chosen.
+
+    Attributes:
+        text: Text typed so far
+        matches: Names matching the text, best first
+        cursor: Position of the highlighted name in ``matches``
+    """
+
+    def __init__(
+        self, index: NameIndex, text: str = "", rows: int = PICKER_ROWS
+    ):
+        self.index = index
+        self.rows = rows
+        self.text = text
+        self.matches: list[str] = []
+        self.cursor = 0
+        self._filter()
+
+    @property
+    def selected(self) -> Optional[str]:
+        """Highlighted name, or None if nothing matches"""
+        return self.matches[self.cursor] if self.matches else None
+
+    def type(self, characters: str):
+        """Adds characters to the end of the typed text"""
+        self.text += characters
+        self._filter()
+
+    def backspace(self):
+        """Removes the last typed character"""
+        if self.text:
+            self.text = self.text[:-1]
+            self._filter()
+
+    def move(self, offset: int):
+        """Moves the highlight up (negative) or down, wrapping around"""
+        if self.matches:
+            self.cursor = (self.cursor + offset) % len(self.matches)
+
+    def render(self) -> "Text":
+        """Draws the typed text and matching names, highlighting the selection"""
+        from rich.text import Text
+
+        view = Text(f"> {self.text}")
+        for position, name in enumerate(self.matches):
+            if position == self.cursor:
+                view.append("\n> ", style=CURSOR_STYLE)
+                view.append(name, style="bold")
+            else:
+                view.append(f"\n  {name}")
+        if self.text and not self.matches:
+            view.append("\n  No matching card names", style="dim")
+        return view
+
+    def _filter(self):
+        self.cursor = 0
+        self.matches = self.index.complete(self.text, self.rows)
+        if not self.matches and len(self.text.strip()) >= MIN_SUGGEST_LENGTH:
+            self.matches = self.index.suggest(self.text, self.rows)
+
+
+def pick_name(
+    index: NameIndex,
+    text: str = "",
+    prefetcher: Optional["Prefetcher"] = None,
+) -> Optional[str]:
+    """Lets the user choose a card name, filtering the names as they type
+
+    Up and down move the highlight, enter chooses it and escape or Ctrl+C
+    gives up.
+
+    Args:
+        index: Names to choose from
+        text: Text to start with, as if the user had typed it
+        prefetcher: Told every time the highlight moves, to fetch cards near it
+
+    Returns:
+        The chosen name, or None if the user gave up
+    """
+    from beaupy import console  # type: ignore
+    from rich.live import Live
+    from yakh import get_key
+    from yakh.key import Keys
+
+    state = TypeAhead(index, text)
+    if prefetcher is not None:
+        prefetcher.focus(state.matches, state.cursor)
+    with Live(
+        state.render(), console=console, auto_refresh=False, transient=True
+    ) as live:
+        while True:
+            key = get_key()
+            if key == Keys.ENTER:
+                return state.selected
+            if key in (Keys.ESC, Keys.CTRL_C):
+                return None
+            if key in (Keys.UP_ARROW, Keys.NUMPAD_UP_ARROW):
+                state.move(-1)
+            elif key in (Keys.DOWN_ARROW, Keys.NUMPAD_DOWN_ARROW, Keys.TAB):
+                state.move(1)
+            elif key == Keys.BACKSPACE:
+                state.backspace()
+            elif key.is_printable:
+                state.type(str(key))
+            else:
+                continue
+            live.update(state.render(), refresh=True)
+            if prefetcher is not None:
+                prefetcher.focus(state.matches, state.cursor)
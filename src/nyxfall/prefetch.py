@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from nyxfall import scryfall_requester
+from nyxfall.card import Card
+from nyxfall.instrumentation import metrics
+
+# Cards fetched at once. The shared rate limiter still spaces the requests
+# out, this just bounds the worker threads they occupy
+PREFETCH_WORKERS = 2
+# Entries either side of the highlighted one that are fetched too
+PREFETCH_RADIUS = 1
+# Seconds an entry has to stay near the highlight before it's fetched, so
+# typing or scrolling past names doesn't send a request for each of them
+PREFETCH_DELAY = 0.1
+
+
+class Prefetcher:
+    """Fetches the cards around the highlighted entry of a list in the background
+
+    Each time the highlight moves, the cards it now rests on and beside are
+    queued on a thread pool and any queued fetches it has moved away from are
+    cancelled. By the time an entry is chosen its card has usually arrived,
+    so showing it doesn't wait on the network. Requests go through the usual
+    response cache and shared rate limiter.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[Callable[[str], Optional[Card]]] = None,
+        workers: int = PREFETCH_WORKERS,
+        radius: int = PREFETCH_RADIUS,
+        delay: float = PREFETCH_DELAY,
+    ):
+        self._fetch = fetch or scryfall_requester.search_exact
+        self._radius = radius
+        self._delay = delay
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="nyxfall-prefetch"
+        )
+        self._futures: dict[str, Future] = {}
+        self._wanted: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def focus(self, names: list[str], position: int):
+        """Moves the highlight, prefetching around it and cancelling the rest
+
+        Args:
+            names: Names currently listed
+            position: Index of the highlighted name in ``names``
+        """
+        # The highlighted card first, then its neighbours nearest first
+        wanted = []
+        for distance in range(self._radius + 1):
+            for neighbour in {position + distance, position - distance}:
+                if 0 <= neighbour < len(names):
+                    wanted.append(names[neighbour])
+        with self._lock:
+            self._wanted = set(wanted)
+            for name, future in list(self._futures.items()):
+                if name not in self._wanted and future.cancel():
+                    del self._futures[name]
+            for name in wanted:
+                future = self._futures.get(name)
+                if future is None or _stale(future):
+                    self._futures[name] = self._executor.submit(
+                        self._prefetch, name
+                    )
+
+    def get(self, name: str) -> Optional[Card]:
+        """Card for a name, from its prefetch if there was one
+
+        Waits for a prefetch that's still running rather than sending the
+        same request twice.
+
+        Returns:
+            The card, or None if no card has that name
+        """
+        with self._lock:
+            future = self._futures.get(name)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception:
+                # Skipped, or failed in the background, so try again now
+                pass
+        return self._fetch(name)
+
+    def close(self):
+        """Cancels every queued fetch without waiting for running ones"""
+        with self._lock:
+            self._wanted = set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prefetch(self, name: str) -> Optional[Card]:
+        time.sleep(self._delay)
+        with self._lock:
+            if name not in self._wanted:
+                raise _Skipped(name)
+        metrics.count("prefetch.requests")
+        return self._fetch(name)
+
+
+class _Skipped(Exception):
+    # The highlight moved away while the fetch was waiting to start
+    pass
+
+
+def _stale(future: Future) -> bool:
+    # Fetches that never ran or failed are worth queueing again
+    return future.cancelled() or (
+        future.done() and future.exception() is not None
+    )
@@ -0,0 +1,734 @@
+import operator
+import pickle
+import re
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Sequence, Union
+
+# Canonical field names for every supported search keyword
+KEYWORDS = {
+    "n": "name",
+    "name": "name",
+    "t": "type",
+    "type": "type",
+    "o": "oracle",
+    "oracle": "oracle",
+    "c": "color",
+    "color": "color",
+    "colors": "color",
+    "id": "identity",
+    "ci": "identity",
+    "identity": "identity",
+    "cmc": "cmc",
+    "mv": "cmc",
+    "manavalue": "cmc",
+    "pow": "power",
+    "power": "power",
+    "tou": "toughness",
+    "toughness": "toughness",
+    "s": "set",
+    "e": "set",
+    "set": "set",
+    "edition": "set",
+    "r": "rarity",
+    "rarity": "rarity",
+}
+COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    ":": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+COLOR_BITS = {"w": 1, "u": 2, "b": 4, "r": 8, "g": 16}
+COLOR_NAMES = {
+    "white": "w",
+    "blue": "u",
+    "black": "b",
+    "red": "r",
+    "green": "g",
+    "azorius": "wu",
+    "dimir": "ub",
+    "rakdos": "br",
+    "gruul": "rg",
+    "selesnya": "gw",
+    "orzhov": "wb",
+    "izzet": "ur",
+    "golgari": "bg",
+    "boros": "rw",
+    "simic": "gu",
+    "bant": "gwu",
+    "esper": "wub",
+    "grixis": "ubr",
+    "jund": "brg",
+    "naya": "rgw",
+    "abzan": "wbg",
+    "jeskai": "urw",
+    "sultai": "bgu",
+    "mardu": "rwb",
+    "temur": "gur",
+}
+RARITIES = ["common", "uncommon", "rare", "special", "mythic", "bonus"]
+
+TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\()
+        | (?P<rparen>\))
+        | (?P<neg>-)(?=[^\s)])
+        | (?P<key>[a-zA-Z]+)(?P<op>!=|<=|>=|:|=|<|>)(?P<value>"[^"]*"|[^\s()]+)
+        | (?P<word>"[^"]*"|[^\s()]+)
+    )""",
+    re.VERBOSE,
+)
+WORD_RE = re.compile(r"[a-z0-9]+")
+# Bumping this makes saved indexes be ignored until they're rebuilt
+INDEX_VERSION = 1
+
+
+class QueryError(ValueError):
+    """Raised when a search query can't be parsed"""
+
+
+@dataclass(frozen=True)
+class Term:
+    """A single ``field op value`` condition such as ``t:goblin`` or ``mv<=2``"""
+
+    field: str
+    op: str
+    value: str
+
+
+@dataclass(frozen=True)
+class Not:
+    child: "Node"
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple["Node", ...]
+
+
+Node = Union[Term, Not, And, Or]
+
+
+def parse(query: str) -> Node:
+    """Parses a Scryfall-style search query
+
+    Bare words match card names. ``and`` is implied between terms, ``or``
+    binds more loosely, ``-`` negates a term or group and parentheses group.
+
+    Args:
+        query: Query such as ``t:goblin (c:r or c:b) -o:haste mv<=2``
+
+    Returns:
+        Syntax tree of the query
+
+    Raises:
+        QueryError: If the query is malformed or uses an unsupported keyword
+    """
+    tokens = _tokenize(query)
+    node, pos = _parse_or(tokens, 0)
+    if pos != len(tokens):
+        raise QueryError(f"Unexpected '{tokens[pos][1]}' in query")
+    return node
+
+
+class CardIndex:
+    """In-memory indexes over a collection of Scryfall card objects
+
+    Text fields get inverted indexes over their words, numeric fields sorted
+    arrays and colors, sets and rarities hash buckets, so queries only touch
+    the cards that can match instead of scanning the whole collection. The
+    indexes are kept in flat arrays, so ``to_bytes`` can save them and
+    ``from_bytes`` read them back far faster than they can be rebuilt.
+    """
+
+    def __init__(self, cards: Iterable[dict[str, Any]]):
+        # Cards are numbered in name order so sorted IDs are sorted results
+        self.cards: Sequence[dict[str, Any]] = sorted(
+            cards, key=lambda card: card.get("name", "")
+        )
+        self.all_ids = frozenset(range(len(self.cards)))
+        self._text = {
+            field: _TextIndex() for field in ["name", "type", "oracle"]
+        }
+        self._numeric = {
+            field: _NumericIndex() for field in ["cmc", "power", "toughness"]
+        }
+        self._colors = {
+            field: _ColorIndex() for field in ["color", "identity"]
+        }
+        self._buckets: dict[str, dict[str, array]] = {
+            "set": {},
+            "rarity": {},
+        }
+        for card_id, card in enumerate(self.cards):
+            self._add(card_id, card)
+        for numeric in self._numeric.values():
+            numeric.freeze(len(self.cards))
+        for text in self._text.values():
+            text.freeze()
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, cards: Sequence[dict[str, Any]]
+    ) -> "CardIndex":
+        """Reads indexes saved by ``to_bytes``
+
+        Args:
+            data: Saved indexes
+            cards: Cards the indexes were built over, in the order of
+                ``cards`` when they were saved. Only the cards that match a
+                search are read from it
+
+        Returns:
+            The indexes, answering searches over ``cards``
+
+        Raises:
+            ValueError: If ``data`` was saved by an incompatible version of
+                nyxfall, or for a different number of cards
+        """
+        try:
+            saved = pickle.loads(data)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            raise ValueError("Not a saved card index")
+        if (
+            not isinstance(saved, dict)
+            or saved.get("version") != INDEX_VERSION
+            or saved.get("size") != len(cards)
+        ):
+            raise ValueError("Saved card index doesn't match the cards")
+        index = cls.__new__(cls)
+        index.cards = cards
+        index.all_ids = frozenset(range(len(cards)))
+        index._text = saved["text"]
+        index._numeric = saved["numeric"]
+        index._colors = saved["colors"]
+        index._buckets = saved["buckets"]
+        return index
+
+    def to_bytes(self) -> bytes:
+        """Saves the indexes, without the cards themselves, for ``from_bytes``"""
+        return pickle.dumps(
+            {
+                "version": INDEX_VERSION,
+                "size": len(self.cards),
+                "text": self._text,
+                "numeric": self._numeric,
+                "colors": self._colors,
+                "buckets": self._buckets,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    def search(self, query: str) -> list[dict[str, Any]]:
+        """Finds every card matching a query
+
+        Args:
+            query: Scryfall-style search query
+
+        Returns:
+            Matching card objects sorted by name
+        """
+        return [self.cards[card_id] for card_id in self.find_ids(query)]
+
+    def find_ids(self, query: str) -> list[int]:
+        """Finds the positions in ``cards`` of every card matching a query
+
+        Args:
+            query: Scryfall-style search query
+
+        Returns:
+            Positions of the matching cards, which are in name order
+        """
+        return sorted(self.compile(parse(query)).execute(None))
+
+    def compile(self, node: Node) -> "_Plan":
+        """Turns a syntax tree into an executable plan bound to these indexes"""
+        if isinstance(node, And):
+            return _AllOf(
+                self, [self.compile(child) for child in node.children]
+            )
+        if isinstance(node, Or):
+            return _AnyOf([self.compile(child) for child in node.children])
+        if isinstance(node, Not):
+            return _Without(self, self.compile(node.child))
+        return self._compile_term(node)
+
+    def _compile_term(self, term: Term) -> "_Plan":
+        if term.field in self._text:
+            if term.op not in (":", "="):
+                raise QueryError(f"'{term.field}' only supports ':'")
+            return _TextLookup(self._text[term.field], term.value.lower())
+        if term.field in self._numeric:
+            try:
+                value = float(term.value)
+            except ValueError:
+                raise QueryError(f"'{term.value}' is not a number")
+            return _NumericLookup(self._numeric[term.field], term.op, value)
+        if term.field in self._colors:
+            return _ColorLookup(
+                self._colors[term.field],
+                _color_predicate(term.field, term.op, term.value.lower()),
+            )
+        if term.field == "rarity":
+            rank = _rarity_rank(term.value.lower())
+            compare = COMPARISONS[term.op]
+            keys = [r for r in RARITIES if compare(RARITIES.index(r), rank)]
+        elif term.op in (":", "="):
+            keys = [term.value.lower()]
+        else:
+            raise QueryError(f"'{term.field}' only supports ':'")
+        return _BucketLookup(self._buckets[term.field], keys)
+
+    def _add(self, card_id: int, card: dict[str, Any]):
+        faces = card.get("card_faces") or [card]
+        self._text["name"].add(card_id, card.get("name", ""))
+        self._text["type"].add(
+            card_id,
+            card.get("type_line")
+            or " // ".join(face.get("type_line", "") for face in faces),
+        )
+        self._text["oracle"].add(
+            card_id,
+            card.get("oracle_text")
+            or "\n".join(face.get("oracle_text", "") for face in faces),
+        )
+        if "cmc" in card:
+            self._numeric["cmc"].add(card_id, float(card["cmc"]))
+        for face in faces:
+            for field in ["power", "toughness"]:
+                if (value := _stat_value(face.get(field))) is not None:
+                    self._numeric[field].add(card_id, value)
+        colors = card.get("colors")
+        if colors is None:
+            colors = [c for face in faces for c in face.get("colors", [])]
+        self._colors["color"].add(card_id, colors)
+        self._colors["identity"].add(card_id, card.get("color_identity", []))
+        # Cards are added in ID order, so each bucket stays sorted
+        self._buckets["set"].setdefault(
+            card.get("set", "").lower(), array("I")
+        ).append(card_id)
+        self._buckets["rarity"].setdefault(
+            card.get("rarity", "").lower(), array("I")
+        ).append(card_id)
+
+
+class _TextIndex:
+    """Inverted index from words to the cards whose text contains them
+
+    Once frozen, the cards containing each word are stored one word after
+    another in a single array, in the words' sorted order, so the cards with
+    any word starting with a prefix are one slice of it.
+    """
+
+    def __init__(self):
+        self.texts: list[str] = []
+        self.vocabulary: list[str] = []
+        self.offsets = array("I", [0])
+        self.ids = array("I")
+        self._postings: dict[str, set[int]] = {}
+
+    def add(self, card_id: int, text: str):
+        # Cards are added in ID order, so each text is at its card's ID
+        text = text.lower()
+        self.texts.append(text)
+        for word in WORD_RE.findall(text):
+            self._postings.setdefault(word, set()).add(card_id)
+
+    def freeze(self):
+        self.vocabulary = sorted(self._postings)
+        for word in self.vocabulary:
+            self.ids.extend(sorted(self._postings[word]))
+            self.offsets.append(len(self.ids))
+        self._postings = {}
+
+    def span(self, prefix: str) -> tuple[int, int]:
+        """Slice of ``ids`` with the cards containing a word that starts with ``prefix``
+
+        A card with several such words is in the slice once for each.
+        """
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + "\uffff", start)
+        return self.offsets[start], self.offsets[end]
+
+
+class _NumericIndex:
+    """Values sorted alongside their cards, answering range queries by bisection
+
+    Each card's own values are kept too, for checking cards one at a time.
+    """
+
+    def __init__(self):
+        self.values = array("d")
+        self.ids = array("I")
+        self.card_offsets = array("I", [0])
+        self.card_values = array("d")
+        self._pairs: list[tuple[float, int]] = []
+
+    def add(self, card_id: int, value: float):
+        self._pairs.append((value, card_id))
+
+    def freeze(self, size: int):
+        self._pairs.sort()
+        self.values = array("d", [value for value, _ in self._pairs])
+        self.ids = array("I", [card_id for _, card_id in self._pairs])
+        by_card: list[list[float]] = [[] for _ in range(size)]
+        for value, card_id in self._pairs:
+            by_card[card_id].append(value)
+        for values in by_card:
+            self.card_values.extend(values)
+            self.card_offsets.append(len(self.card_values))
+        self._pairs = []
+
+    def of(self, card_id: int) -> array:
+        """Values of one card"""
+        start = self.card_offsets[card_id]
+        return self.card_values[start : self.card_offsets[card_id + 1]]
+
+    def bounds(self, op: str, value: float) -> list[tuple[int, int]]:
+        """Slices of ``values`` and ``ids`` whose values satisfy ``op value``"""
+        low = bisect_left(self.values, value)
+        high = bisect_right(self.values, value)
+        end = len(self.values)
+        return {
+            ":": [(low, high)],
+            "=": [(low, high)],
+            "!=": [(0, low), (high, end)],
+            "<": [(0, low)],
+            "<=": [(0, high)],
+            ">": [(high, end)],
+            ">=": [(low, end)],
+        }[op]
+
+
+class _ColorIndex:
+    """Cards bucketed by the bitmask of their colors"""
+
+    def __init__(self):
+        self.buckets: dict[int, array] = {}
+        self.masks = array("B")
+
+    def add(self, card_id: int, colors: Iterable[str]):
+        mask = 0
+        for color in colors:
+            mask |= COLOR_BITS.get(color.lower(), 0)
+        self.masks.append(mask)
+        self.buckets.setdefault(mask, array("I")).append(card_id)
+
+
+class _Plan(ABC):
+    @abstractmethod
+    def estimate(self) -> int:
+        """Upper bound on the number of cards this plan can return"""
+
+    @abstractmethod
+    def execute(self, within: Optional[set[int]]) -> set[int]:
+        """Runs the plan, restricted to ``within`` when it isn't None"""
+
+
+class _Lookup(_Plan):
+    """A leaf of the plan that reads from one index
+
+    When the cards still in play are fewer than the index would return, it's
+    cheaper to test each of them directly than to materialise the lookup.
+    """
+
+    def execute(self, within: Optional[set[int]]) -> set[int]:
+        if within is not None and len(within) < self.estimate():
+            return {card_id for card_id in within if self.matches(card_id)}
+        found = self.lookup()
+        return found if within is None else found & within
+
+    @abstractmethod
+    def lookup(self) -> set[int]:
+        """Every card the index holds for this lookup"""
+
+    @abstractmethod
+    def matches(self, card_id: int) -> bool:
+        """Whether a single card satisfies this lookup"""
+
+
+class _TextLookup(_Lookup):
+    def __init__(self, index: _TextIndex, phrase: str):
+        self.index = index
+        self.phrase = phrase
+        self.words = WORD_RE.findall(phrase)
+        # Phrases with punctuation or several words need their candidates checked
+        self.verify = self.words != [phrase]
+        self._spans = sorted(
+            (index.span(word) for word in self.words),
+            key=lambda span: span[1] - span[0],
+        )
+        # The same rule as the index, for checking cards one at a time: each
+        # word has to start a word of the text
+        self._word_starts = [
+            re.compile(rf"(?<![a-z0-9]){re.escape(word)}")
+            for word in self.words
+        ]
+
+    def estimate(self) -> int:
+        if not self._spans:
+            return len(self.index.texts)
+        start, end = self._spans[0]
+        return end - start
+
+    def lookup(self) -> set[int]:
+        if not self._spans:
+            return {
+                card_id
+                for card_id, text in enumerate(self.index.texts)
+                if self.phrase in text
+            }
+        start, end = self._spans[0]
+        found = set(self.index.ids[start:end])
+        for start, end in self._spans[1:]:
+            found.intersection_update(self.index.ids[start:end])
+        if self.verify:
+            return {card_id for card_id in found if self.matches(card_id)}
+        return found
+
+    def matches(self, card_id: int) -> bool:
+        text = self.index.texts[card_id]
+        if (not self.words or self.verify) and self.phrase not in text:
+            return False
+        return all(word.search(text) for word in self._word_starts)
+
+
+class _NumericLookup(_Lookup):
+    def __init__(self, index: _NumericIndex, op: str, value: float):
+        self.index = index
+        self.compare = COMPARISONS[op]
+        self.value = value
+        self.slices = index.bounds(op, value)
+
+    def estimate(self) -> int:
+        return sum(end - start for start, end in self.slices)
+
+    def lookup(self) -> set[int]:
+        return set().union(
+            *(self.index.ids[start:end] for start, end in self.slices)
+        )
+
+    def matches(self, card_id: int) -> bool:
+        return any(
+            self.compare(value, self.value) for value in self.index.of(card_id)
+        )
+
+
+class _ColorLookup(_Lookup):
+    def __init__(self, index: _ColorIndex, predicate: Callable[[int], bool]):
+        self.index = index
+        self.predicate = predicate
+        self.masks = [mask for mask in index.buckets if predicate(mask)]
+
+    def estimate(self) -> int:
+        return sum(len(self.index.buckets[mask]) for mask in self.masks)
+
+    def lookup(self) -> set[int]:
+        return set().union(*(self.index.buckets[mask] for mask in self.masks))
+
+    def matches(self, card_id: int) -> bool:
+        return self.predicate(self.index.masks[card_id])
+
+
+class _BucketLookup(_Lookup):
+    def __init__(self, buckets: dict[str, array], keys: list[str]):
+        self.found = [buckets[key] for key in keys if key in buckets]
+
+    def estimate(self) -> int:
+        return sum(len(bucket) for bucket in self.found)
+
+    def lookup(self) -> set[int]:
+        return set().union(*self.found)
+
+    def matches(self, card_id: int) -> bool:
+        # Buckets are sorted, so a card is found by bisection
+        for bucket in self.found:
+            position = bisect_left(bucket, card_id)
+            if position < len(bucket) and bucket[position] == card_id:
+                return True
+        return False
+
+
+class _AllOf(_Plan):
+    """Intersection of several plans, run most selective first
+
+    Each step only considers the cards that survived the previous ones, and
+    negated children are subtracted last rather than complemented.
+    """
+
+    def __init__(self, index: CardIndex, children: list[_Plan]):
+        self.index = index
+        self.positive = sorted(
+            (child for child in children if not isinstance(child, _Without)),
+            key=lambda child: child.estimate(),
+        )
+        self.negative = [
+            child.child for child in children if isinstance(child, _Without)
+        ]
+
+    def estimate(self) -> int:
+        if not self.positive:
+            return len(self.index.all_ids)
+        return self.positive[0].estimate()
+
+    def execute(self, within: Optional[set[int]]) -> set[int]:
+        found = within
+        for child in self.positive:
+            found = child.execute(found)
+            if not found:
+                return set()
+        if found is None:
+            found = set(self.index.all_ids)
+        for child in self.negative:
+            found = found - child.execute(found)
+        return found
+
+
+class _AnyOf(_Plan):
+    def __init__(self, children: list[_Plan]):
+        self.children = children
+
+    def estimate(self) -> int:
+        return sum(child.estimate() for child in self.children)
+
+    def execute(self, within: Optional[set[int]]) -> set[int]:
+        return set().union(*(child.execute(within) for child in self.children))
+
+
+class _Without(_Plan):
+    def __init__(self, index: CardIndex, child: _Plan):
+        self.index = index
+        self.child = child
+
+    def estimate(self) -> int:
+        return len(self.index.all_ids)
+
+    def execute(self, within: Optional[set[int]]) -> set[int]:
+        base = set(self.index.all_ids) if within is None else within
+        return base - self.child.execute(base)
+
+
+def _tokenize(query: str) -> list[tuple[str, Any]]:
+    tokens: list[tuple[str, Any]] = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        match = TOKEN_RE.match(query, pos)
+        if match is None or match.end() == pos:
+            raise QueryError(f"Couldn't parse '{query[pos:]}'")
+        pos = match.end()
+        if match["lparen"]:
+            tokens.append(("(", "("))
+        elif match["rparen"]:
+            tokens.append((")", ")"))
+        elif match["neg"]:
+            tokens.append(("-", "-"))
+        elif match["key"]:
+            field = KEYWORDS.get(match["key"].lower())
+            if field is None:
+                raise QueryError(f"Unsupported keyword '{match['key']}'")
+            tokens.append(
+                ("term", Term(field, match["op"], match["value"].strip('"')))
+            )
+        elif match["word"].lower() in ("and", "or"):
+            tokens.append((match["word"].lower(), match["word"]))
+        else:
+            tokens.append(
+                ("term", Term("name", ":", match["word"].strip('"')))
+            )
+    return tokens
+
+
+def _parse_or(tokens: list[tuple[str, Any]], pos: int) -> tuple[Node, int]:
+    children = []
+    node, pos = _parse_and(tokens, pos)
+    children.append(node)
+    while pos < len(tokens) and tokens[pos][0] == "or":
+        node, pos = _parse_and(tokens, pos + 1)
+        children.append(node)
+    return (children[0] if len(children) == 1 else Or(tuple(children))), pos
+
+
+def _parse_and(tokens: list[tuple[str, Any]], pos: int) -> tuple[Node, int]:
+    children = []
+    while pos < len(tokens) and tokens[pos][0] not in ("or", ")"):
+        if tokens[pos][0] == "and":
+            pos += 1
+            continue
+        node, pos = _parse_unary(tokens, pos)
+        children.append(node)
+    if not children:
+        raise QueryError("Expected a search term")
+    return (children[0] if len(children) == 1 else And(tuple(children))), pos
+
+
+def _parse_unary(tokens: list[tuple[str, Any]], pos: int) -> tuple[Node, int]:
+    kind, value = tokens[pos]
+    if kind == "-":
+        if pos + 1 >= len(tokens):
+            raise QueryError("Expected a search term after '-'")
+        node, pos = _parse_unary(tokens, pos + 1)
+        return Not(node), pos
+    if kind == "(":
+        node, pos = _parse_or(tokens, pos + 1)
+        if pos >= len(tokens) or tokens[pos][0] != ")":
+            raise QueryError("Missing ')'")
+        return node, pos + 1
+    if kind == "term":
+        return value, pos + 1
+    raise QueryError(f"Unexpected '{value}' in query")
+
+
+def _color_predicate(field: str, op: str, value: str) -> Callable[[int], bool]:
+    letters = COLOR_NAMES.get(value, value)
+    if letters in ("m", "multicolor"):
+        return lambda mask: mask.bit_count() >= 2
+    if letters in ("c", "colorless"):
+        letters = ""
+    if any(letter not in COLOR_BITS for letter in letters):
+        raise QueryError(f"'{value}' is not a color")
+    wanted = 0
+    for letter in letters:
+        wanted |= COLOR_BITS[letter]
+    if op == ":":
+        # Colors match at least the given colors, identity at most them
+        op = "<=" if field == "identity" else ">="
+    if wanted == 0 and op in (":", ">=", "="):
+        op = "="
+    return {
+        "=": lambda mask: mask == wanted,
+        "!=": lambda mask: mask != wanted,
+        ">=": lambda mask: mask & wanted == wanted,
+        ">": lambda mask: mask & wanted == wanted and mask != wanted,
+        "<=": lambda mask: mask & ~wanted == 0,
+        "<": lambda mask: mask & ~wanted == 0 and mask != wanted,
+    }[op]
+
+
+def _rarity_rank(value: str) -> int:
+    for rank, rarity in enumerate(RARITIES):
+        if rarity.startswith(value):
+            return rank
+    raise QueryError(f"'{value}' is not a rarity")
+
+
+def _stat_value(stat: Optional[str]) -> Optional[float]:
+    # Scryfall treats variable stats such as '*' or '1+*' as their fixed part
+    if stat is None:
+        return None
+    fixed = stat.replace("*", "").rstrip("+") or "0"
+    try:
+        return float(fixed)
+    except ValueError:
+        return None
@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Callable
+
+# Scryfall asks for 50-100 ms between requests, i.e. no more than 10 per second
+SCRYFALL_REQUESTS_PER_SECOND = 10.0
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting how often requests can be sent
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Sending a request spends one token, so callers only wait when requests
+    are arriving faster than the rate allows.
+    """
+
+    def __init__(
+        self,
+        rate: float = SCRYFALL_REQUESTS_PER_SECOND,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token, borrowing against future refills if none are left
+
+        Returns:
+            Number of seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Blocks until a request may be sent"""
+        if delay := self.reserve():
+            self._sleep(delay)
@@ -0,0 +1,485 @@
+import os
+import re
+import shutil
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, islice
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, TextIO
+from nyxfall.instrumentation import metrics
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from nyxfall.card import Card
+    from nyxfall.card_face import CardFace
+
+CARD_TEXT_DEFAULT_WIDTH = 32
+# When rendering a card, leave a reasonable space between the end of the name and the start of the mana cost
+NAME_MANA_COST_GAP = 2
+# Spaces between frames rendered next to each other
+COLUMN_GAP = "  "
+# Number of distinct rendered frames and wrapped texts kept in memory
+FRAME_CACHE_SIZE = 4096
+WRAP_CACHE_SIZE = 16384
+ITALIC_ON = "\x1b[3m"
+ITALIC_OFF = "\x1b[23m"
+# Where a hyphenated word may be broken: after a hyphen with at least two
+# letters either side, as in "non-Human" but not "+1/-1" or "X-1"
+_HYPHEN_BREAK = re.compile(r"(?<=[^\W\d_]{2}-)(?=[^\W\d_]{2})")
+# Smallest parts a word too wide for a line can be split into
+_ATOM = re.compile(r"\{[^{}]*\}|.")
+# Faces below which rendering stays in this process even when more jobs are
+# asked for, as starting worker processes would cost more than it saves
+PARALLEL_THRESHOLD = 2000
+# Faces sent to a worker process at once
+PARALLEL_CHUNK_SIZE = 250
+
+
+@dataclass(frozen=True)
+class FrameTheme:
+    """Characters used to draw a card frame"""
+
+    down_right: str
+    down_left: str
+    up_right: str
+    up_left: str
+    vertical: str
+    horizontal: str
+    down_horizontal: str
+    up_horizontal: str
+    left_vertical: str
+    right_vertical: str
+    italic_on: str
+    italic_off: str
+
+
+UNICODE_THEME = FrameTheme(
+    down_right="┌",
+    down_left="┐",
+    up_right="└",
+    up_left="┘",
+    vertical="│",
+    horizontal="─",
+    down_horizontal="┬",
+    up_horizontal="┴",
+    left_vertical="┤",
+    right_vertical="├",
+    italic_on=ITALIC_ON,
+    italic_off=ITALIC_OFF,
+)
+ASCII_THEME = FrameTheme(
+    down_right="+",
+    down_left="+",
+    up_right="+",
+    up_left="+",
+    vertical="|",
+    horizontal="-",
+    down_horizontal="+",
+    up_horizontal="+",
+    left_vertical="|",
+    right_vertical="|",
+    italic_on="",
+    italic_off="",
+)
+
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def render_card(face: "CardFace", ascii_only: bool = False) -> str:
+    """Builds a string that will display a ``CardFace`` similar to an actual MTG card
+
+    Memoized per face and options, like ``render_lines``.
+
+    Args:
+        face: Card face to render
+        ascii_only: True if card frame should be rendered using only the basic ASCII set
+
+    Returns:
+        Formatted and newline-separated string that should display a card when printed
+    """
+    return "\n".join(render_lines(face, ascii_only)) + "\n"
+
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def render_lines(
+    face: "CardFace", ascii_only: bool = False
+) -> tuple[str, ...]:
+    """Renders a card face as the individual lines of its frame
+
+    Results are memoized per face and options, so rendering the same face
+    again is a dictionary lookup.
+
+    Args:
+        face: Card face to render
+        ascii_only: True if card frame should be rendered using only the basic ASCII set
+
+    Returns:
+        Lines of the frame, without trailing newlines
+    """
+    theme = ASCII_THEME if ascii_only else UNICODE_THEME
+    vertical = theme.vertical
+    horizontal = theme.horizontal
+    name_width = display_width(face.name)
+    mana_cost_width = display_width(face.mana_cost)
+    type_line_width = display_width(face.type_line)
+    # Default card width to 32 characters unless the card has a particularly long name or mana cost
+    width = max(
+        CARD_TEXT_DEFAULT_WIDTH,
+        name_width + mana_cost_width + NAME_MANA_COST_GAP,
+        type_line_width,
+    )
+    inner_rule = horizontal * (width - 2)
+
+    lines = [
+        # Top of outside bounding box
+        f"{theme.down_right}{horizontal * (width + 2)}{theme.down_left}",
+        # Name and mana cost
+        f"{vertical}{theme.down_right}{horizontal * width}{theme.down_left}{vertical}",
+        f"{vertical}{vertical}{face.name}{" " * (width - name_width - mana_cost_width)}{face.mana_cost}{vertical}{vertical}",
+        f"{vertical}{theme.up_right}{theme.down_horizontal}{inner_rule}{theme.down_horizontal}{theme.up_left}{vertical}",
+        # Empty image box
+        f"{vertical} {vertical}{" " * (width - 2)}{vertical} {vertical}",
+        # Type line
+        f"{vertical}{theme.down_right}{theme.up_horizontal}{inner_rule}{theme.up_horizontal}{theme.down_left}{vertical}",
+        f"{vertical}{vertical}{face.type_line}{" " * (width - type_line_width)}{vertical}{vertical}",
+        f"{vertical}{theme.up_right}{theme.down_horizontal}{inner_rule}{theme.down_horizontal}{theme.up_left}{vertical}",
+    ]
+    # Oracle text
+    lines.extend(_text_box(face.oracle_text, width, vertical))
+
+    # Flavour text
+    if face.flavor_text:
+        lines.append(
+            f"{vertical} {vertical} {horizontal * (width - 4)} {vertical} {vertical}"
+        )
+        flavor = _text_box(face.flavor_text, width, vertical)
+        # Wrap the flavour text in ANSI escape codes for italics
+        flavor[0] = theme.italic_on + flavor[0]
+        flavor[-1] = flavor[-1] + theme.italic_off
+        lines.extend(flavor)
+
+    if face.power and face.toughness:
+        # Width of characters in power and toughness plus 3 for the forward slash and spacing
+        pt_width = len(face.power) + len(face.toughness) + 3
+        lines.extend(
+            [
+                f"{vertical} {vertical}{" " * (width - pt_width - 4)}{theme.down_right}{horizontal * pt_width}{theme.down_left}{vertical} {vertical}",
+                f"{vertical} {theme.up_right}{horizontal * (width - pt_width - 4)}{theme.left_vertical} {face.power}/{face.toughness} {theme.right_vertical}{theme.up_left} {vertical}",
+                f"{vertical} {face.set}{" " * (width - len(face.set) - pt_width - 3)}{theme.up_right}{horizontal * pt_width}{theme.up_left}  {vertical}",
+                f"{theme.up_right}{horizontal * (width + 2)}{theme.up_left}",
+            ]
+        )
+    else:
+        lines.extend(
+            [
+                f"{vertical} {theme.up_right}{inner_rule}{theme.up_left} {vertical}",
+                f"{vertical} {face.set}{" " * (width - len(face.set))} {vertical}",
+                f"{theme.up_right}{horizontal * (width + 2)}{theme.up_left}",
+            ]
+        )
+
+    return tuple(lines)
+
+
+def render_many(
+    cards: Iterable["Card"],
+    stream: TextIO,
+    *,
+    ascii_only: bool = False,
+    columns: Optional[int] = 1,
+    width: Optional[int] = None,
+    jobs: int = 1,
+):
+    """Writes the frames of every face of many cards to a stream
+
+    Lines are written straight from the memoized frames, so no string is
+    built per card. With one column, output matches printing each face's
+    ``format_as_card``. Cards are consumed as they're written, so ``cards``
+    can be a lazy search result.
+
+    With more than one job, faces are rendered in chunks on a pool of worker
+    processes and written in their original order. Fewer than
+    ``PARALLEL_THRESHOLD`` faces are still rendered in this process, and no
+    more jobs are started than there are CPUs.
+
+    Args:
+        cards: Cards to render
+        stream: Text stream to write to, ideally buffered
+        ascii_only: True if card frames should be rendered using only the basic ASCII set
+        columns: Most frames to lay side by side on each row, or None to fit as many as ``width`` allows
+        width: Characters available on each row, defaulting to the terminal's width
+        jobs: Worker processes to render with, or 1 to render in this process
+    """
+    write = stream.write
+    jobs = min(jobs, os.cpu_count() or 1)
+    if jobs > 1:
+        frames = _parallel_frames(cards, ascii_only, jobs)
+    else:
+        frames = _frames(cards, ascii_only)
+    for row in grid_rows(frames, columns, width):
+        with metrics.timer("write"):
+            if len(row) == 1:
+                write("\n".join(row[0]))
+                write("\n\n")
+            else:
+                _write_row(row, write)
+
+
+def grid_rows(
+    frames: Iterable[tuple[str, ...]],
+    columns: Optional[int] = None,
+    width: Optional[int] = None,
+) -> Iterator[list[tuple[str, ...]]]:
+    """Groups rendered frames into the rows of a grid
+
+    Frames are placed left to right until the next one would overflow
+    ``width`` or the row already holds ``columns`` frames. Frames differ in
+    width (long names and type lines widen them), so each row fits as many
+    as it can rather than every row holding the same number. A frame wider
+    than ``width`` gets a row to itself.
+
+    Args:
+        frames: Lines of each frame, as returned by ``render_lines``
+        columns: Most frames on one row, or None for no limit besides ``width``
+        width: Characters available on each row, defaulting to the terminal's width
+
+    Returns:
+        Iterator over the frames of each row
+    """
+    if columns is not None and columns <= 1:
+        for lines in frames:
+            yield [lines]
+        return
+    if width is None:
+        width = shutil.get_terminal_size().columns
+
+    row: list[tuple[str, ...]] = []
+    used = 0
+    for lines in frames:
+        # The top border has no escape codes, so its length is the frame's width
+        frame_width = len(lines[0])
+        if row and (
+            used + len(COLUMN_GAP) + frame_width > width or len(row) == columns
+        ):
+            yield row
+            row = []
+        used = frame_width if not row else used + len(COLUMN_GAP) + frame_width
+        row.append(lines)
+    if row:
+        yield row
+
+
+def wrap_text(text: str, width: int) -> tuple[str, ...]:
+    """Breaks text on to lines no wider than ``width``, keeping its own line breaks
+
+    Each paragraph is filled greedily in a single pass, breaking only at
+    spaces and after the hyphen of a hyphenated word. A word too wide for a
+    line of its own is split between symbols, so mana symbols like ``{2/W}``
+    are never cut in half, and an em dash stays on the line of the word
+    before it. Widths are counted in terminal columns, so wide characters
+    count twice and combining accents not at all. Tabs are expanded to
+    spaces before wrapping.
+
+    Args:
+        text: Text to be wrapped (e.g. oracle text, flavour text)
+        width: Most columns on each line
+
+    Returns:
+        Wrapped lines, memoized per text and width
+    """
+    return tuple(line for line, _ in _wrap(text, width))
+
+
+def display_width(text: str) -> int:
+    """Number of terminal columns a string takes up"""
+    if text.isascii():
+        return len(text)
+    return sum(
+        (
+            0
+            if unicodedata.combining(character)
+            else 2 if unicodedata.east_asian_width(character) in "WF" else 1
+        )
+        for character in text
+    )
+
+
+def clear_caches():
+    """Forgets every memoized frame and wrapped text"""
+    render_card.cache_clear()
+    render_lines.cache_clear()
+    _wrap.cache_clear()
+
+
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def _wrap(text: str, width: int) -> tuple[tuple[str, int], ...]:
+    # Each line with its width, so text boxes can be padded without
+    # measuring the lines again
+    lines: list[tuple[str, int]] = []
+    for paragraph in text.splitlines():
+        # A terminal moves a tab on to its next stop, which display_width
+        # can't know, so tabs are expanded to spaces first
+        _wrap_paragraph(paragraph.expandtabs(), width, lines)
+    return tuple(lines)
+
+
+def _wrap_paragraph(paragraph: str, width: int, lines: list[tuple[str, int]]):
+    # Splitting on plain spaces leaves non-breaking ones inside their words
+    words: list[str] = []
+    for word in paragraph.split(" "):
+        if not word:
+            continue
+        if word[0] == "—" and words:
+            words[-1] += " " + word
+        else:
+            words.append(word)
+    if not words:
+        lines.append(("", 0))
+        return
+
+    line: list[str] = []
+    used = 0
+    for word in words:
+        pieces = _HYPHEN_BREAK.split(word) if "-" in word else (word,)
+        for number, piece in enumerate(pieces):
+            piece_width = display_width(piece)
+            # Pieces of a hyphenated word join without a space
+            gap = 1 if line and number == 0 else 0
+            if used + gap + piece_width <= width:
+                if gap:
+                    line.append(" ")
+                line.append(piece)
+                used += gap + piece_width
+                continue
+            if line:
+                lines.append(("".join(line), used))
+            line, used = [], 0
+            if piece_width <= width:
+                line.append(piece)
+                used = piece_width
+                continue
+            for atom in _ATOM.findall(piece):
+                atom_width = display_width(atom)
+                if line and used + atom_width > width:
+                    lines.append(("".join(line), used))
+                    line, used = [], 0
+                line.append(atom)
+                used += atom_width
+    lines.append(("".join(line), used))
+
+
+def _text_box(text: str, width: int, vertical: str) -> list[str]:
+    # Cards without any text (e.g. vanilla creatures) still get an empty row
+    return [
+        f"{vertical} {vertical}{line}{" " * (width - 2 - used)}{vertical} {vertical}"
+        for line, used in _wrap(text, width - 2) or (("", 0),)
+    ]
+
+
+def _frames(
+    cards: Iterable["Card"], ascii_only: bool
+) -> Iterator[tuple[str, ...]]:
+    # Timed per face rather than around the whole loop, so the time spent
+    # fetching and mapping lazily loaded cards isn't counted as rendering
+    for card in cards:
+        for face in card.faces:
+            with metrics.timer("render"):
+                lines = render_lines(face, ascii_only)
+            yield lines
+
+
+def _parallel_frames(
+    cards: Iterable["Card"], ascii_only: bool, jobs: int
+) -> Iterator[tuple[str, ...]]:
+    faces = (face for card in cards for face in card.faces)
+    head = list(islice(faces, PARALLEL_THRESHOLD))
+    if len(head) < PARALLEL_THRESHOLD:
+        for face in head:
+            with metrics.timer("render"):
+                lines = render_lines(face, ascii_only)
+            yield lines
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Only the face fields are pickled, and only a few chunks are queued at
+    # once so a lazy search result keeps streaming instead of being read in
+    # full before anything is written
+    pending: deque[Future] = deque()
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        for chunk in _chunks(chain(head, faces)):
+            pending.append(pool.submit(_render_chunk, chunk, ascii_only))
+            if len(pending) >= jobs * 2:
+                yield from _chunk_frames(pending.popleft())
+        while pending:
+            yield from _chunk_frames(pending.popleft())
+    finally:
+        # If the frames stop being read early, chunks still queued are
+        # dropped rather than rendered for nothing
+        pool.shutdown(cancel_futures=True)
+
+
+def _chunks(faces: Iterable["CardFace"]) -> Iterator[list[tuple[Any, ...]]]:
+    # Imported here as nyxfall.card imports this module through CardFace
+    from nyxfall.card import FACE_FIELDS
+
+    fields = attrgetter(*FACE_FIELDS)
+    chunk = []
+    for face in faces:
+        chunk.append(fields(face))
+        if len(chunk) == PARALLEL_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _render_chunk(
+    chunk: list[tuple[Any, ...]], ascii_only: bool
+) -> tuple[str, list[int]]:
+    # Runs in a worker process. Sending back one string per chunk, and how
+    # many of its lines belong to each frame, pickles far faster than a
+    # tuple of lines per frame
+    from nyxfall.card_face import CardFace
+
+    frames = [render_lines(CardFace(*fields), ascii_only) for fields in chunk]
+    text = "\n".join(line for lines in frames for line in lines)
+    return text, [len(lines) for lines in frames]
+
+
+def _chunk_frames(future: "Future") -> Iterator[tuple[str, ...]]:
+    with metrics.timer("render"):
+        text, heights = future.result()
+        lines = text.split("\n")
+    start = 0
+    for height in heights:
+        yield tuple(lines[start : start + height])
+        start += height
+
+
+def _write_row(frames: list[tuple[str, ...]], write):
+    # Frames are padded to the tallest one in the row. Italics are closed at
+    # the end of each frame's segment and reopened on the next line so they
+    # don't bleed into the frame beside it
+    height = max(len(lines) for lines in frames)
+    blanks = [" " * len(lines[0]) for lines in frames]
+    italic = [False] * len(frames)
+    for number in range(height):
+        segments = []
+        for column, lines in enumerate(frames):
+            if number >= len(lines):
+                segments.append(blanks[column])
+                continue
+            line = lines[number]
+            prefix = ITALIC_ON if italic[column] else ""
+            if line.rfind(ITALIC_ON) > line.rfind(ITALIC_OFF):
+                italic[column] = True
+            elif ITALIC_OFF in line:
+                italic[column] = False
+            suffix = ITALIC_OFF if italic[column] else ""
+            segments.append(prefix + line + suffix)
+        write(COLUMN_GAP.join(segments).rstrip())
+        write("\n")
+    write("\n")
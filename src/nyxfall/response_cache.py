@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Bumping this drops and recreates the cache table on next open
+SCHEMA_VERSION = 2
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 24 * 60 * 60
+# How long a cached response stays fresh, keyed by the last segment of the
+# request path. Card data changes rarely, search results change as sets release
+ENDPOINT_TTLS = {
+    "named": 7 * 24 * 60 * 60,
+    "search": 24 * 60 * 60,
+    "random": 0,
+}
+
+
+def default_cache_dir() -> Path:
+    """Finds the per-user directory nyxfall should keep its cache in
+
+    Returns:
+        ``NYXFALL_CACHE_DIR`` if set, otherwise the platform's user cache directory
+    """
+    if override := os.environ.get("NYXFALL_CACHE_DIR"):
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", Path.home() / "AppData/Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library/Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(base) / "nyxfall"
+
+
+def normalize_url(url: str) -> str:
+    """Builds a canonical form of a request URL to use as a cache key
+
+    Args:
+        url: URL as it would be sent to Scryfall
+
+    Returns:
+        URL with a lowercase scheme and host and sorted, consistently encoded query parameters
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, "")
+    )
+
+
+def endpoint_for(url: str) -> str:
+    """Name of the Scryfall endpoint a URL targets (e.g. ``named``, ``search``)"""
+    return urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+@dataclass
+class CachedResponse:
+    """A stored response, whether or not it's still fresh
+
+    Attributes:
+        body: Raw JSON body
+        etag: ``ETag`` header Scryfall sent with the body, if any
+        last_modified: ``Last-Modified`` header Scryfall sent with the body, if any
+        fresh: False once the entry is older than its endpoint's TTL
+    """
+
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+
+class ResponseCache:
+    """SQLite-backed store of raw Scryfall responses keyed by normalized URL
+
+    Entries expire after a per-endpoint TTL, and once the total size of stored
+    bodies passes ``max_bytes`` the least recently used entries are evicted.
+    Expired entries are kept along with their validators (``ETag`` and
+    ``Last-Modified``), so they can be revalidated with a conditional request
+    instead of downloaded again.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Optional[dict[str, float]] = None,
+    ):
+        self.path = path or default_cache_dir() / "responses.sqlite3"
+        self.max_bytes = max_bytes
+        self.ttls = {**ENDPOINT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._create_schema()
+
+    def get(self, url: str) -> Optional[str]:
+        """Fetches a fresh cached response body for a URL
+
+        Args:
+            url: Request URL, normalized before lookup
+
+        Returns:
+            Raw JSON body if a fresh entry exists, None otherwise
+        """
+        entry = self.lookup(url)
+        return entry.body if entry is not None and entry.fresh else None
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Fetches the cached response for a URL, even if it has expired
+
+        Args:
+            url: Request URL, normalized before lookup
+
+        Returns:
+            The stored response and its validators, or None if there isn't one
+        """
+        key = normalize_url(url)
+        ttl = self.ttl_for(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at "
+                "FROM responses WHERE url = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?",
+                (now, key),
+            )
+            self._conn.commit()
+        body, etag, last_modified, fetched_at = row
+        return CachedResponse(
+            body, etag, last_modified, fresh=now - fetched_at <= ttl
+        )
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Stores a response body, evicting old entries if over the size cap
+
+        Args:
+            url: Request URL, normalized before storing
+            body: Raw JSON body returned by Scryfall
+            etag: ``ETag`` header of the response, to revalidate it with later
+            last_modified: ``Last-Modified`` header of the response, likewise
+        """
+        if self.ttl_for(url) <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_url(url),
+                    body,
+                    len(body),
+                    etag,
+                    last_modified,
+                    now,
+                    now,
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def revalidated(self, url: str):
+        """Marks a stored response fresh again after Scryfall confirmed it's unchanged"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE url = ?",
+                (time.time(), normalize_url(url)),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Removes every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def size(self) -> int:
+        """Total size in bytes of all cached response bodies"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def ttl_for(self, url: str) -> float:
+        """Number of seconds a response from ``url`` stays fresh"""
+        return self.ttls.get(endpoint_for(url), DEFAULT_TTL)
+
+    def close(self):
+        self._conn.close()
+
+    def _evict(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk entries from least to most recently used until we're back under the cap
+        stale = []
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", stale)
+
+    def _create_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS responses")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL, "
+            "etag TEXT, last_modified TEXT, "
+            "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+            "ON responses (accessed_at)"
+        )
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
@@ -1,86 +1,613 @@
-import time
-import requests
-from typing import Any, Optional
-from nyxfall.card import Card
-from nyxfall.card_face import CardFace
-
-SCRYFALL_BASE = "https://api.scryfall.com/cards/"
-HEADERS = {"User-Agent": "NyxfallApp/0.0.1", "Accept": "*/*"}
-
-
-def search_exact(name: str) -> Optional[Card]:
-    """Searches for a card with the name exactly matching a string
-
-    Args:
-        name: Name of card to match
-
-    Returns:
-        ``Card`` object matching that string if one was found, None otherwise
-    """
-    req = requests.get(f"{SCRYFALL_BASE}named?exact={name}", headers=HEADERS)
-    if req.status_code != requests.codes.ok:
-        return None
-    return _map_response(req.json())
-
-
-def search_random() -> Card:
-    """Searches for a random card
-
-    Returns:
-        ``Card`` object of a random card
-    """
-    return _map_response(
-        requests.get(f"{SCRYFALL_BASE}random", headers=HEADERS).json()
-    )
-
-
-def search_query(query: str) -> list[Card]:
-    """Searches for a query and returns all cards that match
-
-    Args:
-        query: Query to execute
-
-    Returns:
-        All ``Card`` objects matching the query, or an empty list of no cards were found
-    """
-    response = requests.get(
-        f"{SCRYFALL_BASE}search?q={query}+game:paper&page=1", headers=HEADERS
-    ).json()
-    card_data = [_map_response(card) for card in response.get("data", [])]
-
-    # Traverse pagination from responses
-    while response.get("has_more", False):
-        # Rate limit ourselves by 100ms between requests
-        time.sleep(100 / 1000)
-        response = requests.get(response.get("next_page", "")).json()
-        card_data += [_map_response(card) for card in response.get("data", [])]
-
-    return card_data
-
-
-def _map_response(response: dict[str, Any]) -> Card:
-    if response.get("card_faces") is None:
-        return Card(
-            faces=[_map_card_face(response)], name=response.get("name", "")
-        )
-
-    return Card(
-        faces=[
-            _map_card_face(face) for face in response.get("card_faces", [])
-        ],
-        name=response.get("name", ""),
-    )
-
-
-def _map_card_face(face: dict[str, Any]) -> CardFace:
-    return CardFace(
-        name=face.get("name", ""),
-        scryfall_uri=face.get("scryfall_uri", ""),
-        mana_cost=face.get("mana_cost", ""),
-        type_line=face.get("type_line", ""),
-        power=face.get("power", None),
-        toughness=face.get("toughness", None),
-        oracle_text=face.get("oracle_text", ""),
-        flavor_text=face.get("flavor_text", None),
-        set=face.get("set", "").upper(),
-    )
+import dataclasses
+import math
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from nyxfall import decoding
+from nyxfall.card import Card
+from nyxfall.decoding import SearchPage
+from nyxfall.instrumentation import metrics
+from nyxfall.rate_limiter import RateLimiter
+from nyxfall.response_cache import ResponseCache
+
+# requests is only imported once a request actually has to go out, so
+# answers from the cache or an offline store never load the HTTP stack
+if TYPE_CHECKING:
+    import requests
+    from nyxfall.card_snapshot import CardSnapshot
+    from nyxfall.card_store import CardStore
+
+SCRYFALL_BASE = "https://api.scryfall.com/cards/"
+HEADERS = {"User-Agent": "NyxfallApp/0.0.1", "Accept": "*/*"}
+# Seconds to wait for Scryfall to connect or send data before giving up
+TIMEOUT = 30
+# Responses that mean the request is worth trying again after a pause
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+# Longest we'll wait between attempts, even if Scryfall asks for longer
+MAX_RETRY_DELAY = 60.0
+# Bulk-data dump downloaded when syncing the local card database
+DEFAULT_BULK_TYPE = "oracle_cards"
+# Size of each chunk written to disk while downloading a bulk-data dump
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Later pages of a search requested at once. Their requests still wait their
+# turn at the rate limiter, so a long search takes as long as the limit
+# allows rather than a round trip per page
+PAGE_WORKERS = 4
+# Offline matches are mapped to cards this many at a time, like a page of
+# Scryfall's search results
+OFFLINE_PAGE_SIZE = 175
+
+rate_limiter = RateLimiter()
+_session: Optional["requests.Session"] = None
+_max_retries = 3
+_backoff = 0.5
+
+_cache: Optional[ResponseCache] = None
+_cache_enabled = True
+_cache_refresh = False
+_offline_store: Optional["CardStore"] = None
+_offline_snapshot: Optional["CardSnapshot"] = None
+
+
+def configure_cache(
+    enabled: bool = True,
+    refresh: bool = False,
+    cache: Optional[ResponseCache] = None,
+):
+    """Controls how requests use the on-disk response cache
+
+    Args:
+        enabled: False to bypass the cache entirely, neither reading nor writing it
+        refresh: True to ignore stored responses but still store fresh ones
+        cache: Cache to use instead of the default one in the user cache directory
+    """
+    global _cache, _cache_enabled, _cache_refresh
+    _cache_enabled = enabled
+    _cache_refresh = refresh
+    if cache is not None:
+        _cache = cache
+
+
+def configure_retries(max_retries: int = 3, backoff: float = 0.5):
+    """Controls how failed requests are retried
+
+    Args:
+        max_retries: Number of extra attempts after a connection error or a 429/5xx response
+        backoff: Delay before the first retry, doubling on each further attempt.
+            A ``Retry-After`` header from Scryfall takes precedence
+    """
+    global _max_retries, _backoff
+    _max_retries = max_retries
+    _backoff = backoff
+
+
+def get_session() -> "requests.Session":
+    """Creates the shared keep-alive HTTP session on first use
+
+    Returns:
+        ``requests.Session`` that pools connections to Scryfall and sends ``HEADERS``
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+def use_offline_store(
+    store: Optional["CardStore"], snapshot: Optional["CardSnapshot"] = None
+):
+    """Answers every search from a local card store instead of Scryfall
+
+    Args:
+        store: Store imported from bulk data, or None to go back to the network
+        snapshot: Snapshot of the same cards, to answer exact and random
+            lookups from instead of the store
+    """
+    global _offline_store, _offline_snapshot
+    _offline_store = store
+    _offline_snapshot = snapshot if store is not None else None
+
+
+def is_offline() -> bool:
+    """Whether searches are being answered from a local card store"""
+    return _offline_store is not None
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Opens the response cache on first use
+
+    Returns:
+        The active ``ResponseCache``, or None if caching is disabled or the cache can't be opened
+    """
+    global _cache, _cache_enabled
+    if not _cache_enabled:
+        return None
+    if _cache is None:
+        try:
+            _cache = ResponseCache()
+        except (OSError, sqlite3.Error):
+            _cache_enabled = False
+    return _cache
+
+
+def search_exact(name: str) -> Optional[Card]:
+    """Searches for a card with the name exactly matching a string
+
+    Args:
+        name: Name of card to match
+
+    Returns:
+        ``Card`` object matching that string if one was found, None otherwise
+    """
+    if _offline_snapshot is not None:
+        with metrics.timer("store"):
+            return _offline_snapshot.find_exact(name)
+    if _offline_store is not None:
+        with metrics.timer("store"):
+            card = _offline_store.find_exact(name)
+        return None if card is None else _map_response(card)
+
+    status, body = _get_body(f"{SCRYFALL_BASE}named?exact={name}")
+    if status != HTTPStatus.OK:
+        return None
+    with metrics.timer("decode"):
+        return decoding.decode_card(body)
+
+
+def search_random() -> Card:
+    """Searches for a random card
+
+    Returns:
+        ``Card`` object of a random card
+    """
+    if _offline_snapshot is not None:
+        return _offline_snapshot.random() or _map_response({})
+    if _offline_store is not None:
+        return _map_response(_offline_store.random() or {})
+
+    # A cached random card wouldn't be very random
+    _, body = _get_body(f"{SCRYFALL_BASE}random", cacheable=False)
+    with metrics.timer("decode"):
+        return decoding.decode_card(body)
+
+
+def search_exact_json(name: str) -> Optional[dict[str, Any]]:
+    """Like ``search_exact``, but returns Scryfall's card object with every field
+
+    Args:
+        name: Name of card to match
+
+    Returns:
+        Card object matching that string if one was found, None otherwise
+    """
+    if _offline_store is not None:
+        with metrics.timer("store"):
+            return _offline_store.find_exact(name)
+
+    status, body = _get_body(f"{SCRYFALL_BASE}named?exact={name}")
+    if status != HTTPStatus.OK:
+        return None
+    with metrics.timer("decode"):
+        return decoding.loads(body)
+
+
+def search_random_json() -> dict[str, Any]:
+    """Like ``search_random``, but returns Scryfall's card object with every field"""
+    if _offline_store is not None:
+        return _offline_store.random() or {}
+
+    _, body = _get_body(f"{SCRYFALL_BASE}random", cacheable=False)
+    with metrics.timer("decode"):
+        return decoding.loads(body)
+
+
+def fetch_collection_batch(names: list[str]) -> list[Card]:
+    """Looks up several cards by name in a single collection request
+
+    Args:
+        names: Up to 75 exact card names, or names of one face of a card
+
+    Returns:
+        Every card Scryfall found, in no particular order, or an empty list if the request failed
+    """
+    response = _send(
+        "POST",
+        f"{SCRYFALL_BASE}collection",
+        json={"identifiers": [{"name": name} for name in names]},
+    )
+    if response.status_code != HTTPStatus.OK:
+        return []
+    with metrics.timer("decode"):
+        return decoding.decode_page(response.content).cards
+
+
+def fetch_card_names() -> list[str]:
+    """Downloads Scryfall's catalog of every card name
+
+    Returns:
+        Every English card name, double-faced cards as ``Front // Back``
+    """
+    url = urljoin(SCRYFALL_BASE, "../catalog/card-names")
+    status, body = _get_body(url, cacheable=False)
+    if status != HTTPStatus.OK:
+        return []
+    return decoding.loads(body).get("data", [])
+
+
+def fetch_bulk_manifest(
+    bulk_type: str = DEFAULT_BULK_TYPE,
+) -> Optional[dict[str, Any]]:
+    """Fetches Scryfall's description of its latest bulk-data dump of a type
+
+    Args:
+        bulk_type: Type of dump (e.g. ``oracle_cards``, ``default_cards``)
+
+    Returns:
+        Bulk-data object with the dump's ``updated_at`` and ``download_uri``,
+        or None if Scryfall doesn't have one of that type
+    """
+    url = urljoin(SCRYFALL_BASE, f"../bulk-data/{bulk_type}")
+    status, body = _get_body(url, cacheable=False)
+    if status != HTTPStatus.OK:
+        return None
+    return decoding.loads(body)
+
+
+def download_bulk(url: str, path: Path) -> bool:
+    """Streams a bulk-data dump to disk without holding it in memory
+
+    The dump is written next to ``path`` and only moved into place once it's
+    complete, so an interrupted download never leaves a truncated file.
+
+    Args:
+        url: ``download_uri`` from the bulk-data manifest
+        path: Where to save the dump
+
+    Returns:
+        True if the dump was downloaded
+    """
+    response = _send("GET", url, stream=True)
+    with response:
+        if response.status_code != HTTPStatus.OK:
+            return False
+        partial = path.with_name(path.name + ".part")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with metrics.timer("download"), open(partial, "wb") as fp:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                fp.write(chunk)
+    os.replace(partial, path)
+    return True
+
+
+def search_query(query: str) -> list[Card]:
+    """Searches for a query and returns all cards that match
+
+    Args:
+        query: Query to execute
+
+    Returns:
+        All ``Card`` objects matching the query, or an empty list of no cards were found
+    """
+    return list(iter_query(query))
+
+
+def iter_query(query: str, keep_raw: bool = False) -> "QueryResults":
+    """Searches for a query, fetching only the first page of results up front
+
+    Args:
+        query: Query to execute
+        keep_raw: True to keep each card's Scryfall object in its page's ``raw``
+
+    Returns:
+        ``QueryResults`` that yields each matching ``Card`` as its page arrives
+    """
+    return QueryResults(query, keep_raw)
+
+
+class QueryResults:
+    """Cards matching a search, fetched a page at a time as they're iterated
+
+    The first page is requested when the results are created so the total is
+    known straight away. Later pages are only requested once iteration gets
+    past the first. From the total and the size of the first page, the URL of
+    every later page is known up front, so they're fetched concurrently and
+    yielded in order. A card that moves between pages while they're fetched
+    is only yielded once. ``close`` stops the fetching early.
+
+    Attributes:
+        query: Query that was executed
+        total_cards: Number of matching cards reported by the first response
+    """
+
+    def __init__(self, query: str, keep_raw: bool = False):
+        self.query = query
+        self._keep_raw = keep_raw
+        self._closed = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Offline matches can number in the thousands, so they're only
+        # mapped to cards as iteration reaches them
+        self._offline_cards: Optional[Sequence[dict[str, Any]]] = None
+        if _offline_store is not None:
+            with metrics.timer("store"):
+                self._offline_cards = _offline_store.find(query)
+            self._first_page = SearchPage(total_cards=len(self._offline_cards))
+        else:
+            self._first_page = _get_page(
+                f"{SCRYFALL_BASE}search?q={query}+game:paper&page=1", keep_raw
+            )
+        self.total_cards: int = self._first_page.total_cards or len(
+            self._first_page.cards
+        )
+
+    def __iter__(self) -> Iterator[Card]:
+        for page in self.pages():
+            yield from page.cards
+
+    def pages(self) -> Iterator[SearchPage]:
+        """Yields each page of results as it arrives, without repeated cards"""
+        if self._offline_cards is not None:
+            for start in range(0, len(self._offline_cards), OFFLINE_PAGE_SIZE):
+                chunk = self._offline_cards[start : start + OFFLINE_PAGE_SIZE]
+                yield SearchPage(
+                    cards=[_map_response(card) for card in chunk],
+                    raw=chunk if self._keep_raw else [],
+                )
+            return
+
+        seen: set[tuple] = set()
+        yield _unseen(self._first_page, seen)
+        self._executor = ThreadPoolExecutor(
+            max_workers=PAGE_WORKERS, thread_name_prefix="nyxfall-pages"
+        )
+        if self._closed:
+            self._executor.shutdown(wait=False)
+        for page in _later_pages(
+            self._first_page, self._executor, self._keep_raw
+        ):
+            yield _unseen(page, seen)
+
+    def close(self):
+        """Stops requesting pages, for when nothing more will be read
+
+        Can be called from any thread, including while another is iterating.
+        Pages already being fetched are left to finish, but the rest are
+        cancelled and iteration ends once the current page arrives, so no
+        pages are requested while the interpreter is shutting down.
+        """
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_body(
+    url: str, cacheable: bool = True
+) -> tuple[int, Union[str, bytes]]:
+    """Fetches a URL, answering from the response cache where possible
+
+    An expired cached response is revalidated with a conditional request,
+    so if it hasn't changed Scryfall answers 304 without sending the body
+    again.
+
+    Args:
+        url: URL to request
+        cacheable: False to always go to the network and never store the response
+
+    Returns:
+        Tuple of the HTTP status code and the undecoded JSON body
+    """
+    cache = get_cache() if cacheable else None
+    entry = None
+    if cache is not None and not _cache_refresh:
+        with metrics.timer("cache"):
+            entry = cache.lookup(url)
+        if entry is not None and entry.fresh:
+            metrics.count("cache.hits")
+            return HTTPStatus.OK, entry.body
+        metrics.count("cache.misses")
+
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    req = _send("GET", url, headers=headers)
+    if req.status_code == HTTPStatus.NOT_MODIFIED and entry is not None:
+        metrics.count("cache.revalidated")
+        cache.revalidated(url)
+        return HTTPStatus.OK, entry.body
+    if req.status_code == HTTPStatus.OK and cache is not None:
+        cache.put(
+            url,
+            req.text,
+            req.headers.get("ETag"),
+            req.headers.get("Last-Modified"),
+        )
+    return req.status_code, req.content
+
+
+def _get_page(url: str, keep_raw: bool = False) -> SearchPage:
+    """Fetches and decodes a page of search results
+
+    Args:
+        url: URL of the page
+        keep_raw: True to keep each card's Scryfall object in the page's ``raw``
+
+    Returns:
+        Page of cards, or an empty page if Scryfall answered with an error
+        (e.g. a search with no matches)
+    """
+    status, body = _get_body(url)
+    if status != HTTPStatus.OK:
+        return SearchPage()
+    with metrics.timer("decode"):
+        return decoding.decode_page(body, keep_raw)
+
+
+def _later_pages(
+    first: SearchPage, executor: ThreadPoolExecutor, keep_raw: bool = False
+) -> Iterator[SearchPage]:
+    """Fetches the pages of a search after the first, in order
+
+    Pages whose URLs can be worked out from the first page are fetched on a
+    thread pool, a few ahead of the one being yielded. If the results grew
+    since the first page, the rest are followed through ``next_page``.
+    Shutting the pool down from another thread stops the pages early.
+
+    Args:
+        first: First page of the search
+        executor: Pool to fetch pages on, shut down once they're all fetched
+        keep_raw: True to keep each card's Scryfall object in its page's ``raw``
+
+    Yields:
+        Each later page, in order
+    """
+
+    def fetch(url: str) -> Future[SearchPage]:
+        try:
+            return executor.submit(_get_page, url, keep_raw)
+        except RuntimeError:
+            # Shut down by QueryResults.close, or by the interpreter exiting
+            # while pages were still being loaded
+            raise CancelledError from None
+
+    page = first
+    pending: deque[Future[SearchPage]] = deque()
+    try:
+        for url in _page_urls(first):
+            pending.append(fetch(url))
+            if len(pending) >= PAGE_WORKERS * 2:
+                page = pending.popleft().result()
+                yield page
+        while pending:
+            page = pending.popleft().result()
+            yield page
+        while page.has_more and page.next_page:
+            page = fetch(page.next_page).result()
+            yield page
+    except CancelledError:
+        return
+    finally:
+        # Don't wait on pages nobody will read if iteration stops early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _send(method: str, url: str, **kwargs: Any) -> "requests.Response":
+    """Sends a request through the shared session, within the rate limit
+
+    Connection errors and 429/5xx responses are retried with exponential
+    back-off, honouring any ``Retry-After`` header.
+
+    Args:
+        method: HTTP method
+        url: URL to request
+        kwargs: Extra arguments for ``requests.Session.request``
+
+    Returns:
+        Final response, which may still be an error once retries run out
+    """
+    import requests
+
+    session = get_session()
+    attempt = 0
+    while True:
+        with metrics.timer("rate_limit"):
+            rate_limiter.acquire()
+        metrics.count("http.requests")
+        try:
+            with metrics.timer("http"):
+                response = session.request(
+                    method, url, timeout=TIMEOUT, **kwargs
+                )
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= _max_retries:
+                raise
+            delay = min(_backoff * 2**attempt, MAX_RETRY_DELAY)
+        else:
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt >= _max_retries
+            ):
+                return response
+            delay = _retry_delay(response, attempt)
+        metrics.count("http.retries")
+        time.sleep(delay)
+        attempt += 1
+
+
+def _retry_delay(response: "requests.Response", attempt: int) -> float:
+    # Retry-After is either a number of seconds or an HTTP date
+    retry_after = response.headers.get("Retry-After", "")
+    delay = _backoff * 2**attempt
+    if retry_after.isdigit():
+        delay = float(retry_after)
+    elif retry_after:
+        from email.utils import parsedate_to_datetime
+
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            delay = retry_at.timestamp() - time.time()
+        except (TypeError, ValueError):
+            pass
+    return max(0.0, min(delay, MAX_RETRY_DELAY))
+
+
+def _page_urls(first: SearchPage) -> list[str]:
+    # Every page but the last is as long as the first, so the total gives the
+    # number of pages and each URL is the next page's with its number swapped
+    if not (first.has_more and first.next_page and first.total_cards):
+        return []
+    parts = urlsplit(first.next_page)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if not first.cards or "page" not in dict(params):
+        return [first.next_page]
+    last = math.ceil(first.total_cards / len(first.cards))
+    return [first.next_page] + [
+        urlunsplit(
+            parts._replace(
+                query=urlencode(
+                    [
+                        (key, str(number) if key == "page" else value)
+                        for key, value in params
+                    ]
+                )
+            )
+        )
+        for number in range(3, last + 1)
+    ]
+
+
+def _unseen(page: SearchPage, seen: set[tuple]) -> SearchPage:
+    # Cards aren't hashable because of their list of faces, but faces are.
+    # Printings that differ in nothing shown are indistinguishable anyway
+    kept = []
+    for position, card in enumerate(page.cards):
+        key = (card.name, *card.faces)
+        if key not in seen:
+            seen.add(key)
+            kept.append(position)
+    if len(kept) == len(page.cards):
+        return page
+    return dataclasses.replace(
+        page,
+        cards=[page.cards[position] for position in kept],
+        raw=[page.raw[position] for position in kept] if page.raw else [],
+    )
+
+
+def _map_response(response: dict[str, Any]) -> Card:
+    with metrics.timer("map"):
+        return decoding.card_from_json(response)
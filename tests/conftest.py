@@ -0,0 +1,128 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Union
+from urllib.parse import urlsplit
+import pytest
+from nyxfall import scryfall_requester
+from nyxfall.rate_limiter import RateLimiter
+from nyxfall.response_cache import ResponseCache
+
+Route = Union[tuple[int, Any], Callable[[BaseHTTPRequestHandler], tuple]]
+
+
+class StandInScryfall:
+    """Local HTTP server that answers like Scryfall from a table of routes
+
+    Routes map a request path to either a ``(status, body)`` tuple or a callable
+    taking the request handler and returning ``(status, body)`` or
+    ``(status, body, headers)``. Every request path (with query) is recorded,
+    along with its headers and the client port it arrived from.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, Route] = {}
+        self.requests: list[str] = []
+        self.request_headers: list[dict[str, str]] = []
+        self.client_ports: list[int] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def hits(self, path: str) -> int:
+        return sum(1 for req in self.requests if urlsplit(req).path == path)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._respond()
+
+            def do_POST(self):
+                self._respond()
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self):
+                stand_in.requests.append(self.path)
+                stand_in.request_headers.append(dict(self.headers))
+                stand_in.client_ports.append(self.client_address[1])
+                if length := int(self.headers.get("Content-Length", 0)):
+                    self.request_body = self.rfile.read(length)
+                route = stand_in.routes.get(urlsplit(self.path).path)
+                if route is None:
+                    result: tuple = (404, {"object": "error"})
+                elif callable(route):
+                    result = route(self)
+                else:
+                    result = route
+                status, body, headers = (*result, {})[:3]
+                payload = b"" if body is None else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    """Keeps every test's cache and card store out of the real user cache"""
+    monkeypatch.setenv("NYXFALL_CACHE_DIR", str(tmp_path / "nyxfall-cache"))
+    monkeypatch.setattr(scryfall_requester, "_cache", None)
+    monkeypatch.setattr(scryfall_requester, "_cache_enabled", True)
+    monkeypatch.setattr(scryfall_requester, "_cache_refresh", False)
+    monkeypatch.setattr(scryfall_requester, "_offline_store", None)
+    monkeypatch.setattr(scryfall_requester, "_offline_snapshot", None)
+
+
+@pytest.fixture
+def scryfall_server(monkeypatch: pytest.MonkeyPatch):
+    server = StandInScryfall()
+    server.start()
+    monkeypatch.setattr(
+        scryfall_requester, "SCRYFALL_BASE", f"{server.url}/cards/"
+    )
+    monkeypatch.setattr(scryfall_requester, "rate_limiter", RateLimiter(1000))
+    monkeypatch.setattr(scryfall_requester, "_backoff", 0.01)
+    monkeypatch.setattr(scryfall_requester, "_session", None)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def response_cache(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    monkeypatch.setattr(scryfall_requester, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+def card_json(name: str, **fields: Any) -> dict[str, Any]:
+    """Minimal Scryfall card object for stand-in responses"""
+    return {
+        "object": "card",
+        "name": name,
+        "mana_cost": "{R}",
+        "type_line": "Instant",
+        "oracle_text": f"{name} deals 3 damage to any target.",
+        "set": "clu",
+        **fields,
+    }
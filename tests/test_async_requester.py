@@ -0,0 +1,77 @@
+import json
+from conftest import card_json
+from nyxfall import async_requester
+from nyxfall.async_requester import search_collection
+from nyxfall.card_store import CardStore
+from nyxfall.scryfall_requester import use_offline_store
+
+KNOWN = {
+    "lightning bolt": card_json("Lightning Bolt"),
+    "counterspell": card_json("Counterspell"),
+    "delver of secrets": card_json(
+        "Delver of Secrets // Insectile Aberration",
+        card_faces=[
+            {"name": "Delver of Secrets"},
+            {"name": "Insectile Aberration"},
+        ],
+    ),
+}
+
+
+def collection(handler):
+    identifiers = json.loads(handler.request_body)["identifiers"]
+    data, not_found = [], []
+    for identifier in identifiers:
+        name = identifier["name"].lower()
+        if name in KNOWN:
+            data.append(KNOWN[name])
+        elif name.startswith("card "):
+            data.append(card_json(identifier["name"]))
+        else:
+            not_found.append(identifier)
+    return 200, {"object": "list", "data": data, "not_found": not_found}
+
+
+def test_search_collection_includes_not_found(scryfall_server):
+    scryfall_server.routes["/cards/collection"] = collection
+
+    cards = search_collection(
+        [
+            "lightning bolt",
+            "Counterspell",
+            "Delver of Secrets",
+            "Lightning Blot",
+        ]
+    )
+    assert {name: card and card.name for name, card in cards.items()} == {
+        "lightning bolt": "Lightning Bolt",
+        "Counterspell": "Counterspell",
+        "Delver of Secrets": "Delver of Secrets // Insectile Aberration",
+        "Lightning Blot": None,
+    }
+    assert scryfall_server.hits("/cards/collection") == 1
+
+
+def test_search_collection_batches_unique_names(scryfall_server, monkeypatch):
+    monkeypatch.setattr(async_requester, "COLLECTION_BATCH_SIZE", 10)
+    scryfall_server.routes["/cards/collection"] = collection
+    names = [f"Card {number}" for number in range(25)] * 2
+
+    cards = search_collection(names)
+    assert len(cards) == 25
+    assert all(card is not None for card in cards.values())
+    assert scryfall_server.hits("/cards/collection") == 3
+
+
+def test_search_collection_reads_the_offline_store(scryfall_server, tmp_path):
+    bulk = tmp_path / "oracle-cards.json"
+    bulk.write_text(json.dumps(list(KNOWN.values())))
+    store = CardStore(tmp_path / "cards.sqlite3")
+    store.import_bulk(bulk)
+    use_offline_store(store)
+    found = search_collection(["Lightning Bolt", "Insectile Aberration", "X"])
+    assert found["Lightning Bolt"].name == "Lightning Bolt"
+    assert found["Insectile Aberration"].name.startswith("Delver of Secrets")
+    assert found["X"] is None
+    assert scryfall_server.hits("/cards/collection") == 0
+    store.close()
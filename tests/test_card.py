@@ -1,3 +1,6 @@
+import dataclasses
+import pytest
+from nyxfall.card import Card
 from nyxfall.card_face import CardFace
 
 
@@ -267,3 +270,26 @@ def test_long_type_line_pt():
     )
 
     assert card.format_as_card() == expected_str
+
+
+def test_cards_are_slotted_and_frozen():
+    card = Card(
+        faces=[
+            CardFace(
+                name="Grizzly Bears",
+                scryfall_uri="",
+                mana_cost="{1}{G}",
+                type_line="Creature — Bear",
+                power="2",
+                toughness="2",
+                oracle_text="",
+                flavor_text=None,
+                set="LEA",
+            )
+        ],
+        name="Grizzly Bears",
+    )
+    assert not hasattr(card, "__dict__")
+    assert not hasattr(card.faces[0], "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        card.faces[0].name = "Bear Cub"
@@ -0,0 +1,90 @@
+import json
+import sys
+from unittest.mock import patch
+import pytest
+from conftest import card_json
+from nyxfall.__main__ import main
+from nyxfall.card_snapshot import (
+    CardSnapshot,
+    default_snapshot_path,
+    write_snapshot,
+)
+from nyxfall.decoding import card_from_json
+
+CARDS = [
+    card_from_json(card)
+    for card in [
+        card_json("Lightning Bolt"),
+        card_json(
+            "Colossal Dreadmaw",
+            mana_cost="{4}{G}{G}",
+            type_line="Creature — Dinosaur",
+            power="6",
+            toughness="6",
+            flavor_text="If you feel the ground quake, run.",
+        ),
+        card_json(
+            "Delver of Secrets // Insectile Aberration",
+            card_faces=[
+                {"name": "Delver of Secrets", "mana_cost": "{U}"},
+                {"name": "Insectile Aberration", "power": "3"},
+            ],
+        ),
+        card_json("Lim-Dûl's Vault", mana_cost="{U}{B}"),
+    ]
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "cards.snapshot"
+    assert write_snapshot(CARDS, path) == len(CARDS)
+    with CardSnapshot(path) as snapshot:
+        yield snapshot
+
+
+def test_snapshot_reads_back_every_card(snapshot):
+    assert len(snapshot) == len(CARDS)
+    assert list(snapshot) == CARDS
+    assert snapshot[-1] == CARDS[-1]
+    assert snapshot[1:3] == CARDS[1:3]
+    with pytest.raises(IndexError):
+        snapshot[len(CARDS)]
+
+
+def test_snapshot_finds_cards_by_name_or_face(snapshot):
+    assert snapshot.find_exact("lightning bolt") == CARDS[0]
+    assert snapshot.find_exact("  LIM-DÛL'S VAULT ") == CARDS[3]
+    assert snapshot.find_exact("Insectile Aberration") == CARDS[2]
+    assert snapshot.find_exact("Insectile") is None
+    assert snapshot.find_exact("Zzyzx") is None
+    assert snapshot.random() in CARDS
+
+
+def test_unreadable_snapshots_are_ignored(tmp_path):
+    path = tmp_path / "cards.snapshot"
+    assert CardSnapshot.load(path) is None
+    path.write_bytes(b"")
+    assert CardSnapshot.load(path) is None
+    path.write_bytes(b"not a snapshot, but long enough for a header")
+    assert CardSnapshot.load(path) is None
+
+
+def test_offline_lookups_use_snapshot_written_by_sync(tmp_path, capfd):
+    bulk = tmp_path / "oracle-cards.json"
+    bulk.write_text(json.dumps([card_json("Lightning Bolt", oracle_id="a")]))
+    with patch.object(sys, "argv", ["nyxfall", "--sync-bulk", str(bulk)]):
+        main()
+    assert len(CardSnapshot.load(default_snapshot_path())) == 1
+
+    argv = ["nyxfall", "--offline", "-e", "lightning bolt", "--no-daemon"]
+    with (
+        patch.object(sys, "argv", argv),
+        patch(
+            "nyxfall.card_store.CardStore.find_exact",
+            side_effect=AssertionError("looked up in the store"),
+        ),
+    ):
+        main()
+    out, _ = capfd.readouterr()
+    assert "Lightning Bolt" in out
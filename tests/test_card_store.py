@@ -0,0 +1,208 @@
+import io
+import json
+import sys
+from unittest.mock import patch
+import pytest
+from conftest import card_json
+from nyxfall import card_store, scryfall_requester
+from nyxfall.__main__ import main
+from nyxfall.card_store import CardStore, iter_bulk_cards
+from nyxfall.name_index import NameIndex
+from nyxfall.scryfall_requester import (
+    iter_query,
+    search_exact,
+    search_query,
+    search_random,
+)
+
+BULK = [
+    card_json("Lightning Bolt", oracle_id="bolt", released_at="1993-08-05"),
+    card_json(
+        "Lightning Bolt",
+        oracle_id="bolt",
+        released_at="2024-02-09",
+        set="clu",
+        prices={"usd": "1.00"},
+    ),
+    card_json("Chain Lightning", oracle_id="chain", released_at="1994-06-01"),
+    card_json(
+        "Delver of Secrets // Insectile Aberration",
+        oracle_id="delver",
+        released_at="2011-09-30",
+        card_faces=[
+            {"name": "Delver of Secrets"},
+            {"name": "Insectile Aberration"},
+        ],
+    ),
+    card_json(
+        "Lightning Bolt Online",
+        oracle_id="digital",
+        released_at="2020-01-01",
+        games=["arena"],
+    ),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    bulk = tmp_path / "oracle-cards.json"
+    bulk.write_text(json.dumps(BULK, indent=2))
+    store = CardStore(tmp_path / "cards.sqlite3")
+    store.import_bulk(bulk)
+    yield store
+    store.close()
+
+
+def test_iter_bulk_cards_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(card_store, "READ_CHUNK_SIZE", 7)
+    text = json.dumps(BULK, indent=1)
+    assert list(iter_bulk_cards(io.StringIO(text))) == BULK
+
+
+def test_iter_bulk_cards_rejects_truncated_file():
+    with pytest.raises(ValueError):
+        list(iter_bulk_cards(io.StringIO(json.dumps(BULK)[:-40])))
+
+
+def test_import_keeps_latest_paper_printing(store):
+    assert store.count() == 3
+    bolt = store.find_exact("lightning bolt")
+    assert bolt["released_at"] == "2024-02-09"
+    assert "prices" not in bolt
+
+
+def test_find_exact_matches_face_names(store):
+    card = store.find_exact("Insectile Aberration")
+    assert card["name"] == "Delver of Secrets // Insectile Aberration"
+    assert store.find_exact("Insectile") is None
+
+
+def test_find_matches_all_words_in_name(store):
+    assert [card["name"] for card in store.find("lightning")] == [
+        "Chain Lightning",
+        "Lightning Bolt",
+    ]
+    assert [card["name"] for card in store.find("bolt lightning")] == [
+        "Lightning Bolt"
+    ]
+
+
+def test_search_indexes_are_saved_with_the_cards(store, tmp_path):
+    with patch(
+        "nyxfall.card_store.CardIndex.__init__",
+        side_effect=AssertionError("rebuilt the indexes"),
+    ):
+        reopened = CardStore(tmp_path / "cards.sqlite3")
+        found = reopened.find("lightning")
+        assert len(found) == 2
+        assert [card["name"] for card in found[1:]] == ["Lightning Bolt"]
+        assert found[0]["name"] == "Chain Lightning"
+
+    # Changes to the cards are indexed by the sync that makes them
+    changed = tmp_path / "changed.json"
+    changed.write_text(json.dumps(BULK[:2] + BULK[3:]))
+    reopened.update_bulk(changed)
+    assert [card["name"] for card in reopened.find("lightning")] == [
+        "Lightning Bolt"
+    ]
+    assert len(CardStore(tmp_path / "cards.sqlite3").find("lightning")) == 1
+    reopened.close()
+
+
+def test_stores_without_saved_indexes_build_them_once(store, tmp_path):
+    store._conn.execute("DELETE FROM search_index")
+    store._conn.commit()
+    reopened = CardStore(tmp_path / "cards.sqlite3")
+    assert len(reopened.find("delver")) == 1
+    with patch(
+        "nyxfall.card_store.CardIndex.__init__",
+        side_effect=AssertionError("rebuilt the indexes"),
+    ):
+        assert len(CardStore(tmp_path / "cards.sqlite3").find("bolt")) == 1
+    reopened.close()
+
+
+def test_searches_use_offline_store(store, monkeypatch):
+    monkeypatch.setattr(scryfall_requester, "_offline_store", store)
+    assert search_exact("Chain Lightning").name == "Chain Lightning"
+    assert len(search_query("lightning")) == 2
+    assert search_random().name in {card["name"] for card in BULK}
+
+
+def test_offline_searches_decode_only_the_cards_they_reach(store, monkeypatch):
+    monkeypatch.setattr(scryfall_requester, "_offline_store", store)
+    monkeypatch.setattr(scryfall_requester, "OFFLINE_PAGE_SIZE", 1)
+    with patch("nyxfall.card_store.json.loads", wraps=json.loads) as loads:
+        results = iter_query("lightning")
+        assert results.total_cards == 2
+        assert loads.call_count == 0
+        cards = iter(results)
+        assert next(cards).name == "Chain Lightning"
+        assert loads.call_count == 1
+
+
+def test_update_bulk_applies_only_changes(store, tmp_path):
+    changed = [
+        *BULK[:2],
+        card_json(
+            "Chain Lightning",
+            oracle_id="chain",
+            released_at="1994-06-01",
+            oracle_text="Chain Lightning deals 3 damage to any target. Copy it.",
+        ),
+        card_json("Opt", oracle_id="opt", released_at="2017-09-29"),
+    ]
+    bulk = tmp_path / "oracle-cards-updated.json"
+    bulk.write_text(json.dumps(changed))
+
+    changes = store.update_bulk(bulk, "2024-06-02T09:00:00+00:00")
+    assert (changes.read, changes.written, changes.removed) == (4, 2, 1)
+    assert store.count() == 3
+    assert store.find_exact("Opt")["name"] == "Opt"
+    assert "Copy it" in store.find_exact("Chain Lightning")["oracle_text"]
+    assert store.find_exact("Insectile Aberration") is None
+    assert store.updated_at() == "2024-06-02T09:00:00+00:00"
+
+    # Nothing changed since, so nothing is written
+    changes = store.update_bulk(bulk)
+    assert (changes.written, changes.removed) == (0, 0)
+    assert store.updated_at() is None
+
+
+def test_sync_bulk_downloads_latest_dump_once(scryfall_server, capfd):
+    scryfall_server.routes["/bulk-data/oracle_cards"] = (
+        200,
+        {
+            "object": "bulk_data",
+            "type": "oracle_cards",
+            "updated_at": "2024-06-02T09:00:00+00:00",
+            "download_uri": f"{scryfall_server.url}/oracle-cards.json",
+        },
+    )
+    scryfall_server.routes["/oracle-cards.json"] = (200, BULK)
+    argv = ["nyxfall", "--sync-bulk", "--incremental"]
+    with patch.object(sys, "argv", argv):
+        main()
+        main()
+    out, _ = capfd.readouterr()
+    assert "Read 5 cards: 3 new or changed, 0 removed" in out
+    assert "already up to date" in out
+    assert scryfall_server.hits("/oracle-cards.json") == 1
+    assert CardStore().find_exact("Chain Lightning") is not None
+    assert "Chain Lightning" in NameIndex.load()
+
+
+@pytest.mark.parametrize(
+    "contents", [None, '{"object": "list"}', '[{"name": "Opt"']
+)
+def test_sync_bulk_reports_unreadable_files(tmp_path, capfd, contents):
+    bulk = tmp_path / "oracle-cards.json"
+    if contents is not None:
+        bulk.write_text(contents)
+    with patch.object(sys, "argv", ["nyxfall", "--sync-bulk", str(bulk)]):
+        main()
+    out, _ = capfd.readouterr()
+    assert out.splitlines()[-1].startswith(
+        f"Could not import cards from {bulk}: "
+    )
+    assert CardStore().count() == 0
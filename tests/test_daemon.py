@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+from pytest import CaptureFixture
+from conftest import card_json
+from nyxfall import daemon_client
+from nyxfall.__main__ import run_via_daemon
+from nyxfall.card import Card
+from nyxfall.daemon import CARD_CACHE_SIZE, Daemon, start_server
+from nyxfall.name_index import NameIndex
+from nyxfall.render import render_many
+from nyxfall.scryfall_requester import search_exact
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.fixture
+def running_daemon(scryfall_server):
+    """Serves a daemon on the default socket from a background event loop"""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server(Daemon()))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield scryfall_server
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def cli_args(**fields) -> argparse.Namespace:
+    return argparse.Namespace(
+        **{
+            "query": None,
+            "random": None,
+            "exact": False,
+            "ascii": True,
+            "all": False,
+            "columns": 1,
+            "format": "frame",
+            "offline": False,
+            **fields,
+        }
+    )
+
+
+def test_request_without_a_daemon_returns_none(tmp_path: Path):
+    assert daemon_client.request({"op": "ping"}) is None
+    assert daemon_client.request({"op": "ping"}, tmp_path / "nope") is None
+
+
+def test_daemon_answers_repeat_lookups_from_memory(running_daemon):
+    running_daemon.routes["/cards/named"] = (200, card_json("Lightning Bolt"))
+    message = {"op": "exact", "name": "Lightning Bolt", "ascii": True}
+
+    first = daemon_client.request(message)
+    second = daemon_client.request({**message, "name": "lightning bolt"})
+
+    expected = io.StringIO()
+    render_many([search_exact("Lightning Bolt")], expected, ascii_only=True)
+    assert first == second == {"ok": True, "output": expected.getvalue()}
+    assert running_daemon.hits("/cards/named") == 1
+
+
+def test_daemon_reports_bad_requests(running_daemon):
+    assert daemon_client.request({"op": "exact"}) == {
+        "ok": False,
+        "error": "Missing field 'name'",
+    }
+    assert daemon_client.request({"op": "shutdown"})["ok"] is False
+
+
+def test_cli_chooses_from_searches_in_process(
+    running_daemon, capfd: CaptureFixture[str]
+):
+    running_daemon.routes["/cards/search"] = (
+        200,
+        {
+            "data": [card_json("Bolt A"), card_json("Bolt B")],
+            "has_more": False,
+        },
+    )
+    assert not run_via_daemon(cli_args(query="bolt"))
+    assert running_daemon.hits("/cards/search") == 0
+
+    assert run_via_daemon(cli_args(query="bolt", all=True))
+    out = capfd.readouterr().out
+    assert "Bolt A" in out and "Bolt B" in out
+    assert running_daemon.hits("/cards/search") == 1
+
+
+def test_daemon_forgets_cards_once_stale_or_crowded_out():
+    daemon = Daemon()
+    with patch(
+        "nyxfall.scryfall_requester.search_exact",
+        side_effect=lambda name: Card(faces=[], name=name),
+    ) as search_exact:
+        with patch("nyxfall.daemon.time.monotonic", return_value=0.0):
+            daemon.exact("Card 0")
+            daemon.exact("card 0")
+        assert search_exact.call_count == 1
+
+        # Cards stay in memory as long as the response cache keeps them fresh
+        with patch("nyxfall.daemon.time.monotonic", return_value=8 * 86400.0):
+            daemon.exact("Card 0")
+            assert search_exact.call_count == 2
+            for number in range(1, CARD_CACHE_SIZE + 1):
+                daemon.exact(f"Card {number}")
+            daemon.exact("Card 0")
+        assert search_exact.call_count == CARD_CACHE_SIZE + 3
+
+
+def test_daemons_only_answer_runs_in_their_own_mode():
+    offline_daemon = Daemon(offline=True)
+    with patch(
+        "nyxfall.daemon_client.request", side_effect=offline_daemon.handle
+    ):
+        assert not run_via_daemon(cli_args(query="Bolt", exact=True))
+    with (
+        patch(
+            "nyxfall.daemon_client.request",
+            side_effect=offline_daemon.handle,
+        ),
+        patch(
+            "nyxfall.scryfall_requester.search_exact",
+            return_value=Card(faces=[], name="Lightning Bolt"),
+        ),
+    ):
+        assert run_via_daemon(
+            cli_args(query="Lightning Bolt", exact=True, offline=True)
+        )
+
+
+def test_cli_runs_in_process_without_a_daemon():
+    assert not run_via_daemon(cli_args(query="Bolt", exact=True))
+
+
+def test_daemon_completes_names_from_its_index(running_daemon):
+    NameIndex(["Lightning Bolt", "Lightning Helix", "Serra Angel"]).save()
+    answer = daemon_client.request(
+        {"op": "complete", "prefix": "light", "limit": 1}
+    )
+    assert answer == {"ok": True, "names": ["Lightning Bolt"]}
+
+
+def test_serve_removes_its_socket_when_terminated():
+    server = subprocess.Popen(
+        [sys.executable, "-m", "nyxfall", "--serve"],
+        stdout=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(SRC), "PYTHONUNBUFFERED": "1"},
+    )
+    assert server.stdout.readline().startswith("Listening on")
+    assert daemon_client.default_socket_path().exists()
+    server.terminate()
+    assert server.wait(timeout=10) == 0
+    server.stdout.close()
+    assert not daemon_client.default_socket_path().exists()
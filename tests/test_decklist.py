@@ -0,0 +1,43 @@
+from nyxfall.decklist import DeckEntry, parse_decklist
+
+
+def test_parse_mtgo_with_blank_line_sideboard():
+    deck = "4 Lightning Bolt\n4x Goblin Guide\n2 Lightning Bolt\n\n3 Pyroblast\nSB: 1 Smash to Smithereens\n"
+    assert parse_decklist(deck) == [
+        DeckEntry(6, "Lightning Bolt", "main"),
+        DeckEntry(4, "Goblin Guide", "main"),
+        DeckEntry(3, "Pyroblast", "sideboard"),
+        DeckEntry(1, "Smash to Smithereens", "sideboard"),
+    ]
+
+
+def test_parse_mtga_export():
+    deck = "\n".join(
+        [
+            "About",
+            "Name Mono Red",
+            "",
+            "Commander",
+            "1 Krenko, Mob Boss (RVR) 125",
+            "",
+            "Deck",
+            "4 Lightning Bolt (CLU) 141",
+            "",
+            "1 Mountain (FDN) 279",
+            "// Sideboard below",
+            "Sideboard",
+            "2 Pyroblast (ICE) 212",
+        ]
+    )
+    assert parse_decklist(deck) == [
+        DeckEntry(1, "Krenko, Mob Boss", "commander"),
+        DeckEntry(4, "Lightning Bolt", "main"),
+        DeckEntry(1, "Mountain", "main"),
+        DeckEntry(2, "Pyroblast", "sideboard"),
+    ]
+
+
+def test_lines_without_counts_are_single_copies():
+    assert parse_decklist("Black Lotus") == [
+        DeckEntry(1, "Black Lotus", "main")
+    ]
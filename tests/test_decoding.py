@@ -0,0 +1,77 @@
+import json
+import pytest
+from conftest import card_json
+from nyxfall import decoding
+
+PAGE = {
+    "object": "list",
+    "total_cards": 2,
+    "has_more": True,
+    "next_page": "https://api.scryfall.com/cards/search?q=bolt&page=2",
+    "data": [
+        card_json(
+            "Lightning Bolt",
+            prices={"usd": "1.00"},
+            legalities={"modern": "legal"},
+            image_uris={"normal": "https://cards.scryfall.io/bolt.jpg"},
+        ),
+        card_json(
+            "Delver of Secrets // Insectile Aberration",
+            card_faces=[
+                card_json("Delver of Secrets", type_line="Creature — Human"),
+                card_json("Insectile Aberration", power="3", toughness="2"),
+            ],
+        ),
+    ],
+}
+
+
+@pytest.fixture(params=decoding.available_backends())
+def backend(request: pytest.FixtureRequest):
+    previous = decoding.backend
+    decoding.use_backend(request.param)
+    yield request.param
+    decoding.use_backend(previous)
+
+
+def test_decode_page_keeps_only_rendered_fields(backend):
+    page = decoding.decode_page(json.dumps(PAGE).encode())
+    assert page.total_cards == 2
+    assert page.has_more and page.next_page == PAGE["next_page"]
+    bolt, delver = page.cards
+    assert bolt.faces[0].set == "CLU"
+    assert bolt.faces[0].oracle_text == PAGE["data"][0]["oracle_text"]
+    assert [face.name for face in delver.faces] == [
+        "Delver of Secrets",
+        "Insectile Aberration",
+    ]
+    assert delver.faces[1].power == "3"
+    assert page.cards == decoding.decode_page(json.dumps(PAGE)).cards
+
+
+def test_decode_card_matches_mapping_a_decoded_card(backend):
+    body = json.dumps(PAGE["data"][1])
+    assert decoding.decode_card(body) == decoding.card_from_json(
+        json.loads(body)
+    )
+
+
+def test_error_responses_decode_to_an_empty_page(backend):
+    page = decoding.decode_page('{"object": "error", "status": 404}')
+    assert page == decoding.SearchPage()
+
+
+def test_unavailable_backend_is_rejected():
+    with pytest.raises(ValueError):
+        decoding.use_backend("simdjson")
+
+
+def test_card_from_json_interns_repeated_fields():
+    first = decoding.card_from_json(
+        {"name": "A", "set": "lea", "type_line": "Instant"}
+    )
+    second = decoding.card_from_json(
+        {"name": "B", "set": "lea", "type_line": "Instant"}
+    )
+    assert first.faces[0].set is second.faces[0].set
+    assert first.faces[0].type_line is second.faces[0].type_line
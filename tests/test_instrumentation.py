@@ -0,0 +1,65 @@
+import json
+import sys
+from unittest.mock import patch
+from pytest import CaptureFixture
+from conftest import card_json
+from nyxfall.__main__ import main
+from nyxfall.instrumentation import Metrics, metrics
+from nyxfall.scryfall_requester import search_exact
+
+
+def test_timers_and_counters_are_summarized():
+    ticks = iter([1.0, 1.5, 2.0, 2.1])
+    recorded = []
+    timings = Metrics(clock=lambda: next(ticks))
+    timings.add_listener(lambda stage, seconds: recorded.append(stage))
+    for _ in range(2):
+        with timings.timer("http"):
+            pass
+    timings.count("cache.hits", 3)
+    timings.count("cache.misses")
+
+    snapshot = timings.snapshot()
+    assert snapshot["timers"]["http"]["calls"] == 2
+    assert round(snapshot["timers"]["http"]["total_ms"]) == 600
+    assert round(snapshot["timers"]["http"]["max_ms"]) == 500
+    assert snapshot["cache_hit_rate"] == 0.75
+    assert recorded == ["http", "http"]
+    assert timings.summary().endswith("cache hit rate       75%")
+
+    timings.reset()
+    assert timings.snapshot() == {
+        "timers": {},
+        "counters": {},
+        "cache_hit_rate": None,
+    }
+
+
+def test_lookups_record_each_stage(scryfall_server, response_cache):
+    scryfall_server.routes["/cards/named"] = (200, card_json("Lightning Bolt"))
+    metrics.reset()
+    search_exact("Lightning Bolt")
+    search_exact("Lightning Bolt")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {
+        "cache.misses": 1,
+        "cache.hits": 1,
+        "http.requests": 1,
+    }
+    assert snapshot["timers"]["http"]["calls"] == 1
+    # Responses are decoded straight into cards, without a separate mapping
+    assert snapshot["timers"]["decode"]["calls"] == 2
+    assert "map" not in snapshot["timers"]
+
+
+def test_cli_prints_stats_as_json(scryfall_server, capfd: CaptureFixture[str]):
+    scryfall_server.routes["/cards/named"] = (200, card_json("Lightning Bolt"))
+    metrics.reset()
+    argv = ["nyxfall", "-e", "Lightning Bolt", "--columns", "1"]
+    with patch.object(sys, "argv", [*argv, "--stats-json"]):
+        main()
+    out, err = capfd.readouterr()
+    assert "Lightning Bolt" in out
+    stats = json.loads(err.splitlines()[-1])
+    assert {"http", "decode", "render"} <= stats["timers"].keys()
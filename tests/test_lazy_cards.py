@@ -0,0 +1,86 @@
+import threading
+import time
+from nyxfall.card import Card
+from nyxfall.lazy_cards import LazyCardList
+
+
+def make_cards(pulled: list[str], count: int):
+    for number in range(count):
+        pulled.append(f"Card {number}")
+        yield Card(faces=[], name=f"Card {number}")
+
+
+def test_only_loads_what_is_read():
+    pulled: list[str] = []
+    cards = LazyCardList(make_cards(pulled, 20), total=20)
+
+    assert len(cards) == 20
+    assert [card.name for card in cards[0:7]] == [
+        f"Card {number}" for number in range(7)
+    ]
+    assert len(pulled) == 7
+    assert cards[9].name == "Card 9"
+    assert len(pulled) == 10
+
+
+def test_length_follows_iterator_once_exhausted():
+    cards = LazyCardList(make_cards([], 3), total=5)
+
+    assert len(cards) == 5
+    assert [card.name for card in cards[0:5]] == ["Card 0", "Card 1", "Card 2"]
+    assert len(cards) == 3
+
+
+def test_load_in_background():
+    pulled: list[str] = []
+    cards = LazyCardList(make_cards(pulled, 50), total=50)
+
+    cards.load_in_background().join()
+    assert len(pulled) == 50
+    assert cards[-1].name == "Card 49"
+
+
+def test_loaded_cards_are_read_while_next_page_is_fetched():
+    next_page = threading.Event()
+
+    def pages():
+        yield from make_cards([], 3)
+        next_page.wait(5)
+        yield Card(faces=[], name="Card 3")
+
+    cards = LazyCardList(pages(), total=4)
+    assert cards[2].name == "Card 2"
+    loader = cards.load_in_background()
+    # Give the loader time to start waiting on the second page
+    time.sleep(0.05)
+    start = time.perf_counter()
+    assert [card.name for card in cards[0:3]] == [
+        "Card 0",
+        "Card 1",
+        "Card 2",
+    ]
+    assert cards[0].name == "Card 0"
+    assert time.perf_counter() - start < 1
+    next_page.set()
+    assert cards[3].name == "Card 3"
+    loader.join()
+
+
+def test_close_stops_loading_and_closes_the_source():
+    class Source:
+        closed = False
+
+        def __iter__(self):
+            yield from make_cards([], 10)
+
+        def close(self):
+            self.closed = True
+
+    source = Source()
+    cards = LazyCardList(source, total=10)
+    assert cards[1].name == "Card 1"
+    cards.close()
+    assert source.closed
+    assert len(cards) == 2
+    cards.load_in_background().join()
+    assert len(cards) == 2
@@ -1,7 +1,20 @@
 import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
 from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit
+import pytest
 from pytest import CaptureFixture
-from nyxfall.__main__ import run_cli
+from conftest import card_json
+from nyxfall.__main__ import main, run_cli, run_deck
+from nyxfall.card import Card
+from nyxfall.lazy_cards import LazyCardList
 
 
 def test_cli_require_query_or_random(capfd: CaptureFixture[str]):
@@ -15,7 +28,9 @@ def test_cli_require_query_or_random(capfd: CaptureFixture[str]):
 
 def test_cli_search_random():
     with patch("nyxfall.__main__.search_random") as search_random:
-        args = argparse.Namespace(query=None, random=True, ascii=False)
+        args = argparse.Namespace(
+            query=None, random=True, ascii=False, columns=None, format="frame"
+        )
         run_cli(args)
         search_random.assert_called_once()
 
@@ -23,7 +38,164 @@ def test_cli_search_random():
 def test_cli_search_exact():
     with patch("nyxfall.__main__.search_exact") as search_exact:
         args = argparse.Namespace(
-            query="Lightning Bolt", random=None, exact=True, ascii=False
+            query="Lightning Bolt",
+            random=None,
+            exact=True,
+            ascii=False,
+            columns=None,
+            format="frame",
         )
         run_cli(args)
         search_exact.assert_called_once_with("Lightning Bolt")
+
+
+def test_cli_search_query_selects_before_later_pages_load():
+    pulled: list[str] = []
+
+    class Results:
+        total_cards = 3
+
+        def __iter__(self):
+            for name in ["Bolt A", "Bolt B", "Bolt C"]:
+                pulled.append(name)
+                yield Card(faces=[], name=name)
+
+    def select(options, **kwargs):
+        # Only the first card needs to be loaded for the picker to appear
+        assert len(options) == 3
+        return options[0]
+
+    with (
+        patch("nyxfall.__main__.iter_query", return_value=Results()),
+        patch("beaupy.spinners.Spinner"),
+        patch("beaupy.select", side_effect=select) as selector,
+        patch.object(LazyCardList, "load_in_background"),
+    ):
+        args = argparse.Namespace(
+            query="bolt",
+            random=None,
+            exact=False,
+            ascii=False,
+            all=False,
+            columns=None,
+            format="frame",
+        )
+        run_cli(args)
+        selector.assert_called_once()
+        assert pulled == ["Bolt A"]
+
+
+@pytest.mark.filterwarnings(
+    "error::pytest.PytestUnhandledThreadExceptionWarning"
+)
+def test_cli_search_stops_loading_pages_once_a_card_is_chosen(
+    scryfall_server, capfd: CaptureFixture[str]
+):
+    def search(handler):
+        page = int(parse_qs(urlsplit(handler.path).query)["page"][0])
+        if page > 1:
+            time.sleep(0.05)
+        return 200, {
+            "data": [card_json(f"Bolt {page}")],
+            "total_cards": 30,
+            "has_more": page < 30,
+            "next_page": (
+                f"{scryfall_server.url}/cards/search?q=bolt&page={page + 1}"
+            ),
+        }
+
+    scryfall_server.routes["/cards/search"] = search
+    with (
+        patch("beaupy.spinners.Spinner"),
+        patch("beaupy.select", side_effect=lambda options, **_: options[0]),
+    ):
+        run_cli(
+            argparse.Namespace(
+                query="bolt",
+                random=None,
+                exact=False,
+                ascii=False,
+                all=False,
+                columns=None,
+                format="frame",
+            )
+        )
+    assert "Bolt 1" in capfd.readouterr().out
+
+    # The loader and the page pool wind down instead of fetching every page
+    for thread in threading.enumerate():
+        if thread.name.startswith("nyxfall-pages") or (
+            thread.daemon and "_load_all" in thread.name
+        ):
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+    assert scryfall_server.hits("/cards/search") < 30
+
+
+def test_cli_deck_resolves_once_and_renders_each_card_once(
+    capfd: CaptureFixture[str],
+):
+    bolt = Card(faces=[], name="Lightning Bolt")
+    deck = io.StringIO(
+        "4 Lightning Bolt\n1 Lightning Blot\n\n2 lightning bolt"
+    )
+    with patch(
+        "nyxfall.async_requester.search_collection",
+        return_value={"Lightning Bolt": bolt, "Lightning Blot": None},
+    ) as search_collection:
+        args = argparse.Namespace(deck=deck, ascii=False, columns=None)
+        run_deck(args)
+        search_collection.assert_called_once()
+    assert capfd.readouterr().out.splitlines() == [
+        "Main deck (5)",
+        "",
+        "4x Lightning Bolt",
+        "1x Lightning Blot (not found)",
+        "",
+        "Sideboard (2)",
+        "",
+        "2x Lightning Bolt (shown above)",
+        "",
+    ]
+
+
+def test_clear_cache_still_runs_other_actions(tmp_path, capfd):
+    bulk = tmp_path / "oracle-cards.json"
+    bulk.write_text(json.dumps([card_json("Lightning Bolt")]))
+    deck = tmp_path / "deck.txt"
+    deck.write_text("4 Lightning Bolt")
+    argv = ["nyxfall", "--clear-cache", "--sync-bulk", str(bulk)]
+    with patch("nyxfall.__main__.run_deck") as run_deck:
+        with patch.object(sys, "argv", [*argv, "--deck", str(deck)]):
+            main()
+        run_deck.assert_called_once()
+    out, _ = capfd.readouterr()
+    assert "Cleared the response cache" in out
+    assert "Imported 1 cards" in out
+
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.mark.parametrize("output_format", ["oneline", "frame"])
+def test_cli_exits_quietly_when_output_pipe_closes(tmp_path, output_format):
+    # Enough cards that the output can't all fit in the pipe's buffer
+    bulk = tmp_path / "oracle-cards.json"
+    bulk.write_text(
+        json.dumps([card_json(f"Bolt {number}") for number in range(2000)])
+    )
+    with patch.object(sys, "argv", ["nyxfall", "--sync-bulk", str(bulk)]):
+        main()
+    reader = subprocess.Popen(
+        [sys.executable, "-m", "nyxfall", "--offline", "--all", "bolt"]
+        + ["--format", output_format],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    # Read like ``| head -1`` would, then go away
+    reader.stdout.readline()
+    reader.stdout.close()
+    _, errors = reader.communicate(timeout=30)
+    assert reader.returncode == 1
+    assert b"Traceback" not in errors
@@ -0,0 +1,81 @@
+import argparse
+from unittest.mock import patch
+from pytest import CaptureFixture
+from nyxfall.__main__ import run_cli
+from nyxfall.name_index import NameIndex, fold
+from nyxfall.scryfall_requester import fetch_card_names
+
+NAMES = [
+    "Lightning Bolt",
+    "Lightning Helix",
+    "Lightning Greaves",
+    "Lim-Dûl's Vault",
+    "Serra Angel",
+    "Delver of Secrets // Insectile Aberration",
+    "Llanowar Elves",
+]
+
+
+def test_fold_ignores_case_and_accents():
+    assert fold("  Lim-Dûl's Vault ") == fold("lim-dul's vault")
+
+
+def test_complete_finds_names_and_faces_by_prefix():
+    index = NameIndex(NAMES)
+    assert index.complete("light") == [
+        "Lightning Bolt",
+        "Lightning Greaves",
+        "Lightning Helix",
+    ]
+    assert index.complete("LIGHT", limit=1) == ["Lightning Bolt"]
+    assert index.complete("lim-dul") == ["Lim-Dûl's Vault"]
+    assert index.complete("insectile") == ["Insectile Aberration"]
+    assert index.complete("zzz") == []
+    assert "insectile aberration" in index
+
+
+def test_suggest_ranks_close_misspellings_first():
+    index = NameIndex(NAMES)
+    assert index.suggest("Lightnig Bolt")[0] == "Lightning Bolt"
+    assert index.suggest("serra angle")[0] == "Serra Angel"
+    assert index.suggest("Llanowar Elfs", limit=1) == ["Llanowar Elves"]
+    assert index.suggest("Counterspell") == []
+
+
+def test_index_is_saved_and_loaded():
+    assert NameIndex.load() is None
+    NameIndex(NAMES).save()
+    loaded = NameIndex.load()
+    assert len(loaded) == len(NameIndex(NAMES))
+    assert loaded.complete("delver") == [
+        "Delver of Secrets",
+        "Delver of Secrets // Insectile Aberration",
+    ]
+
+
+def test_fetch_card_names_reads_the_catalog(scryfall_server):
+    scryfall_server.routes["/catalog/card-names"] = (
+        200,
+        {"object": "catalog", "data": NAMES},
+    )
+    assert fetch_card_names() == NAMES
+
+
+def test_cli_exact_miss_suggests_names(capfd: CaptureFixture[str]):
+    NameIndex(NAMES).save()
+    with patch("nyxfall.__main__.search_exact", return_value=None):
+        args = argparse.Namespace(
+            query="Lightnig Bolt",
+            random=None,
+            exact=True,
+            ascii=False,
+            columns=None,
+            format="frame",
+        )
+        run_cli(args)
+    lines = capfd.readouterr().out.splitlines()
+    assert lines[:3] == [
+        "Could not find a card with the name 'Lightnig Bolt'",
+        "Did you mean:",
+        "  Lightning Bolt",
+    ]
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import sys
+from unittest.mock import patch
+import pytest
+from conftest import card_json
+from nyxfall.__main__ import main
+from nyxfall.decoding import SearchPage, card_from_json
+from nyxfall.output import write_pages
+
+RAW = [
+    card_json("Lightning Bolt", rarity="common", prices={"usd": "1.00"}),
+    card_json(
+        "Delver of Secrets // Insectile Aberration",
+        rarity="common",
+        card_faces=[
+            {
+                "name": "Delver of Secrets",
+                "mana_cost": "{U}",
+                "type_line": "Creature — Human Wizard",
+                "power": "1",
+                "toughness": "1",
+                "set": "isd",
+            },
+            {
+                "name": "Insectile Aberration",
+                "type_line": "Creature — Human Insect",
+                "power": "3",
+                "toughness": "2",
+                "set": "isd",
+            },
+        ],
+    ),
+]
+PAGES = [SearchPage(cards=[card_from_json(card)], raw=[card]) for card in RAW]
+
+
+def written(format: str, fields: list[str] = []) -> str:
+    out = io.StringIO()
+    assert write_pages(PAGES, out, format, fields) == len(RAW)
+    return out.getvalue()
+
+
+def test_json_and_ndjson_hold_every_face():
+    cards = json.loads(written("json"))
+    assert cards == [
+        json.loads(line) for line in written("ndjson").splitlines()
+    ]
+    assert [card["name"] for card in cards] == [card["name"] for card in RAW]
+    delver = cards[1]["faces"]
+    assert [face["name"] for face in delver] == [
+        "Delver of Secrets",
+        "Insectile Aberration",
+    ]
+    assert delver[1]["power"] == "3"
+    assert delver[1]["flavor_text"] is None
+
+
+def test_raw_fields_are_passed_through():
+    cards = json.loads(written("json", ["rarity", "prices", "missing"]))
+    assert cards[0]["rarity"] == "common"
+    assert cards[0]["prices"] == {"usd": "1.00"}
+    assert cards[1]["prices"] is None
+    assert "missing" in cards[0]
+
+    rows = list(csv.DictReader(io.StringIO(written("csv", ["prices"]))))
+    assert rows[0]["prices"] == '{"usd":"1.00"}'
+    assert rows[1]["prices"] == ""
+
+
+def test_csv_joins_faces():
+    rows = list(csv.DictReader(io.StringIO(written("csv"))))
+    assert rows[1]["name"] == "Delver of Secrets // Insectile Aberration"
+    assert rows[1]["mana_cost"] == "{U} // "
+    assert rows[1]["power"] == "1 // 3"
+    assert rows[1]["set"] == "ISD"
+    assert rows[0]["power"] == ""
+
+
+def test_oneline():
+    assert written("oneline", ["rarity"]).splitlines() == [
+        "Lightning Bolt  {R}  Instant  CLU  rarity=common",
+        "Delver of Secrets  {U}  Creature — Human Wizard  1/1 // "
+        "Insectile Aberration  Creature — Human Insect  3/2  ISD  "
+        "rarity=common",
+    ]
+
+
+def test_empty_results_are_still_valid():
+    out = io.StringIO()
+    assert write_pages([], out, "json") == 0
+    assert json.loads(out.getvalue()) == []
+    with pytest.raises(ValueError):
+        write_pages([], out, "frame")
+
+
+def test_each_page_is_written_before_the_next_is_fetched():
+    out = io.StringIO()
+
+    def pages():
+        yield PAGES[0]
+        # The first card has to be out already
+        assert out.getvalue().count("\n") == 1
+        yield PAGES[1]
+
+    write_pages(pages(), out, "ndjson")
+    assert out.getvalue().count("\n") == 2
+
+
+def test_cli_streams_every_match_with_raw_fields(scryfall_server, capfd):
+    next_page = f"{scryfall_server.url}/cards/search?q=bolt&page=2"
+    scryfall_server.routes["/cards/search"] = lambda handler: (
+        (200, {"data": [RAW[1]], "total_cards": 2, "has_more": False})
+        if "page=2" in handler.path
+        else (
+            200,
+            {
+                "data": [RAW[0]],
+                "total_cards": 2,
+                "has_more": True,
+                "next_page": next_page,
+            },
+        )
+    )
+    argv = ["nyxfall", "bolt", "--format", "ndjson", "--fields", "rarity"]
+    with patch.object(sys, "argv", argv):
+        main()
+    out, _ = capfd.readouterr()
+    cards = [json.loads(line) for line in out.splitlines()]
+    assert [(card["name"], card["rarity"]) for card in cards] == [
+        (card["name"], "common") for card in RAW
+    ]
@@ -0,0 +1,78 @@
+import io
+from unittest.mock import patch
+from pytest import CaptureFixture
+from rich.console import Console
+from nyxfall.__main__ import build_parser, complete_names, run
+from nyxfall.card import Card
+from nyxfall.completion import completion_script
+from nyxfall.name_index import NameIndex
+from nyxfall.picker import TypeAhead
+
+NAMES = [
+    "Lightning Bolt",
+    "Lightning Helix",
+    "Lightning Greaves",
+    "Serra Angel",
+    "Llanowar Elves",
+]
+
+
+def test_type_ahead_filters_on_every_keystroke():
+    picker = TypeAhead(NameIndex(NAMES), rows=2)
+    assert picker.matches == ["Lightning Bolt", "Lightning Greaves"]
+    picker.type("light")
+    picker.type("ning h")
+    assert picker.matches == ["Lightning Helix"]
+    picker.backspace()
+    picker.move(-1)
+    assert picker.selected == "Lightning Greaves"
+    picker.type("x")
+    assert picker.cursor == 0
+    assert TypeAhead(NameIndex(NAMES), "zzzz").selected is None
+
+
+def test_type_ahead_suggests_when_nothing_starts_with_the_text():
+    picker = TypeAhead(NameIndex(NAMES), "sera angel")
+    assert picker.selected == "Serra Angel"
+    console = Console(file=io.StringIO(), width=40)
+    console.print(picker.render())
+    assert "> Serra Angel" in console.file.getvalue()
+
+
+def test_picked_card_is_printed(capfd: CaptureFixture[str]):
+    NameIndex(NAMES).save()
+    bolt = Card(faces=[], name="Lightning Bolt")
+
+    def pick_name(index, text, prefetcher):
+        assert text == "bolt"
+        return "Lightning Bolt"
+
+    with (
+        patch("nyxfall.picker.pick_name", side_effect=pick_name),
+        patch("nyxfall.__main__.search_exact", return_value=bolt) as search,
+        patch("nyxfall.__main__.print_card") as print_card,
+    ):
+        run(build_parser().parse_args(["--pick", "bolt"]))
+    search.assert_called_once_with("Lightning Bolt")
+    assert print_card.call_args.args[0] is bolt
+
+
+def test_pick_without_an_index_asks_for_a_sync(capfd: CaptureFixture[str]):
+    run(build_parser().parse_args(["--pick"]))
+    assert "--sync-names" in capfd.readouterr().out
+
+
+def test_complete_names_reads_the_local_index():
+    assert complete_names("ll") == []
+    NameIndex(NAMES).save()
+    assert complete_names("ll") == ["Llanowar Elves"]
+
+
+def test_completion_scripts_cover_options_and_names():
+    parser = build_parser()
+    for shell in ("bash", "zsh", "fish"):
+        script = completion_script(shell, parser)
+        assert "--complete-name" in script
+        assert "sync-names" in script
+        # Hidden from people, so not offered by completion either
+        assert script.count("--complete-name") == 1
@@ -0,0 +1,46 @@
+import threading
+from typing import Optional
+from nyxfall.card import Card
+from nyxfall.prefetch import Prefetcher
+
+NAMES = ["Bolt A", "Bolt B", "Bolt C", "Bolt D", "Bolt E"]
+
+
+class RecordingFetch:
+    """Stands in for ``search_exact``, remembering which names were fetched"""
+
+    def __init__(self):
+        self.fetched: list[str] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, name: str) -> Optional[Card]:
+        with self.lock:
+            self.fetched.append(name)
+        return Card(faces=[], name=name)
+
+
+def test_highlighted_card_and_neighbours_are_fetched_once():
+    fetch = RecordingFetch()
+    with Prefetcher(fetch, delay=0) as prefetcher:
+        prefetcher.focus(NAMES, 2)
+        assert prefetcher.get("Bolt C").name == "Bolt C"
+        assert prefetcher.get("Bolt B").name == "Bolt B"
+        assert prefetcher.get("Bolt D").name == "Bolt D"
+    assert sorted(fetch.fetched) == ["Bolt B", "Bolt C", "Bolt D"]
+
+
+def test_moving_on_cancels_fetches_that_have_not_started():
+    fetch = RecordingFetch()
+    with Prefetcher(fetch, workers=1, radius=0, delay=0.05) as prefetcher:
+        # Scrolling straight past entries never fetches them
+        for position in range(len(NAMES)):
+            prefetcher.focus(NAMES, position)
+        assert prefetcher.get("Bolt E").name == "Bolt E"
+    assert fetch.fetched == ["Bolt E"]
+
+
+def test_cards_that_were_not_prefetched_are_fetched_directly():
+    fetch = RecordingFetch()
+    with Prefetcher(fetch) as prefetcher:
+        assert prefetcher.get("Bolt A").name == "Bolt A"
+    assert fetch.fetched == ["Bolt A"]
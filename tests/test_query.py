@@ -0,0 +1,209 @@
+import pytest
+from conftest import card_json
+from nyxfall.query import And, CardIndex, Not, Or, QueryError, Term, parse
+
+CARDS = [
+    card_json(
+        "Goblin Guide",
+        type_line="Creature — Goblin Scout",
+        oracle_text="Haste\nWhenever Goblin Guide attacks, defending player reveals the top card of their library.",
+        colors=["R"],
+        color_identity=["R"],
+        cmc=1.0,
+        power="2",
+        toughness="2",
+        set="zen",
+        rarity="rare",
+    ),
+    card_json(
+        "Lightning Bolt",
+        oracle_text="Lightning Bolt deals 3 damage to any target.",
+        colors=["R"],
+        color_identity=["R"],
+        cmc=1.0,
+        set="clu",
+        rarity="uncommon",
+    ),
+    card_json(
+        "Counterspell",
+        oracle_text="Counter target spell.",
+        colors=["U"],
+        color_identity=["U"],
+        cmc=2.0,
+        set="mh2",
+        rarity="uncommon",
+    ),
+    card_json(
+        "Tarmogoyf",
+        type_line="Creature — Lhurgoyf",
+        oracle_text="Tarmogoyf's power is equal to the number of card types among cards in all graveyards and its toughness is equal to that number plus 1.",
+        colors=["G"],
+        color_identity=["G"],
+        cmc=2.0,
+        power="*",
+        toughness="1+*",
+        set="mh2",
+        rarity="mythic",
+    ),
+    card_json(
+        "Izzet Charm",
+        oracle_text="Choose one —\n• Counter target noncreature spell unless its controller pays {2}.\n• Izzet Charm deals 2 damage to target creature.",
+        colors=["U", "R"],
+        color_identity=["U", "R"],
+        cmc=2.0,
+        set="grn",
+        rarity="uncommon",
+    ),
+    card_json(
+        "Delver of Secrets // Insectile Aberration",
+        type_line="Creature — Human Wizard // Creature — Human Insect",
+        oracle_text="",
+        color_identity=["U"],
+        cmc=1.0,
+        set="isd",
+        rarity="common",
+        card_faces=[
+            {
+                "name": "Delver of Secrets",
+                "type_line": "Creature — Human Wizard",
+                "oracle_text": "At the beginning of your upkeep, look at the top card of your library.",
+                "colors": ["U"],
+                "power": "1",
+                "toughness": "1",
+            },
+            {
+                "name": "Insectile Aberration",
+                "type_line": "Creature — Human Insect",
+                "oracle_text": "Flying",
+                "colors": ["U"],
+                "power": "3",
+                "toughness": "2",
+            },
+        ],
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CardIndex(CARDS)
+
+
+def names(index: CardIndex, query: str) -> list[str]:
+    return [card["name"] for card in index.search(query)]
+
+
+def test_saved_index_answers_the_same(index):
+    saved = index.to_bytes()
+    loaded = CardIndex.from_bytes(saved, index.cards)
+    for query in ["goblin", 'o:"counter target"', "id<=ur c:u", "r>=rare"]:
+        assert names(loaded, query) == names(index, query)
+    with pytest.raises(ValueError):
+        CardIndex.from_bytes(saved, index.cards[1:])
+    with pytest.raises(ValueError):
+        CardIndex.from_bytes(b"not an index", index.cards)
+
+
+def test_parse_precedence():
+    assert parse("t:goblin (c:r or c:b) -o:haste mv<=2") == And(
+        (
+            Term("type", ":", "goblin"),
+            Or((Term("color", ":", "r"), Term("color", ":", "b"))),
+            Not(Term("oracle", ":", "haste")),
+            Term("cmc", "<=", "2"),
+        )
+    )
+    assert parse('a and b or o:"draw a card"') == Or(
+        (
+            And((Term("name", ":", "a"), Term("name", ":", "b"))),
+            Term("oracle", ":", "draw a card"),
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "query", ["foo:bar", "(t:goblin", "t:goblin)", "mv>=x", "()", "c:purple"]
+)
+def test_parse_errors(index, query):
+    with pytest.raises(QueryError):
+        index.search(query)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("goblin", ["Goblin Guide"]),
+        (
+            "t:creature",
+            [
+                "Delver of Secrets // Insectile Aberration",
+                "Goblin Guide",
+                "Tarmogoyf",
+            ],
+        ),
+        ("t:insect", ["Delver of Secrets // Insectile Aberration"]),
+        ('o:"counter target"', ["Counterspell", "Izzet Charm"]),
+        ("o:damage -t:creature", ["Izzet Charm", "Lightning Bolt"]),
+        ("c:r", ["Goblin Guide", "Izzet Charm", "Lightning Bolt"]),
+        ("c=r", ["Goblin Guide", "Lightning Bolt"]),
+        ("c:izzet", ["Izzet Charm"]),
+        ("c:m", ["Izzet Charm"]),
+        (
+            "id:u",
+            ["Counterspell", "Delver of Secrets // Insectile Aberration"],
+        ),
+        (
+            "id<=ur c:u",
+            [
+                "Counterspell",
+                "Delver of Secrets // Insectile Aberration",
+                "Izzet Charm",
+            ],
+        ),
+        ("mv>=2 -c:u", ["Tarmogoyf"]),
+        (
+            "cmc<2 (t:instant or pow>=3)",
+            ["Delver of Secrets // Insectile Aberration", "Lightning Bolt"],
+        ),
+        (
+            "tou>=2",
+            [
+                "Goblin Guide",
+                "Delver of Secrets // Insectile Aberration",
+            ],
+        ),
+        ("s:mh2", ["Counterspell", "Tarmogoyf"]),
+        ("r>=rare", ["Goblin Guide", "Tarmogoyf"]),
+        ("r:u -o:counter", ["Lightning Bolt"]),
+        ("-c:r -c:u", ["Tarmogoyf"]),
+    ],
+)
+def test_search(index, query, expected):
+    assert names(index, query) == sorted(expected)
+
+
+@pytest.mark.parametrize(
+    "narrowing, term", [("t:spider", "o:each"), ("t:spider", 'o:"each opp"')]
+)
+def test_terms_match_the_same_cards_whichever_plan_runs(narrowing, term):
+    # Few enough spiders that the text term is checked card by card
+    index = CardIndex(
+        [
+            card_json(f"Raider {number}", oracle_text="Each opponent loses 1.")
+            for number in range(20)
+        ]
+        + [
+            card_json(
+                f"Spider {number}",
+                type_line="Creature — Spider",
+                oracle_text=(
+                    "Reach" if number < 2 else "Each opponent mills 1."
+                ),
+            )
+            for number in range(3)
+        ]
+    )
+    assert names(index, f"{narrowing} {term}") == sorted(
+        set(names(index, narrowing)) & set(names(index, term))
+    )
+    assert names(index, f"{narrowing} {term}") == ["Spider 2"]
@@ -0,0 +1,245 @@
+import io
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+from nyxfall.card import Card
+from nyxfall.card_face import CardFace
+from nyxfall.render import (
+    ITALIC_OFF,
+    ITALIC_ON,
+    _parallel_frames,
+    grid_rows,
+    render_card,
+    render_lines,
+    display_width,
+    render_many,
+    wrap_text,
+)
+
+
+def make_face(**fields) -> CardFace:
+    return CardFace(
+        **{
+            "name": "Grizzly Bears",
+            "scryfall_uri": "",
+            "mana_cost": "{1}{G}",
+            "type_line": "Creature — Bear",
+            "power": "2",
+            "toughness": "2",
+            "oracle_text": "",
+            "flavor_text": None,
+            "set": "LEA",
+            **fields,
+        }
+    )
+
+
+def test_rendering_is_memoized_per_face_and_options():
+    face = make_face()
+    assert render_card(face) is render_card(make_face())
+    assert render_card(face) != render_card(face, ascii_only=True)
+    assert render_lines(face) is render_lines(make_face())
+
+
+def test_empty_oracle_text_keeps_a_blank_row():
+    assert render_lines(make_face(), ascii_only=True)[8] == (
+        "| |                              | |"
+    )
+
+
+def test_power_toughness_box_fits_wide_stats():
+    lines = render_lines(make_face(power="10", toughness="12"), True)
+    assert lines[-4:] == (
+        "| |                     +-------+| |",
+        "| +---------------------| 10/12 |+ |",
+        "| LEA                   +-------+  |",
+        "+----------------------------------+",
+    )
+
+
+def test_wrap_text_keeps_paragraphs():
+    assert wrap_text("Flying\nWhen this enters, draw a card.", 16) == (
+        "Flying",
+        "When this",
+        "enters, draw a",
+        "card.",
+    )
+
+
+# Oracle and flavour texts that textwrap already wrapped well, which the
+# symbol-aware wrapper has to wrap the same way
+GOLDEN_TEXTS = [
+    "Lightning Bolt deals 3 damage to any target.",
+    "Trample (This creature can deal excess combat damage to the player or "
+    "planeswalker it's attacking.)",
+    "Flying\nWhenever another non-Human creature you control dies, put a "
+    "+1/+1 counter on target creature.",
+    "{T}: Add {C}{C}. Spend this mana only to cast colorless spells.",
+    "Transform Delver of Secrets if it's a double-faced card. At the "
+    "beginning of your upkeep, look at the top card of your library.",
+    "The sparkmage shrieked, calling on the rage of the storms of his youth. "
+    "To his surprise, the sky responded with a fierce energy he'd never "
+    "thought to see again.",
+    "",
+]
+
+
+def test_wrap_text_matches_textwrap_on_ordinary_text():
+    for text in GOLDEN_TEXTS:
+        for width in range(12, 41):
+            expected = tuple(
+                line
+                for paragraph in text.splitlines()
+                for line in textwrap.wrap(paragraph, width) or [""]
+            )
+            assert wrap_text(text, width) == expected, (text, width)
+
+
+def test_wrap_text_never_splits_symbols():
+    assert wrap_text("{2/W}{2/W}{2/W}{2/W} Reach", 12) == (
+        "{2/W}{2/W}",
+        "{2/W}{2/W}",
+        "Reach",
+    )
+
+
+def test_wrap_text_keeps_em_dashes_with_the_word_before():
+    assert wrap_text("Whenever a land enters — draw a card.", 17) == (
+        "Whenever a land",
+        "enters — draw a",
+        "card.",
+    )
+
+
+def test_wrap_text_measures_wide_characters():
+    assert display_width("魔法 card") == 9
+    assert display_width("Lim-Du\u0302l") == 7
+    assert wrap_text("魔法の 力 word", 9) == ("魔法の 力", "word")
+    assert wrap_text("魔法の 力 word", 8) == ("魔法の", "力 word")
+    frame = render_lines(make_face(oracle_text="魔法の力 " * 4), True)
+    assert len({display_width(line) for line in frame}) == 1
+
+
+def test_frames_fit_wide_names_and_type_lines():
+    face = make_face(
+        name="稲妻の" * 8,
+        mana_cost="{R}",
+        type_line="インスタント — 呪文" * 3,
+        oracle_text="Deals\t3 damage\tto any target.",
+    )
+    frame = render_lines(face, False)
+    assert len({display_width(line) for line in frame}) == 1
+    assert display_width(frame[0]) == display_width(face.type_line) + 4
+    assert not any("\t" in line for line in frame)
+
+
+def test_render_many_matches_printing_each_face():
+    faces = [make_face(), make_face(name="Llanowar Elves", power="1")]
+    cards = [Card(faces=[face], name=face.name) for face in faces]
+    out = io.StringIO()
+    render_many(cards, out, ascii_only=True)
+    assert out.getvalue() == "".join(
+        render_card(face, True) + "\n" for face in faces
+    )
+
+
+def test_render_many_pads_columns_to_the_tallest_frame():
+    short = make_face()
+    tall = make_face(name="Shivan Dragon", flavor_text="Fire")
+    cards = [Card(faces=[face], name=face.name) for face in (tall, short)]
+    out = io.StringIO()
+    render_many(cards, out, columns=2)
+    rows = out.getvalue().split("\n")
+    tall_lines, short_lines = render_lines(tall), render_lines(short)
+    assert len(rows) == len(tall_lines) + 2
+    assert rows[len(short_lines)] == tall_lines[len(short_lines)]
+    # The flavour text's italics don't run into the frame beside it
+    for row in rows[: len(short_lines)]:
+        assert row.count(ITALIC_ON) == row.count(ITALIC_OFF)
+    assert rows[0] == tall_lines[0] + "  " + short_lines[0]
+
+
+def test_grid_rows_fit_as_many_frames_as_the_width_allows():
+    narrow = render_lines(make_face())
+    wide = render_lines(make_face(type_line="Legendary Creature " * 3))
+    frames = [narrow, narrow, narrow, wide, narrow]
+    rows = list(grid_rows(frames, width=2 * len(narrow[0]) + 2))
+    assert [len(row) for row in rows] == [2, 1, 1, 1]
+    assert rows[2] == [wide]
+    assert [len(row) for row in grid_rows(frames, columns=3, width=500)] == [
+        3,
+        2,
+    ]
+
+
+def test_render_many_puts_the_faces_of_a_card_side_by_side():
+    front, back = make_face(name="Front"), make_face(name="Back")
+    out = io.StringIO()
+    render_many(
+        [Card(faces=[front, back], name="Front // Back")],
+        out,
+        columns=None,
+        width=80,
+    )
+    first_row = out.getvalue().split("\n")[2]
+    assert "Front" in first_row and "Back" in first_row
+
+
+def test_parallel_render_matches_serial_output():
+    cards = [
+        Card(
+            faces=[
+                make_face(name=f"Bear {number}", oracle_text="x " * number)
+            ],
+            name=f"Bear {number}",
+        )
+        for number in range(60)
+    ]
+    serial = io.StringIO()
+    render_many(cards, serial, columns=3, width=120)
+    parallel = io.StringIO()
+    with (
+        patch("nyxfall.render.PARALLEL_THRESHOLD", 10),
+        patch("nyxfall.render.PARALLEL_CHUNK_SIZE", 7),
+        patch("os.cpu_count", return_value=2),
+        patch(
+            "concurrent.futures.ProcessPoolExecutor", wraps=ProcessPoolExecutor
+        ) as pool,
+    ):
+        render_many(iter(cards), parallel, columns=3, width=120, jobs=2)
+    assert parallel.getvalue() == serial.getvalue()
+    pool.assert_called_once_with(max_workers=2)
+
+
+def test_parallel_render_drops_queued_chunks_when_stopped_early():
+    shutdowns = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            shutdowns.append(cancel_futures)
+            super().shutdown(wait, cancel_futures=cancel_futures)
+
+    cards = (
+        Card(faces=[make_face(name=f"Bear {number}")], name="")
+        for number in range(1000)
+    )
+    with (
+        patch("nyxfall.render.PARALLEL_THRESHOLD", 10),
+        patch("nyxfall.render.PARALLEL_CHUNK_SIZE", 7),
+        patch("concurrent.futures.ProcessPoolExecutor", RecordingPool),
+    ):
+        frames = _parallel_frames(cards, False, 2)
+        next(frames)
+        frames.close()
+    assert shutdowns == [True]
+
+
+def test_small_outputs_render_without_a_process_pool():
+    with (
+        patch("os.cpu_count", return_value=4),
+        patch("concurrent.futures.ProcessPoolExecutor") as pool,
+    ):
+        render_many(
+            [Card(faces=[make_face()], name="")], io.StringIO(), jobs=4
+        )
+    pool.assert_not_called()
@@ -0,0 +1,121 @@
+import time
+from conftest import card_json
+from nyxfall import scryfall_requester
+from nyxfall.instrumentation import metrics
+from nyxfall.response_cache import ResponseCache, normalize_url
+from nyxfall.scryfall_requester import (
+    search_exact,
+    search_query,
+    search_random,
+)
+
+
+def test_normalize_url_sorts_and_encodes_query():
+    assert normalize_url(
+        "HTTPS://API.Scryfall.com/cards/search?page=1&q=llanowar elves"
+    ) == normalize_url(
+        "https://api.scryfall.com/cards/search?q=llanowar+elves&page=1"
+    )
+
+
+def test_search_exact_is_cached(scryfall_server, response_cache):
+    scryfall_server.routes["/cards/named"] = (200, card_json("Lightning Bolt"))
+
+    assert search_exact("Lightning Bolt").name == "Lightning Bolt"
+    assert search_exact("Lightning Bolt").name == "Lightning Bolt"
+    assert scryfall_server.hits("/cards/named") == 1
+
+
+def test_search_query_pages_are_cached(scryfall_server, response_cache):
+    next_page = f"{scryfall_server.url}/cards/search?q=bolt&page=2"
+    scryfall_server.routes["/cards/search"] = lambda handler: (
+        (200, {"data": [card_json("Bolt B")], "has_more": False})
+        if "page=2" in handler.path
+        else (
+            200,
+            {
+                "data": [card_json("Bolt A")],
+                "has_more": True,
+                "next_page": next_page,
+            },
+        )
+    )
+
+    first = [card.name for card in search_query("bolt")]
+    second = [card.name for card in search_query("bolt")]
+    assert first == second == ["Bolt A", "Bolt B"]
+    assert scryfall_server.hits("/cards/search") == 2
+
+
+def test_search_random_bypasses_cache(scryfall_server, response_cache):
+    scryfall_server.routes["/cards/random"] = (
+        200,
+        card_json("Helpful Hunter"),
+    )
+
+    search_random()
+    search_random()
+    assert scryfall_server.hits("/cards/random") == 2
+    assert response_cache.size() == 0
+
+
+def test_misses_are_not_cached(scryfall_server, response_cache):
+    assert search_exact("Lightning Blot") is None
+    assert search_exact("Lightning Blot") is None
+    assert scryfall_server.hits("/cards/named") == 2
+
+
+def test_refresh_refetches_and_stores(
+    scryfall_server, response_cache, monkeypatch
+):
+    scryfall_server.routes["/cards/named"] = (200, card_json("Lightning Bolt"))
+    search_exact("Lightning Bolt")
+    monkeypatch.setattr(scryfall_requester, "_cache_refresh", True)
+    search_exact("Lightning Bolt")
+    monkeypatch.setattr(scryfall_requester, "_cache_refresh", False)
+    search_exact("Lightning Bolt")
+    assert scryfall_server.hits("/cards/named") == 2
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", ttls={"named": 0.05})
+    url = "https://api.scryfall.com/cards/named?exact=Opt"
+    cache.put(url, "{}")
+    assert cache.get(url) == "{}"
+    time.sleep(0.1)
+    assert cache.get(url) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", max_bytes=250)
+    base = "https://api.scryfall.com/cards/named?exact="
+    for name in ["a", "b"]:
+        cache.put(base + name, "x" * 100)
+        time.sleep(0.01)
+    cache.get(base + "a")
+    cache.put(base + "c", "x" * 100)
+
+    assert cache.get(base + "a") is not None
+    assert cache.get(base + "b") is None
+    assert cache.get(base + "c") is not None
+    assert cache.size() <= 250
+
+
+def test_expired_entries_are_revalidated(scryfall_server, response_cache):
+    def named(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, None
+        return 200, card_json("Lightning Bolt"), {"ETag": '"v1"'}
+
+    scryfall_server.routes["/cards/named"] = named
+    response_cache.ttls["named"] = 0.05
+    assert search_exact("Lightning Bolt").name == "Lightning Bolt"
+    time.sleep(0.1)
+    metrics.reset()
+    assert search_exact("Lightning Bolt").name == "Lightning Bolt"
+    assert scryfall_server.request_headers[-1]["If-None-Match"] == '"v1"'
+    assert metrics.snapshot()["counters"]["cache.revalidated"] == 1
+
+    # Revalidating made the entry fresh again
+    search_exact("Lightning Bolt")
+    assert scryfall_server.hits("/cards/named") == 2
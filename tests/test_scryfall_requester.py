@@ -0,0 +1,138 @@
+import threading
+from urllib.parse import parse_qs, urlsplit
+from conftest import card_json
+from nyxfall.rate_limiter import RateLimiter
+from nyxfall.scryfall_requester import iter_query, search_exact, search_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_only_waits_when_requests_arrive_too_fast():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire()
+    limiter.acquire()
+    clock.now += 0.5
+    limiter.acquire()
+    assert clock.sleeps == [0.1]
+
+
+def test_rate_limiter_spaces_queued_reservations():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, capacity=2, clock=clock)
+
+    delays = [limiter.reserve() for _ in range(4)]
+    assert delays == [0.0, 0.0, 0.1, 0.2]
+
+
+def test_pages_share_headers_and_connection(scryfall_server):
+    next_page = f"{scryfall_server.url}/cards/search?q=bolt&page=2"
+    scryfall_server.routes["/cards/search"] = lambda handler: (
+        (200, {"data": [card_json("Bolt B")], "has_more": False})
+        if "page=2" in handler.path
+        else (
+            200,
+            {
+                "data": [card_json("Bolt A")],
+                "has_more": True,
+                "next_page": next_page,
+            },
+        )
+    )
+
+    search_query("bolt")
+    assert [
+        headers["User-Agent"] for headers in scryfall_server.request_headers
+    ] == ["NyxfallApp/0.0.1"] * 2
+    assert len(set(scryfall_server.client_ports)) == 1
+
+
+def test_retries_after_rate_limit(scryfall_server):
+    statuses = iter([429, 503, 200])
+    scryfall_server.routes["/cards/named"] = lambda handler: (
+        next(statuses),
+        card_json("Lightning Bolt"),
+        {"Retry-After": "0"},
+    )
+
+    assert search_exact("Lightning Bolt").name == "Lightning Bolt"
+    assert scryfall_server.hits("/cards/named") == 3
+
+
+def test_gives_up_after_max_retries(scryfall_server):
+    scryfall_server.routes["/cards/named"] = (503, {"object": "error"})
+
+    assert search_exact("Lightning Bolt") is None
+    assert scryfall_server.hits("/cards/named") == 4
+
+
+def test_iter_query_fetches_later_pages_lazily(scryfall_server):
+    next_page = f"{scryfall_server.url}/cards/search?q=bolt&page=2"
+    scryfall_server.routes["/cards/search"] = lambda handler: (
+        (200, {"data": [card_json("Bolt B")], "has_more": False})
+        if "page=2" in handler.path
+        else (
+            200,
+            {
+                "data": [card_json("Bolt A")],
+                "total_cards": 2,
+                "has_more": True,
+                "next_page": next_page,
+            },
+        )
+    )
+
+    results = iter_query("bolt")
+    assert results.total_cards == 2
+    cards = iter(results)
+    assert next(cards).name == "Bolt A"
+    assert scryfall_server.hits("/cards/search") == 1
+    assert next(cards).name == "Bolt B"
+    assert scryfall_server.hits("/cards/search") == 2
+
+
+def test_later_pages_are_fetched_concurrently_in_order(scryfall_server):
+    # Pages 2 and 3 only answer once both have been requested, which can
+    # only happen if they're fetched at the same time
+    both_requested = threading.Barrier(2, timeout=5)
+    pages = {
+        "1": ["Bolt A", "Bolt B"],
+        "2": ["Bolt C", "Bolt D"],
+        # A card that moved down a page while the search was being read
+        "3": ["Bolt D", "Bolt E"],
+    }
+
+    def search(handler):
+        page = parse_qs(urlsplit(handler.path).query)["page"][0]
+        if page != "1":
+            both_requested.wait()
+        return 200, {
+            "data": [card_json(name) for name in pages[page]],
+            "total_cards": 6,
+            "has_more": page != "3",
+            "next_page": (
+                f"{scryfall_server.url}/cards/search?q=bolt&page={int(page) + 1}"
+            ),
+        }
+
+    scryfall_server.routes["/cards/search"] = search
+    assert [card.name for card in search_query("bolt")] == [
+        "Bolt A",
+        "Bolt B",
+        "Bolt C",
+        "Bolt D",
+        "Bolt E",
+    ]
+    assert scryfall_server.hits("/cards/search") == 3
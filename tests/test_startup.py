@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from conftest import card_json
+from nyxfall.response_cache import ResponseCache
+from nyxfall.scryfall_requester import SCRYFALL_BASE
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+# Cumulative import time of nyxfall.__main__ allowed, in microseconds. Well
+# above what it takes today so only a real regression (say, requests or
+# beaupy being imported at startup again) trips it
+STARTUP_BUDGET_US = 120_000
+# Modules that only some runs need and that are slow to import
+DEFERRED_MODULES = ["requests", "urllib3", "beaupy", "asyncio"]
+
+
+def run_with_importtime(*args: str) -> tuple[str, dict[str, int]]:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        imported[name.strip()] = int(cumulative)
+    return result.stdout, imported
+
+
+def test_cli_import_stays_within_budget():
+    _, imported = run_with_importtime("-c", "import nyxfall.__main__")
+    assert not [name for name in DEFERRED_MODULES if name in imported]
+    assert imported["nyxfall.__main__"] < STARTUP_BUDGET_US
+
+
+def test_cached_exact_search_never_imports_requests():
+    # The isolated cache directory is inherited through NYXFALL_CACHE_DIR
+    cache = ResponseCache()
+    cache.put(
+        f"{SCRYFALL_BASE}named?exact=Lightning Bolt",
+        json.dumps(card_json("Lightning Bolt")),
+    )
+    cache.close()
+
+    out, imported = run_with_importtime(
+        "-m", "nyxfall", "-e", "Lightning Bolt", "--columns", "1"
+    )
+    assert "Lightning Bolt" in out
+    assert not [name for name in DEFERRED_MODULES if name in imported]